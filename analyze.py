@@ -0,0 +1,44 @@
+"""
+录制会话的离线批量分析：与实时路径相同的滤波 / NLMS / 心搏检测 / RRI 流水线，多个文件并行处理
+
+    python analyze.py sessions/*.wgs -o results/
+    python analyze.py day.wgs --hop-ms 500 -j 1
+
+每个会话输出 <name>.beats.csv、<name>.hr.csv，汇总写入 results/summary.json，见 ble/batch.py。
+"""
+import argparse
+import sys
+import time
+
+from ble.batch import analyze_sessions
+
+
+def _format(summary):
+    if 'error' in summary:
+        return f"❌ {summary['session']}: {summary['error']}"
+    mean_hr = f"{summary['mean_hr']:.1f}" if summary['mean_hr'] is not None else "-"
+    rmssd = f"{summary['rmssd_ms']:.1f}" if summary['rmssd_ms'] is not None else "-"
+    return (f"✅ {summary['session']}: {summary['duration_s'] / 60:.1f} min | 心搏 {summary['beats']} | "
+            f"平均心率 {mean_hr} BPM | RMSSD {rmssd} ms | {summary['speedup']:.0f}x 实时")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="录制会话批量分析")
+    parser.add_argument("sessions", nargs='+', help="会话录制文件")
+    parser.add_argument("-o", "--out", default="analysis", help="输出目录")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="并行进程数（默认 CPU 核数）")
+    parser.add_argument("--hop-ms", type=int, default=1000, help="处理步长（设备时间，毫秒），与实时采集一致")
+    parser.add_argument("--accel-fs", type=float, default=None, help="加速度采样率（默认与 PPG 相同）")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    summaries = analyze_sessions(args.sessions, args.out, hop_ms=args.hop_ms, workers=args.jobs,
+                                 accel_fs=args.accel_fs, on_done=lambda s: print(_format(s), flush=True))
+    failed = sum('error' in s for s in summaries)
+    print(f"完成 {len(summaries) - failed}/{len(summaries)} 个会话，用时 {time.perf_counter() - start:.1f}s，"
+          f"结果见 {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# watch-gui/benchmarks/bench_pipeline.py
+"""
+解码 → 滤波 → NLMS → 峰检测 → 心率 流水线基准测试（无界面，使用合成信号）
+
+用法（在仓库根目录执行）：
+    python -m benchmarks.bench_pipeline                       # 完整基准，JSON 输出到 stdout
+    python -m benchmarks.bench_pipeline --quick -o bench.json # 快速模式并写文件
+    python -m benchmarks.bench_pipeline --baseline bench.json # 与基线比较，退化超过阈值时返回码为 1
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from ble.packet_decoder import decode_packet, decode_batch
+from ble.sources import SyntheticSource
+from ble.watch_worker import DataProcessor
+from signal_processing.filters import bandpass_filter, savgol_smooth, NLMSFilter, BlockNLMSFilter
+from signal_processing.normal import normalize_signal
+from signal_processing.rri import RRIProcessor
+
+
+# ====================================================
+# ==================== 计时工具 =======================
+# ====================================================
+def measure(func, repeat=5, min_time=0.05):
+    """自动确定每轮调用次数（每轮至少 min_time 秒），返回每次调用的 (中位数, 最小值) 秒"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return statistics.median(samples), min(samples)
+
+
+def synthetic_signals(fs, n):
+    source = SyntheticSource(fs=fs, motion=300.0, seed=0)
+    ppg, accel = source.generate(0, n)
+    return ppg.astype(np.float32), accel.astype(np.float32)
+
+
+# ====================================================
+# ==================== 各项基准 =======================
+# ====================================================
+def bench_decode(results, quick):
+    packets = [p for _, p in SyntheticSource(duration=10, seed=0).packets()]
+    ppg_packet = packets[0]
+    record(results, "decode_data", {"packet_bytes": len(ppg_packet)}, lambda: decode_packet(ppg_packet))
+    record(results, "decode_batch", {"packets": len(packets)}, lambda: decode_batch(packets),
+           per_item=len(packets))
+
+
+def bench_stages(results, quick, buffer_secs, rates):
+    for fs in rates:
+        for secs in buffer_secs:
+            n = int(fs * secs)
+            ppg, accel = synthetic_signals(fs, n)
+            params = {"fs": fs, "buffer_len": n}
+            filtered = bandpass_filter(ppg, fs=fs).astype(np.float32)
+            normalized = normalize_signal(savgol_smooth(filtered))
+            rri = RRIProcessor(fs=fs)
+            peaks = rri.detect_peaks(normalized)
+
+            record(results, "bandpass_filter", params, lambda: bandpass_filter(ppg, fs=fs))
+            record(results, "savgol_smooth", params, lambda: savgol_smooth(filtered))
+            record(results, "normalize_signal", params, lambda: normalize_signal(filtered))
+            record(results, "detect_peaks", params, lambda: rri.detect_peaks(normalized))
+            record(results, "compute_rri", params, lambda: rri.compute_rri(peaks))
+
+            block = BlockNLMSFilter()
+            record(results, "block_nlms", params, lambda: block.process(filtered, accel), per_item=n)
+            if not quick or n <= 1000:
+                # 逐样本基线：与分块引擎同规模（3 轴 × 8 抽头），每个样本传入完整的抽头历史（前补零即初始延迟线）
+                nlms = NLMSFilter()
+                nlms.w = np.zeros(nlms.n * accel.shape[1])
+                history = np.vstack((np.zeros((nlms.n - 1, accel.shape[1]), dtype=accel.dtype), accel))
+                record(results, "nlms_adapt", params,
+                       lambda: [nlms.adapt(d, history[i:i + nlms.n]) for i, d in enumerate(filtered)], per_item=n)
+
+
+def prefilled_processor(fs, secs):
+    """预先填满缓冲的 DataProcessor（不启动线程）"""
+    n = int(fs * secs)
+    proc = DataProcessor(fs=fs, buffer_len=n)
+    ppg, accel = synthetic_signals(fs, n + 60 * fs)
+    proc._write_ppg_buffer(ppg[:n])
+    proc._write_accel_buffer(accel[:n])
+    proc.process_latest()
+    return proc, ppg, accel, n
+
+
+def bench_process_latest(results, quick, buffer_secs, rates, device_counts, hop_ms):
+    for fs in rates:
+        for secs in buffer_secs:
+            hop = max(1, int(fs * hop_ms / 1000))
+            for devices in device_counts:
+                procs = [prefilled_processor(fs, secs) for _ in range(devices)]
+                cursor = [procs[0][3]]
+
+                def tick():
+                    start = cursor[0]
+                    for proc, ppg, accel, n in procs:
+                        if start + hop > len(ppg):
+                            start = n
+                        proc._write_ppg_buffer(ppg[start:start + hop])
+                        proc._write_accel_buffer(accel[start:start + hop])
+                        proc.process_latest()
+                    cursor[0] = start + hop
+
+                params = {"fs": fs, "buffer_len": int(fs * secs), "devices": devices, "hop_ms": hop_ms}
+                entry = record(results, "process_latest", params, tick)
+                # 单核可支撑的设备数 = 步长时间 / 每设备每次处理耗时
+                entry["devices_per_core"] = (hop_ms / 1000.0) / (entry["median_s"] / devices)
+
+
+def record(results, name, params, func, per_item=None):
+    median, best = measure(func)
+    entry = {"name": name, "params": params, "median_s": median, "min_s": best}
+    if per_item:
+        entry["per_item_s"] = median / per_item
+    results.append(entry)
+    print(f"{name:18s} {json.dumps(params):70s} {median * 1e3:10.3f} ms", file=sys.stderr)
+    return entry
+
+
+# ====================================================
+# ==================== 基线比较 =======================
+# ====================================================
+def result_key(entry):
+    return entry["name"], json.dumps(entry["params"], sort_keys=True)
+
+
+def compare(results, baseline, threshold):
+    """返回 (比较结果列表, 是否存在退化)"""
+    base = {result_key(e): e for e in baseline["results"]}
+    rows, regressed = [], False
+    for entry in results:
+        old = base.get(result_key(entry))
+        if old is None:
+            continue
+        ratio = entry["median_s"] / old["median_s"]
+        is_regression = ratio > threshold
+        regressed |= is_regression
+        rows.append({"name": entry["name"], "params": entry["params"],
+                     "baseline_s": old["median_s"], "current_s": entry["median_s"],
+                     "ratio": ratio, "regression": is_regression})
+    return rows, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PPG 处理流水线基准测试")
+    parser.add_argument("-o", "--output", help="结果 JSON 输出路径（默认 stdout）")
+    parser.add_argument("--baseline", help="基线结果 JSON，启用比较模式")
+    parser.add_argument("--threshold", type=float, default=1.2, help="中位耗时 / 基线 超过该比值视为退化")
+    parser.add_argument("--quick", action="store_true", help="缩小参数范围，快速运行")
+    parser.add_argument("--hop-ms", type=int, default=1000, help="process_latest 的处理步长")
+    args = parser.parse_args(argv)
+
+    buffer_secs = [10, 20] if args.quick else [5, 10, 20, 60]
+    rates = [100] if args.quick else [50, 100, 200]
+    device_counts = [1, 4] if args.quick else [1, 2, 4, 8, 16]
+
+    results = []
+    bench_decode(results, args.quick)
+    bench_stages(results, args.quick, buffer_secs, rates)
+    bench_process_latest(results, args.quick, buffer_secs, rates, device_counts, args.hop_ms)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+    regressed = False
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            rows, regressed = compare(results, json.load(f), args.threshold)
+        report["comparison"] = {"threshold": args.threshold, "rows": rows, "regressed": regressed}
+        for row in rows:
+            flag = "  <-- 退化" if row["regression"] else ""
+            print(f"{row['name']:18s} {json.dumps(row['params']):70s} x{row['ratio']:.2f}{flag}", file=sys.stderr)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
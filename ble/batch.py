@@ -0,0 +1,183 @@
+# watch-gui/ble/batch.py
+"""
+录制会话的离线批量分析
+
+每个会话按设备时间戳重放进一个未启动接入线程的 DataProcessor：数据块与实时回放
+（ReplaySource）的顺序相同，每经过 hop_ms 的设备时间调用一次 process_latest。
+滤波器状态、心搏检测回看余量与 HRV 窗口在块之间连续保持，与实时路径使用同一套流式组件，
+因此结果与实时路径在相同 tick 位置下逐位一致，不需要额外的分块重叠处理。
+
+多个会话文件分发到进程池并行分析，每个会话输出：
+    <name>.beats.csv   心搏累计样本序号、时间（秒）、结束于该心搏的 RR 间期（ms，跨越跳过区间为空）
+    <name>.hr.csv      每次处理得到的心率（时间、BPM、信号质量指数）
+汇总统计写入 summary.json。
+"""
+import json
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ble.sources import ReplaySource
+from ble.subscriptions import HR
+from ble.watch_worker import DataProcessor
+
+TIMESTAMP_MOD = 1 << 32
+
+
+class SessionAnalysis:
+    """
+    单个会话的分析结果
+    - beats     : 心搏累计样本序号 int64[N]
+    - beat_rr   : 结束于各心搏的 RR 间期（ms），无效处为 NaN
+    - hr        : (n, 3) 数组，列为 时间（秒）/ BPM / 质量指数（预热阶段为 NaN）
+    - summary   : 汇总统计字典
+    """
+    def __init__(self, beats, beat_rr, hr, summary):
+        self.beats = beats
+        self.beat_rr = beat_rr
+        self.hr = hr
+        self.summary = summary
+
+
+def analyze_session(path, hop_ms=1000, accel_fs=None, stages=None):
+    """按设备时间重放一个会话文件，返回 SessionAnalysis；stages 为处理阶段声明（见 signal_processing.pipeline）"""
+    started = time.perf_counter()
+    source = ReplaySource(path, speed=0, accel_fs=accel_fs)
+    fs = source.reader.fs
+    # 不 start()：在本线程同步处理；只订阅心率，心搏历史随之检测，不做窗口归一化与加速度拷贝
+    proc = DataProcessor(fs=fs, buffer_len=20 * fs, accel_fs=source.rates['accel'], stages=stages, streams=(HR,))
+
+    # 同线程 emit 直接调用槽函数，无需事件循环
+    hr_rows = []
+
+    def on_hr(bpm):
+        index = proc.latest_quality.index if proc.latest_quality is not None else None
+        hr_rows.append((proc.ppg_filter.output_index / fs, bpm, np.nan if index is None else index))
+
+    proc.signals.hr_updated.connect(on_hr)
+
+    ticks = skipped = 0
+
+    def tick():
+        nonlocal ticks, skipped
+        proc.process_latest()
+        ticks += 1
+        skipped += not proc.latest_quality.hr_valid
+
+    # 设备时间（ms）按 uint32 回绕累计；时间戳回退时不推进
+    elapsed, previous, next_tick = 0, None, hop_ms
+    for ts, kind, block in source.blocks():
+        if previous is not None:
+            step = (ts - previous) % TIMESTAMP_MOD
+            if step < TIMESTAMP_MOD // 2:
+                elapsed += step
+        previous = ts
+        if elapsed >= next_tick:
+            # 两次 tick 间没有新 PPG 样本（断连间隙）时实时路径只会重复上一次结果，直接跳过
+            if proc.ppg_index > proc.processed_index:
+                tick()
+            next_tick += max(1, (elapsed - next_tick) // hop_ms + 1) * hop_ms
+        proc.write_blocks(((kind, block, ts),))
+    if proc.ppg_index > proc.processed_index:
+        tick()
+
+    beats = proc.rri_proc.beats.positions.copy()
+    ends, rr = proc.rri_proc.stream_intervals()
+    beat_rr = np.full(len(beats), np.nan)
+    beat_rr[np.searchsorted(beats, ends)] = rr
+    hr = np.array(hr_rows, dtype=np.float64).reshape(-1, 3)
+
+    duration = proc.ppg_index / fs
+    summary = {
+        'session': os.path.splitext(os.path.basename(path))[0],
+        'path': os.fspath(path),
+        'device': source.reader.meta.get('device_name', ''),
+        'fs': fs,
+        'duration_s': duration,
+        'ppg_samples': proc.ppg_index,
+        'accel_samples': proc.accel_index,
+        'ticks': ticks,
+        'hr_skipped_ratio': skipped / ticks if ticks else None,
+        'beats': len(beats),
+        'rr_count': len(rr),
+        'mean_hr': float(60_000 / np.mean(rr)) if len(rr) else None,
+        'min_hr': float(np.min(hr[:, 1])) if len(hr) else None,
+        'max_hr': float(np.max(hr[:, 1])) if len(hr) else None,
+        'sdnn_ms': float(np.std(rr, ddof=1)) if len(rr) > 1 else None,
+        'rmssd_ms': float(np.sqrt(np.mean(np.diff(rr) ** 2))) if len(rr) > 2 else None,
+        'quality_mean': float(np.nanmean(hr[:, 2])) if len(hr) and not np.all(np.isnan(hr[:, 2])) else None,
+        'sync': proc.sync.status(),
+        'elapsed_s': time.perf_counter() - started,
+    }
+    summary['speedup'] = duration / summary['elapsed_s'] if summary['elapsed_s'] > 0 else None
+    return SessionAnalysis(beats, beat_rr, hr, summary)
+
+
+def write_analysis(analysis, out_dir, name=None):
+    """写出 <name>.beats.csv 与 <name>.hr.csv，返回写出的路径"""
+    name = name or analysis.summary['session']
+    fs = analysis.summary['fs']
+    beats_path = os.path.join(out_dir, f"{name}.beats.csv")
+    hr_path = os.path.join(out_dir, f"{name}.hr.csv")
+    beats = np.column_stack((analysis.beats, analysis.beats / fs, analysis.beat_rr))
+    np.savetxt(beats_path, beats, fmt=('%d', '%.3f', '%.1f'), delimiter=',',
+               header="position,time_s,rr_ms", comments='')
+    np.savetxt(hr_path, analysis.hr, fmt=('%.3f', '%.2f', '%.3f'), delimiter=',',
+               header="time_s,bpm,quality", comments='')
+    return beats_path, hr_path
+
+
+def _analyze_to_files(path, out_dir, name, hop_ms, accel_fs, stages):
+    """进程池任务：分析并写出结果，只回传汇总字典（大数组不经进程间序列化）"""
+    try:
+        analysis = analyze_session(path, hop_ms=hop_ms, accel_fs=accel_fs, stages=stages)
+    except Exception as e:
+        return {'session': name, 'path': os.fspath(path), 'error': f"{type(e).__name__}: {e}"}
+    write_analysis(analysis, out_dir, name)
+    analysis.summary['session'] = name
+    return analysis.summary
+
+
+def _output_names(paths):
+    """按文件名生成输出名，重名时追加序号"""
+    names, seen = [], {}
+    for path in paths:
+        base = os.path.splitext(os.path.basename(path))[0]
+        count = seen.get(base, 0)
+        seen[base] = count + 1
+        names.append(base if count == 0 else f"{base}-{count}")
+    return names
+
+
+def analyze_sessions(paths, out_dir, hop_ms=1000, workers=None, accel_fs=None, stages=None, on_done=None):
+    """
+    并行分析多个会话文件，结果写入 out_dir，返回与 paths 同序的汇总列表（失败的会话含 'error'）
+    - workers : 进程数，默认 CPU 核数；为 1 时在当前进程中依次分析
+    - on_done : 每个会话完成时以汇总字典回调（用于进度输出）
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    names = _output_names(paths)
+    jobs = [(path, out_dir, name, hop_ms, accel_fs, stages) for path, name in zip(paths, names)]
+    workers = min(workers or os.cpu_count() or 1, max(1, len(jobs)))
+
+    if workers == 1:
+        summaries = []
+        for job in jobs:
+            summaries.append(_analyze_to_files(*job))
+            if on_done is not None:
+                on_done(summaries[-1])
+    else:
+        # spawn：不 fork 已加载 Qt 的进程；各会话互不依赖，按核数线性扩展
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn')) as pool:
+            futures = [pool.submit(_analyze_to_files, *job) for job in jobs]
+            if on_done is not None:
+                for future in futures:
+                    future.add_done_callback(lambda f: on_done(f.result()))
+            summaries = [future.result() for future in futures]
+
+    with open(os.path.join(out_dir, "summary.json"), 'w', encoding='utf-8') as f:
+        json.dump({'hop_ms': hop_ms, 'sessions': summaries}, f, ensure_ascii=False, indent=2)
+    return summaries
@@ -0,0 +1,204 @@
+# watch-gui/ble/connection.py
+import asyncio
+import inspect
+import json
+import os
+
+from bleak import BleakScanner, BleakClient
+
+READ_CHAR_UUID = "000034F2-0000-1000-8000-00805F9B34FB"
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".watch_gui", "devices.json")
+
+
+# ====================================================
+# ================ 设备地址缓存 ========================
+# ====================================================
+def load_address_cache(path=DEFAULT_CACHE_PATH):
+    """读取 {设备名: 地址} 缓存，文件不存在或损坏时返回空字典"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_address_cache(cache, path=DEFAULT_CACHE_PATH):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+    except OSError:
+        pass
+
+
+# ====================================================
+# ================ 单设备连接管理 ======================
+# ====================================================
+class ConnectionManager:
+    """
+    单设备连接管理
+    - 有缓存地址时先直接连接，失败再扫描
+    - 扫描使用 detection_callback，收到匹配广播立即连接，不等整轮扫描结束
+    - 断线后自动重连并重新订阅 READ_CHAR_UUID，失败按有界指数退避重试
+    - 统计首个样本用时与每次重连的断流时长，并通过 status 回调上报
+    handler 为通知回调 (sender, data)，可为普通函数或协程函数。
+    """
+    DIRECT_CONNECT_TIMEOUT = 5
+    RECONNECT_SCAN_TIMEOUT = 10
+    BACKOFF_INITIAL = 0.5
+    BACKOFF_MAX = 30
+
+    def __init__(self, device_name, handler, status=None, connect_timeout=40,
+                 cache_path=DEFAULT_CACHE_PATH, scanner_cls=BleakScanner, client_cls=BleakClient):
+        self.device_name = device_name
+        self.handler = handler
+        self.status = status or (lambda msg: None)
+        self.connect_timeout = connect_timeout
+        self.cache_path = cache_path
+        self.scanner_cls = scanner_cls
+        self.client_cls = client_cls
+
+        self.client = None
+        self.running = True
+        self.loop = None
+        self._disconnected = None
+
+        # 连接指标
+        self.started_at = None
+        self.disconnected_at = None
+        self.time_to_first_sample = None
+        self.reconnect_downtimes = []
+        self._waiting_first_sample = False
+
+    # ---------------------- 查找与连接 ----------------------
+    async def _scan_for_device(self, timeout):
+        """扫描到第一个匹配广播立即返回设备，超时返回 None"""
+        found = self.loop.create_future()
+
+        def on_advertisement(device, advertisement_data):
+            name = device.name or getattr(advertisement_data, 'local_name', None)
+            if name == self.device_name and not found.done():
+                found.set_result(device)
+
+        scanner = self.scanner_cls(detection_callback=on_advertisement)
+        await scanner.start()
+        try:
+            return await asyncio.wait_for(found, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            await scanner.stop()
+
+    async def _try_connect(self, target, timeout):
+        client = self.client_cls(target, disconnected_callback=self._on_disconnected)
+        try:
+            await asyncio.wait_for(client.connect(), timeout)
+        except Exception as e:
+            self.status(f"连接异常: {e}")
+            return None
+        return client if client.is_connected else None
+
+    async def _connect_once(self, scan_timeout):
+        """先用缓存地址直连，失败则扫描后连接"""
+        cache = load_address_cache(self.cache_path)
+        address = cache.get(self.device_name)
+        if address:
+            client = await self._try_connect(address, self.DIRECT_CONNECT_TIMEOUT)
+            if client is not None:
+                return client
+
+        device = await self._scan_for_device(scan_timeout)
+        if device is None:
+            return None
+        client = await self._try_connect(device, self.DIRECT_CONNECT_TIMEOUT)
+        if client is not None and cache.get(self.device_name) != device.address:
+            cache[self.device_name] = device.address
+            save_address_cache(cache, self.cache_path)
+        return client
+
+    # ---------------------- 回调 ----------------------
+    def _on_disconnected(self, _client):
+        if self.loop is not None and self._disconnected is not None:
+            self.loop.call_soon_threadsafe(self._disconnected.set)
+
+    async def _on_notify(self, sender, data):
+        if self._waiting_first_sample:
+            self._waiting_first_sample = False
+            now = self.loop.time()
+            if self.disconnected_at is None:
+                self.time_to_first_sample = now - self.started_at
+                self.status(f"⏱ 首个样本用时 {self.time_to_first_sample:.2f}s")
+            else:
+                downtime = now - self.disconnected_at
+                self.reconnect_downtimes.append(downtime)
+                self.status(f"⏱ 断流 {downtime:.2f}s 后恢复接收")
+        result = self.handler(sender, data)
+        if inspect.isawaitable(result):
+            await result
+
+    # ---------------------- 主循环 ----------------------
+    async def run(self):
+        """连接并持续监听，断线自动重连，直到 stop() 或首次连接超时"""
+        self.loop = asyncio.get_running_loop()
+        self._disconnected = asyncio.Event()
+        self.started_at = self.loop.time()
+        self.status("🔄 正在连接设备...")
+
+        backoff = self.BACKOFF_INITIAL
+        first = True
+        while self.running:
+            if first:
+                remaining = self.connect_timeout - (self.loop.time() - self.started_at)
+                if remaining <= 0:
+                    self.status("❌ 无法连接手表")
+                    return
+                client = await self._connect_once(remaining)
+            else:
+                client = await self._connect_once(self.RECONNECT_SCAN_TIMEOUT)
+                if client is None:
+                    self.status(f"⚠️ 重连失败，{backoff:.1f}s 后重试")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, self.BACKOFF_MAX)
+                    continue
+            if client is None or not self.running:
+                continue
+
+            backoff = self.BACKOFF_INITIAL
+            self.client = client
+            self._disconnected.clear()
+            self._waiting_first_sample = True
+            self.status("✅ 扫描连接成功" if first else "✅ 重新连接成功")
+            try:
+                await client.start_notify(READ_CHAR_UUID, self._on_notify)
+            except Exception as e:
+                self.status(f"订阅异常: {e}")
+                self._disconnected.set()
+            else:
+                self.status("📡 开始接收数据")
+            first = False
+
+            await self._disconnected.wait()
+            if not self.running:
+                break
+            self.disconnected_at = self.loop.time()
+            self.status("⚠️ 设备已断开，正在重连")
+
+        if self.client is not None and self.client.is_connected:
+            try:
+                await self.client.disconnect()
+            except Exception:
+                pass
+
+    def stop(self):
+        """可从任意线程调用"""
+        self.running = False
+        if self.loop is not None and self._disconnected is not None:
+            self.loop.call_soon_threadsafe(self._disconnected.set)
+
+    def metrics(self):
+        return {
+            'time_to_first_sample': self.time_to_first_sample,
+            'reconnects': len(self.reconnect_downtimes),
+            'reconnect_downtimes': list(self.reconnect_downtimes),
+        }
@@ -0,0 +1,100 @@
+# watch-gui/ble/headless.py
+import asyncio
+import logging
+import time
+
+from ble.ingest import DROP_OLDEST
+from ble.packet_decoder import decode_packet
+from ble.scheduler import ProcessingScheduler
+from ble.sources import BleSource
+from ble.stream_protocol import DEFAULT_ADDRESS, MSG_STATUS, encode_json
+from ble.stream_server import ResultPublisher, StreamServer
+from ble.watch_worker import make_processor
+from storage.session_file import SessionWriter
+
+logger = logging.getLogger(__name__)
+
+
+class HeadlessAcquisition:
+    """
+    无界面采集服务：数据源 → DataProcessor → 调度线程，结果经 StreamServer 发布到本地套接字
+    - 不创建 QApplication：处理结果通过 DirectConnection 在处理线程中直接编码发布
+    - 数据源与输出服务共用一个 asyncio 事件循环；每个订阅者有独立的有界队列，慢消费者不影响采集
+    - 输出流只在有订阅者连接时计算；无人连接时只接入（与录制）并推进滤波状态
+    - GUI 可通过 ble.stream_client.StreamClientWorker 作为普通订阅者接入
+    """
+    CONNECTION_TIMEOUT = 40
+    PROCESS_HOP_MS = 1000
+    STATS_INTERVAL = 5.0
+
+    def __init__(self, device_name="Q31(ID-B4F7)", address=DEFAULT_ADDRESS, fs=100, overflow_policy=DROP_OLDEST,
+                 hop_ms=PROCESS_HOP_MS, record_path=None, source=None, stats_enabled=False,
+                 stats_interval=STATS_INTERVAL, accel_fs=None, backend='thread', max_frames=StreamServer.MAX_FRAMES,
+                 stages=None):
+        self.device_name = device_name
+        self.fs = fs
+        self.source = source or BleSource(device_name, connect_timeout=self.CONNECTION_TIMEOUT)
+
+        recorder = SessionWriter(record_path, fs=fs, device_name=device_name,
+                                 meta={'accel_fs': accel_fs or fs}) if record_path else None
+        self.processor = make_processor(backend, fs=fs, buffer_len=20 * fs, overflow_policy=overflow_policy,
+                                        recorder=recorder, stats_enabled=stats_enabled, accel_fs=accel_fs,
+                                        stages=stages, streams=())
+        self.server = StreamServer(address, max_frames=max_frames, hello={
+            'device': device_name, 'fs': fs, 'accel_fs': self.processor.accel_fs, 'hop_ms': hop_ms})
+        self.publisher = ResultPublisher(self.processor, self.server)
+
+        self.stats_interval = stats_interval
+        self._last_stats_report = time.monotonic()
+        self.scheduler = ProcessingScheduler(
+            self.update_and_process, hop_ms=hop_ms,
+            on_error=lambda e: self.publish_status(f"数据处理异常: {e}"))
+        self._stopped = None
+
+    # ---------------------- 回调 ----------------------
+    async def notification_handler(self, sender, data):
+        with self.processor.stats.stage("decode"):
+            decoded = decode_packet(data)
+        if decoded:
+            self.processor.submit(decoded['type'], decoded['data'], decoded['timestamp'])
+
+    def update_and_process(self):
+        self.processor.process_latest()
+        if self.processor.stats.enabled:
+            now = time.monotonic()
+            if now - self._last_stats_report >= self.stats_interval:
+                self._last_stats_report = now
+                self.processor.report_stats()
+
+    def publish_status(self, text):
+        logger.info(text)
+        self.server.publish(MSG_STATUS, encode_json(MSG_STATUS, text))
+
+    # ---------------------- 运行 ----------------------
+    async def run(self):
+        """启动输出服务与处理线程，运行数据源直到其结束或 stop()"""
+        self._stopped = asyncio.Event()
+        await self.server.start()
+        self.processor.start()
+        self.scheduler.start()
+        source_task = asyncio.ensure_future(self.source.run(self.notification_handler, self.publish_status))
+        stop_task = asyncio.ensure_future(self._stopped.wait())
+        try:
+            await asyncio.wait((source_task, stop_task), return_when=asyncio.FIRST_COMPLETED)
+            if source_task.done() and source_task.exception() is not None:
+                self.publish_status(f"数据源异常: {source_task.exception()}")
+        finally:
+            self.source.stop()
+            stop_task.cancel()
+            if not source_task.done():
+                source_task.cancel()
+            await asyncio.gather(source_task, return_exceptions=True)
+            self.scheduler.stop()
+            self.processor.stop()
+            await self.server.close()
+
+    def stop(self):
+        """请求停止（需在事件循环线程中调用，信号处理函数中可用 loop.call_soon_threadsafe）"""
+        self.source.stop()
+        if self._stopped is not None:
+            self._stopped.set()
@@ -0,0 +1,116 @@
+# watch-gui/ble/ingest.py
+import threading
+from collections import deque
+
+import numpy as np
+
+DROP_OLDEST = "drop-oldest"
+DROP_NEWEST = "drop-newest"
+COALESCE = "coalesce"
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, COALESCE)
+
+
+class IngestChannel:
+    """
+    多路复用的数据接入通道：PPG / 加速度数据块共用一个有界队列
+    - put() 由蓝牙回调调用，从不阻塞
+    - drain() 由处理线程调用，一次唤醒取走全部待处理数据块
+    - 队列满时按 policy 处理：
+        drop-oldest : 丢弃最早的数据块
+        drop-newest : 丢弃新到的数据块
+        coalesce    : 合并到同类型最新的待处理数据块（超过 coalesce_limit 个样本时丢弃最早的样本，
+                      合并块的时间戳按 rates 中该类型的采样率顺延到保留的首个样本）
+    - 丢弃的包数 / 样本数按类型累计，pop_drop_counts() 取出并清零
+    """
+    def __init__(self, maxsize=200, policy=DROP_OLDEST, coalesce_limit=2000, rates=None):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"未知的溢出策略: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.coalesce_limit = coalesce_limit
+        self.rates = dict(rates or {})  # 类型 → 采样率（Hz）
+
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self.dropped_packets = {}
+        self.dropped_samples = {}
+        self.total_dropped_samples = {}  # 累计值，不随 pop_drop_counts() 清零
+
+    # ---------------------- 写入 ----------------------
+    def put(self, kind, block, timestamp=None):
+        """放入一个数据块，返回是否被完整接收"""
+        with self._cond:
+            accepted = True
+            if len(self._items) >= self.maxsize:
+                accepted = self._overflow(kind, block, timestamp)
+            else:
+                self._items.append((kind, block, timestamp))
+            self._cond.notify()
+            return accepted
+
+    def _overflow(self, kind, block, timestamp):
+        if self.policy == DROP_NEWEST:
+            self._count_drop(kind, len(block))
+            return False
+
+        if self.policy == COALESCE:
+            for i in range(len(self._items) - 1, -1, -1):
+                k, pending, ts = self._items[i]
+                if k == kind:
+                    merged = np.concatenate((pending, block))
+                    excess = len(merged) - self.coalesce_limit
+                    if excess > 0:
+                        self._count_drop(kind, excess, packets=0)
+                        merged = merged[excess:]
+                        ts = self._advance_timestamp(ts, excess, len(pending), timestamp, kind)
+                    self._items[i] = (k, merged, ts)
+                    return excess <= 0
+
+        # drop-oldest（coalesce 找不到同类型数据块时同样退化为丢弃最早）
+        old_kind, old_block, _ = self._items.popleft()
+        self._count_drop(old_kind, len(old_block))
+        self._items.append((kind, block, timestamp))
+        return True
+
+    def _advance_timestamp(self, ts, excess, pending_len, timestamp, kind):
+        """合并块丢弃前 excess 个样本后，首个保留样本的设备时间戳（ms，uint32 回绕）"""
+        rate = self.rates.get(kind)
+        if excess >= pending_len:
+            ts, excess = timestamp, excess - pending_len  # 旧块整块丢弃，从新块的时间戳顺延
+        if ts is None or not rate:
+            return ts
+        return int(round(ts + excess * 1000 / rate)) % (1 << 32)
+
+    def _count_drop(self, kind, samples, packets=1):
+        self.dropped_packets[kind] = self.dropped_packets.get(kind, 0) + packets
+        self.dropped_samples[kind] = self.dropped_samples.get(kind, 0) + samples
+        self.total_dropped_samples[kind] = self.total_dropped_samples.get(kind, 0) + samples
+
+    # ---------------------- 读取 ----------------------
+    def drain(self, timeout=None):
+        """等待至少一个数据块（或超时/关闭），然后一次取走全部待处理数据块"""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            items = list(self._items)
+            self._items.clear()
+            return items
+
+    def qsize(self):
+        with self._cond:
+            return len(self._items)
+
+    def pop_drop_counts(self):
+        """返回 (丢包数, 丢样本数) 两个按类型的字典，并清零"""
+        with self._cond:
+            packets, samples = self.dropped_packets, self.dropped_samples
+            self.dropped_packets, self.dropped_samples = {}, {}
+            return packets, samples
+
+    def close(self):
+        """唤醒等待中的 drain()"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
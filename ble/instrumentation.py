@@ -0,0 +1,156 @@
+# watch-gui/ble/instrumentation.py
+import time
+from threading import Lock
+
+import numpy as np
+
+
+class RollingStat:
+    """定长滚动样本窗口：O(1) 追加，按需计算分位数"""
+    def __init__(self, window=1024):
+        self.values = np.zeros(window, dtype=np.float64)
+        self.count = 0
+
+    def add(self, value):
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+
+    def summary(self):
+        n = min(self.count, len(self.values))
+        if n == 0:
+            return {'count': 0}
+        p50, p95, p99 = np.percentile(self.values[:n], (50, 95, 99))
+        return {'count': self.count, 'mean': float(np.mean(self.values[:n])),
+                'p50': float(p50), 'p95': float(p95), 'p99': float(p99)}
+
+
+class _StageTimer:
+    __slots__ = ('stats', 'name', 'start')
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.record(self.name, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    """禁用时使用的共享空计时器"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class PipelineStats:
+    """
+    流水线运行统计
+    - stage(name)           : 分阶段计时上下文，禁用时返回共享空对象，几乎无开销
+    - count_samples(kind,n) : 统计接入样本数，用于估计实际采样率
+    - record_latency(s)     : 端到端（收包 → 显示）延迟
+    - snapshot()            : 汇总为字典（各阶段 p50/p95/p99、队列深度、丢弃数、采样率、延迟、滤波流水线每 tick 分配数）
+    队列深度、丢弃数与滤波流水线（PPGPipeline）最近一次 tick 的数组分配数通过 queue_depth / dropped / allocations 回调在 snapshot() 时读取。
+    records 不为 None 时 record() 同时追加 (阶段, 秒)，由 take_records() 取走（进程后端把子进程的计时回传父进程）。
+    记录来自接入、处理、GUI 等多个线程，snapshot() / reset() 在其他线程中执行，所有读写由同一把锁保护。
+    """
+    def __init__(self, enabled=False, fs=100, window=1024, queue_depth=None, dropped=None, allocations=None):
+        self.enabled = enabled
+        self.fs = fs
+        self.window = window
+        self.queue_depth = queue_depth
+        self.dropped = dropped
+        self.allocations = allocations
+
+        self._lock = Lock()
+        self.stages = {}
+        self.latency = RollingStat(window)
+        self._samples = {}
+        self._rate_start = time.monotonic()
+        self.records = None
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name)
+
+    def record(self, name, seconds):
+        with self._lock:
+            stat = self.stages.get(name)
+            if stat is None:
+                stat = self.stages[name] = RollingStat(self.window)
+            stat.add(seconds)
+            if self.records is not None:
+                self.records.append((name, seconds))
+
+    def take_records(self):
+        """取走自上次调用以来的 (阶段, 秒) 记录"""
+        with self._lock:
+            records, self.records = self.records, []
+        return records
+
+    def count_samples(self, kind, n):
+        if self.enabled:
+            with self._lock:
+                self._samples[kind] = self._samples.get(kind, 0) + n
+
+    def record_latency(self, seconds):
+        if self.enabled:
+            with self._lock:
+                self.latency.add(seconds)
+
+    def snapshot(self):
+        """汇总当前统计；采样率为距上次 snapshot() 的平均值"""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = max(now - self._rate_start, 1e-9)
+            rates = {kind: n / elapsed for kind, n in self._samples.items()}
+            self._samples = {}
+            self._rate_start = now
+            stages = {name: stat.summary() for name, stat in self.stages.items()}
+            latency = self.latency.summary()
+        return {
+            'stages': stages,
+            'queue_depth': self.queue_depth() if self.queue_depth else None,
+            'dropped_samples': self.dropped() if self.dropped else {},
+            'ingest_rate': rates,
+            'nominal_fs': self.fs,
+            'latency': latency,
+            'allocations': self.allocations() if self.allocations else None,
+        }
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.latency = RollingStat(self.window)
+            self._samples = {}
+            self._rate_start = time.monotonic()
+
+
+def format_stats(snapshot):
+    """把 snapshot() 结果格式化为单行日志"""
+    parts = []
+    for name, s in snapshot['stages'].items():
+        if s['count']:
+            parts.append(f"{name} p50={s['p50'] * 1e3:.2f} p99={s['p99'] * 1e3:.2f}ms")
+    rates = " ".join(f"{k}={v:.1f}Hz" for k, v in snapshot['ingest_rate'].items())
+    parts.append(f"接入 {rates or '-'} (标称 {snapshot['nominal_fs']}Hz)")
+    parts.append(f"队列 {snapshot['queue_depth']}")
+    dropped = sum(snapshot['dropped_samples'].values())
+    parts.append(f"丢弃 {dropped}")
+    if snapshot.get('allocations') is not None:
+        parts.append(f"流水线分配 {snapshot['allocations']}/tick")
+    lat = snapshot['latency']
+    if lat['count']:
+        parts.append(f"端到端延迟 p50={lat['p50'] * 1e3:.0f} p95={lat['p95'] * 1e3:.0f}ms")
+    return " | ".join(parts)
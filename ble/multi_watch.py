@@ -0,0 +1,214 @@
+# watch-gui/ble/multi_watch.py
+import asyncio
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from bleak import BleakScanner, BleakClient
+
+from ble.connection import READ_CHAR_UUID
+from ble.ingest import DROP_OLDEST
+from ble.packet_decoder import decode_packet
+from ble.scheduler import ProcessingScheduler
+from ble.watch_worker import make_processor
+
+
+# ====================================================
+# ================== 单设备会话 =======================
+# ====================================================
+class DeviceSession:
+    """单个手表的采集会话：BLE 客户端、独立的处理流水线与健康统计"""
+    def __init__(self, name, fs=100, buffer_len=2000, overflow_policy=DROP_OLDEST, backend='thread'):
+        self.name = name
+        self.processor = make_processor(backend, fs=fs, buffer_len=buffer_len, overflow_policy=overflow_policy)
+
+        self.client = None
+        self.address = None
+        self.connecting = False
+        self.rssi = None
+
+        # 健康统计
+        self.connected_at = None
+        self.disconnects = 0
+        self.packets = 0
+        self.bad_packets = 0
+        self.samples = {'ppg': 0, 'accel': 0}
+        self.last_packet_time = None
+
+    @property
+    def connected(self):
+        return self.client is not None and self.client.is_connected
+
+    def handle_packet(self, data):
+        """解码一个通知包并送入本设备的处理流水线"""
+        decoded = decode_packet(data)
+        if decoded is None:
+            self.bad_packets += 1
+            return
+        self.packets += 1
+        self.samples[decoded['type']] += len(decoded['data'])
+        self.last_packet_time = time.monotonic()
+        self.processor.submit(decoded['type'], decoded['data'], decoded['timestamp'])
+
+    def health(self):
+        now = time.monotonic()
+        return {
+            'connected': self.connected,
+            'address': self.address,
+            'rssi': self.rssi,
+            'uptime': now - self.connected_at if self.connected_at is not None and self.connected else 0.0,
+            'disconnects': self.disconnects,
+            'packets': self.packets,
+            'bad_packets': self.bad_packets,
+            'samples': dict(self.samples),
+            'since_last_packet': now - self.last_packet_time if self.last_packet_time is not None else None,
+            'queue_depth': self.processor.ingest.qsize(),
+            'dropped_samples': dict(self.processor.ingest.total_dropped_samples),
+            'latest_bpm': self.processor.latest_bpm,
+            'signal_quality': self.processor.latest_quality,
+            'sync': self.processor.sync.status(),
+        }
+
+
+# ====================================================
+# ================== 多设备采集线程 ===================
+# ====================================================
+class MultiWatchManager(QThread):
+    """
+    多手表并发采集：一个事件循环、一个共享扫描器，连接一组设备
+    - 扫描器通过 detection_callback 发现目标设备后立即发起连接
+    - 通知按设备路由到各自的 DataProcessor
+    - 一个调度线程按 hop_ms 处理所有设备；backend='process' 时各设备的处理在各自进程中并行
+    - scanner_cls / client_cls 可替换为模拟实现用于测试
+    所有信号的第一个参数为设备名。
+    """
+    ppg_signal = pyqtSignal(str, object)    # ProcessedWindow
+    accel_signal = pyqtSignal(str, object)  # ProcessedWindow
+    hr_signal = pyqtSignal(str, float)
+    status_signal = pyqtSignal(str, str)
+
+    PROCESS_HOP_MS = 1000
+
+    def __init__(self, device_names, fs=100, hop_ms=PROCESS_HOP_MS, overflow_policy=DROP_OLDEST,
+                 scanner_cls=BleakScanner, client_cls=BleakClient, backend='thread'):
+        super().__init__()
+        self.fs = fs
+        self.running = True
+        self.loop = None
+        self.scanner_cls = scanner_cls
+        self.client_cls = client_cls
+        self.scanner = None
+        self._scanning = False
+
+        self.sessions = {}
+        for name in device_names:
+            session = DeviceSession(name, fs=fs, buffer_len=20 * fs, overflow_policy=overflow_policy,
+                                    backend=backend)
+            signals = session.processor.signals
+            signals.processed_ppg.connect(lambda r, n=name: self.ppg_signal.emit(n, r))
+            signals.processed_accel.connect(lambda r, n=name: self.accel_signal.emit(n, r))
+            signals.hr_updated.connect(lambda bpm, n=name: self.hr_signal.emit(n, bpm))
+            signals.status.connect(lambda msg, n=name: self.status_signal.emit(n, msg))
+            session.processor.start()
+            self.sessions[name] = session
+
+        self.scheduler = ProcessingScheduler(
+            self.process_all, hop_ms=hop_ms,
+            on_error=lambda e: self.status_signal.emit("", f"数据处理异常: {e}"))
+        self.scheduler.start()
+
+    # ====================================================
+    # ================ 处理与统计 ==========================
+    # ====================================================
+    def process_all(self):
+        # 先通知所有设备再逐个收集：进程后端下各设备在各自进程中并行处理
+        for session in self.sessions.values():
+            session.processor.request_process()
+        for session in self.sessions.values():
+            session.processor.process_latest()
+
+    def health(self):
+        """按设备名返回健康统计"""
+        return {name: session.health() for name, session in self.sessions.items()}
+
+    # ====================================================
+    # ================ 扫描与连接 ==========================
+    # ====================================================
+    def _on_advertisement(self, device, advertisement_data):
+        name = device.name or getattr(advertisement_data, 'local_name', None)
+        session = self.sessions.get(name)
+        if session is None:
+            return
+        session.rssi = getattr(advertisement_data, 'rssi', None)
+        if session.connected or session.connecting:
+            return
+        session.connecting = True
+        self.loop.create_task(self._connect(session, device))
+
+    async def _connect(self, session, device):
+        self.status_signal.emit(session.name, "🔄 正在连接设备...")
+        try:
+            client = self.client_cls(
+                device, disconnected_callback=lambda _c, s=session: self._on_disconnected(s))
+            await client.connect()
+            await client.start_notify(READ_CHAR_UUID, lambda _sender, data, s=session: s.handle_packet(data))
+            session.client = client
+            session.address = device.address
+            session.connected_at = time.monotonic()
+            self.status_signal.emit(session.name, "✅ 扫描连接成功")
+            self.status_signal.emit(session.name, "📡 开始接收数据")
+        except Exception as e:
+            self.status_signal.emit(session.name, f"连接异常: {e}")
+        finally:
+            session.connecting = False
+        await self._update_scanning()
+
+    def _on_disconnected(self, session):
+        session.disconnects += 1
+        self.status_signal.emit(session.name, "⚠️ 设备已断开，重新扫描中")
+        if self.running and self.loop is not None:
+            self.loop.call_soon_threadsafe(lambda: self.loop.create_task(self._update_scanning()))
+
+    async def _update_scanning(self):
+        """有设备未连接时保持共享扫描，全部连接后停止扫描以释放适配器"""
+        missing = any(not s.connected for s in self.sessions.values())
+        if missing and self.running and not self._scanning:
+            await self.scanner.start()
+            self._scanning = True
+        elif (not missing or not self.running) and self._scanning:
+            await self.scanner.stop()
+            self._scanning = False
+
+    async def run_async(self):
+        self.scanner = self.scanner_cls(detection_callback=self._on_advertisement)
+        await self._update_scanning()
+        try:
+            while self.running:
+                await asyncio.sleep(1)
+        finally:
+            self.running = False
+            await self._update_scanning()
+            for session in self.sessions.values():
+                if session.connected:
+                    try:
+                        await session.client.disconnect()
+                    except Exception:
+                        pass
+
+    # ====================================================
+    # ================ 线程控制 ============================
+    # ====================================================
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.run_async())
+        except Exception as e:
+            self.status_signal.emit("", f"蓝牙线程异常: {e}")
+
+    def stop(self):
+        self.running = False
+        self.scheduler.stop()
+        for session in self.sessions.values():
+            session.processor.stop()
+        self.quit()
+        self.wait()
@@ -0,0 +1,142 @@
+# watch-gui/ble/packet_decoder.py
+"""
+手表 BLE 数据包解码（NumPy 向量化版本）
+
+包格式（小端）：
+    [0:2]   命令字  0xFFFA = PPG, 0xFFFB = 加速度
+    [2:6]   设备时间戳 uint32
+    [6]     负载长度 length
+    [7:7+length]  负载
+    [7+length]    CRC（前 7+length 字节逐字节异或）
+"""
+import struct
+import numpy as np
+
+PPG_COMMAND = b'\xff\xfa'
+ACCEL_COMMAND = b'\xff\xfb'
+
+HEADER = struct.Struct('<2sIB')
+HEADER_LEN = HEADER.size  # 7
+
+PPG_DTYPE = np.dtype('<u2')
+ACCEL_DTYPE = np.dtype('<i2')
+
+# 命令字 -> (类型名, 最小包长, 负载长度需整除的字节数)
+_COMMANDS = {
+    PPG_COMMAND: ('ppg', 10, 2),
+    ACCEL_COMMAND: ('accel', 14, 6),
+}
+
+
+def _parse_header(data):
+    """解析并校验包头，返回 (kind, timestamp, length) 或 None"""
+    if len(data) < HEADER_LEN:
+        return None
+    command, timestamp, length = HEADER.unpack_from(data)
+    spec = _COMMANDS.get(command)
+    if spec is None:
+        return None
+    kind, min_len, unit = spec
+    if len(data) < max(min_len, HEADER_LEN + length + 1):
+        return None
+    if length % unit != 0:
+        return None
+    return kind, timestamp, length
+
+
+def _payload_to_array(kind, payload):
+    if kind == 'ppg':
+        return np.frombuffer(payload, dtype=PPG_DTYPE)
+    return np.frombuffer(payload, dtype=ACCEL_DTYPE).reshape(-1, 3)
+
+
+def decode_packet(data):
+    """
+    解码单个通知包
+    返回 {'type': 'ppg'|'accel', 'data': ndarray, 'timestamp': int}，非法包返回 None
+    - PPG:   uint16 数组，形状 (n,)
+    - 加速度: int16 数组，形状 (n, 3)
+    """
+    header = _parse_header(data)
+    if header is None:
+        return None
+    kind, timestamp, length = header
+
+    raw = np.frombuffer(data, dtype=np.uint8, count=HEADER_LEN + length + 1)
+    if np.bitwise_xor.reduce(raw) != 0:  # 含 CRC 字节整体异或为 0 即校验通过
+        return None
+
+    payload = memoryview(data)[HEADER_LEN:HEADER_LEN + length]
+    return {'type': kind, 'data': _payload_to_array(kind, payload), 'timestamp': timestamp}
+
+
+def decode_batch(packets):
+    """
+    一次解码一批通知包
+    所有包拼接成一个缓冲区，用 np.bitwise_xor.reduceat 一次性完成 CRC 校验，
+    每种类型的负载只做一次 np.frombuffer。
+    返回 {'ppg': {...}, 'accel': {...}}，每项包含：
+    - data       : 拼接后的样本数组
+    - timestamps : 每个有效包的设备时间戳 (uint32)
+    - counts     : 每个有效包的样本数
+    """
+    headers = [_parse_header(p) for p in packets]
+    valid = [(p, h) for p, h in zip(packets, headers) if h is not None]
+
+    result = {
+        'ppg': {'data': np.empty(0, dtype=PPG_DTYPE),
+                'timestamps': np.empty(0, dtype=np.uint32),
+                'counts': np.empty(0, dtype=np.int64)},
+        'accel': {'data': np.empty((0, 3), dtype=ACCEL_DTYPE),
+                  'timestamps': np.empty(0, dtype=np.uint32),
+                  'counts': np.empty(0, dtype=np.int64)},
+    }
+    if not valid:
+        return result
+
+    # 拼接缓冲区，末尾补一个 0 字节保证 reduceat 的结束索引不越界
+    joined = b''.join(bytes(p) for p, _ in valid) + b'\x00'
+    buf = np.frombuffer(joined, dtype=np.uint8)
+    sizes = np.fromiter((len(p) for p, _ in valid), dtype=np.int64, count=len(valid))
+    lengths = np.fromiter((h[2] for _, h in valid), dtype=np.int64, count=len(valid))
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    ends = starts + HEADER_LEN + lengths + 1
+
+    # 交错 [start0, end0, start1, end1, ...]，偶数位即每个包 [start, end) 的异或结果
+    bounds = np.empty(2 * len(valid), dtype=np.int64)
+    bounds[0::2] = starts
+    bounds[1::2] = ends
+    crc_ok = np.bitwise_xor.reduceat(buf, bounds)[0::2] == 0
+
+    for kind in ('ppg', 'accel'):
+        sel = [i for i, (_, h) in enumerate(valid) if crc_ok[i] and h[0] == kind]
+        if not sel:
+            continue
+        view = memoryview(joined)
+        payload = b''.join(
+            view[starts[i] + HEADER_LEN:starts[i] + HEADER_LEN + lengths[i]] for i in sel)
+        unit = 2 if kind == 'ppg' else 6
+        result[kind] = {
+            'data': _payload_to_array(kind, payload),
+            'timestamps': np.fromiter((valid[i][1][1] for i in sel), dtype=np.uint32, count=len(sel)),
+            'counts': lengths[sel] // unit,
+        }
+    return result
+
+
+def encode_packet(kind, block, timestamp):
+    """
+    按手表协议组包（decode_packet 的逆过程），供模拟数据源和回放使用
+    kind: 'ppg' (n,) uint16 或 'accel' (n,3) int16；单包负载不超过 255 字节
+    """
+    if kind == 'ppg':
+        command, payload = PPG_COMMAND, np.asarray(block).astype(PPG_DTYPE).tobytes()
+    elif kind == 'accel':
+        command, payload = ACCEL_COMMAND, np.asarray(block).reshape(-1, 3).astype(ACCEL_DTYPE).tobytes()
+    else:
+        raise ValueError(f"未知的数据类型: {kind}")
+    if len(payload) > 255:
+        raise ValueError(f"单包负载过长: {len(payload)} 字节")
+    body = HEADER.pack(command, int(timestamp) & 0xFFFFFFFF, len(payload)) + payload
+    crc = int(np.bitwise_xor.reduce(np.frombuffer(body, dtype=np.uint8)))
+    return body + bytes([crc])
@@ -0,0 +1,170 @@
+# watch-gui/ble/process_backend.py
+import multiprocessing as mp
+
+import numpy as np
+
+from ble.ingest import DROP_OLDEST
+from ble.results import ProcessedWindow
+from ble.subscriptions import ACCEL, QUALITY, STREAMS, Subscriptions
+from ble.watch_worker import DataProcessor
+from signal_processing.ring_buffer import SharedRingBuffer
+
+
+# ====================================================
+# ================== 子进程入口 =======================
+# ====================================================
+def _worker_main(config, ppg_spec, accel_spec, window_spec, peaks_spec, lock, conn):
+    """
+    子进程主循环：复用 DataProcessor 的处理流程（不启动其接入线程），
+    输入缓冲映射到父进程的共享内存，结果写回共享内存，管道中只回传标量、SignalQuality、HRV 字典与分阶段计时
+    每个请求携带父进程当前订阅的输出流集合与统计开关，子进程按此决定本次计算哪些流、是否计时
+    """
+    proc = DataProcessor(**config)
+    proc.buffer_lock = lock
+    proc.ppg_buffer = SharedRingBuffer.attach(ppg_spec)
+    proc.accel_buffer = SharedRingBuffer.attach(accel_spec)
+    window = SharedRingBuffer.attach(window_spec)
+    peaks = SharedRingBuffer.attach(peaks_spec)
+    proc.stats.records = []
+
+    # 子进程内无事件循环，同线程 emit 直接调用槽函数
+    out = {}
+    streams = None
+    proc.signals.processed_ppg.connect(lambda r: out.__setitem__('ppg', r))
+    proc.signals.hr_updated.connect(lambda bpm: out.__setitem__('hr', bpm))
+    proc.signals.quality_updated.connect(lambda q: out.__setitem__('quality', q))
+    proc.signals.hrv_updated.connect(lambda hrv: out.__setitem__('hrv', hrv))
+
+    try:
+        while True:
+            try:
+                msg = conn.recv()
+            except EOFError:
+                break
+            if msg is None:
+                break
+            active, proc.stats.enabled = msg
+            if active != streams:
+                streams = active
+                proc.subscriptions = Subscriptions(streams)
+            out.clear()
+            try:
+                proc._process_latest()  # 总耗时由父进程计时（含等待）
+                result = out.get('ppg')
+                window_len = n_peaks = None
+                if result is not None:
+                    window_len, n_peaks = len(result.data), min(len(result.peaks), peaks.capacity)
+                    window.write(result.data)
+                    peaks.write(result.peaks[len(result.peaks) - n_peaks:])
+                conn.send((proc.ppg_filter.output_index, window_len, n_peaks, proc.latest_quality, out.get('hr'),
+                           out.get('hrv'), proc.stats.take_records(), proc.ppg_filter.last_allocations))
+            except Exception as e:
+                conn.send(RuntimeError(f"{type(e).__name__}: {e}"))
+    finally:
+        for ring in (proc.ppg_buffer, proc.accel_buffer, window, peaks):
+            ring.close()
+
+
+# ====================================================
+# ================== 进程后端 =========================
+# ====================================================
+class ProcessDataProcessor(DataProcessor):
+    """
+    进程后端：滤波、NLMS、心搏检测、HRV 在独立子进程中执行，不与 BLE / GUI 线程争抢 GIL
+    - 接入线程（继承的 run）把原始样本与时刻写入共享内存环形缓冲，由跨进程锁保护
+    - request_process() 通知子进程处理；process_latest() 等待完成并从共享内存读取结果
+    - 数组只经共享内存传递，不做序列化
+    对外接口与 DataProcessor 相同；多设备时先对所有设备 request_process() 再逐个收集即可并行。
+    """
+    REPLY_TIMEOUT = 5.0
+
+    def __init__(self, fs=100, buffer_len=2000, queue_size=200, overflow_policy=DROP_OLDEST, recorder=None,
+                 stats_enabled=False, accel_fs=None, stages=None, streams=STREAMS):
+        super().__init__(fs=fs, buffer_len=buffer_len, queue_size=queue_size, overflow_policy=overflow_policy,
+                         recorder=recorder, stats_enabled=stats_enabled, accel_fs=accel_fs, stages=stages,
+                         streams=streams)
+        ctx = mp.get_context('spawn')  # 不 fork 含 Qt / bleak 线程的进程
+
+        # 输入：替换为共享内存缓冲；结果：处理窗口与窗口内心搏位置
+        self.buffer_lock = ctx.Lock()
+        self.ppg_buffer = SharedRingBuffer(buffer_len, dtype=np.float32, seq_dtype=np.float64)
+        self.accel_buffer = SharedRingBuffer(self.accel_buffer.capacity, channels=3, dtype=np.float32,
+                                             seq_dtype=np.float64)
+        self.result_window = SharedRingBuffer(buffer_len, dtype=np.float32)
+        self.result_peaks = SharedRingBuffer(buffer_len // max(1, self.rri_proc.min_distance) + 2, dtype=np.int64)
+
+        config = {'fs': fs, 'buffer_len': buffer_len, 'accel_fs': accel_fs, 'stages': stages,
+                  'stats_enabled': stats_enabled}
+        self._conn, child_conn = ctx.Pipe()
+        self.worker = ctx.Process(
+            target=_worker_main, name="dsp-worker", daemon=True,
+            args=(config, self.ppg_buffer.spec(), self.accel_buffer.spec(), self.result_window.spec(),
+                  self.result_peaks.spec(), self.buffer_lock, child_conn))
+        self.worker.start()
+        child_conn.close()
+        self._pending = None  # 已请求、尚未收集的处理对应的 ingest_time
+
+        # 流水线在子进程中运行：分阶段计时与每 tick 分配数随结果回传
+        self._last_allocations = 0
+        self.stats.allocations = lambda: self._last_allocations
+
+    # ---------------------- 两阶段处理 ----------------------
+    def request_process(self):
+        """通知子进程按当前订阅处理新样本，不等待结果；已有未收集的请求时不重复发送"""
+        if self._pending is None:
+            self._pending = (self._last_arrival,)
+            self._conn.send((self.subscriptions.active(), self.stats.enabled))
+
+    def _process_latest(self):
+        self.request_process()
+        if not self._conn.poll(self.REPLY_TIMEOUT):
+            raise TimeoutError("处理进程无响应")
+        reply = self._conn.recv()
+        ingest_time, = self._pending
+        self._pending = None
+        if isinstance(reply, Exception):
+            raise reply
+        seq, window_len, n_peaks, quality, bpm, hrv, timings, allocations = reply
+        self._last_allocations = allocations
+        if self.stats.enabled:
+            for name, seconds in timings:
+                self.stats.record(name, seconds)
+
+        # 加速度不经子进程，按父进程当前订阅直接从共享输入缓冲拷贝
+        accel = None
+        if self.subscriptions.wants(ACCEL):
+            with self.buffer_lock:
+                accel = self.get_accel_buffer().copy()
+                accel_seq = self.accel_index
+
+        self.latest_quality = quality
+        if self.subscriptions.wants(QUALITY):
+            self.signals.quality_updated.emit(quality)
+        if bpm is not None:
+            self.latest_bpm = bpm
+            self.signals.hr_updated.emit(bpm)
+        if hrv is not None:
+            self.latest_hrv = hrv
+            self.signals.hrv_updated.emit(hrv)
+        if window_len is not None:
+            # 子进程只在两次请求之间写结果缓冲，此处读取无需加锁
+            normalized_ppg = np.array(self.result_window.latest(window_len))
+            peaks = np.array(self.result_peaks.latest(n_peaks))
+            self.signals.processed_ppg.emit(ProcessedWindow(normalized_ppg, seq, self.fs, peaks, ingest_time))
+        if accel is not None:
+            self.signals.processed_accel.emit(ProcessedWindow(accel, accel_seq, self.accel_fs))
+
+    # ---------------------- 停止 ----------------------
+    def stop(self):
+        super().stop()
+        try:
+            self._conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.worker.join(timeout=2.0)
+        if self.worker.is_alive():
+            self.worker.terminate()
+            self.worker.join()
+        self._conn.close()
+        for ring in (self.ppg_buffer, self.accel_buffer, self.result_window, self.result_peaks):
+            ring.close()
@@ -0,0 +1,40 @@
+# watch-gui/ble/results.py
+import numpy as np
+
+
+class ProcessedWindow:
+    """
+    一次处理得到的结果快照，经 Qt 信号按引用传递（不做 list 转换）
+    - data  : 只读 ndarray，按时间顺序的处理窗口（PPG 为 (n,)，加速度为 (n,3)）
+    - seq   : 窗口最后一个样本之后的累计样本序号，即截至本窗口共产生的样本数
+    - fs    : 采样率
+    - peaks : 窗口内检测到的峰索引（相对 data，可为空）
+    - ingest_time : 窗口内最新样本到达主机的时刻（time.monotonic），用于统计端到端延迟
+    消费者记录上次看到的 seq，用 since()/new_count() 只取尚未处理过的样本。
+    """
+    __slots__ = ('data', 'seq', 'fs', 'peaks', 'ingest_time')
+
+    def __init__(self, data, seq, fs, peaks=None, ingest_time=None):
+        data = np.asarray(data)
+        data.flags.writeable = False
+        self.data = data
+        self.seq = seq
+        self.fs = fs
+        self.peaks = np.zeros(0, dtype=np.int64) if peaks is None else np.asarray(peaks)
+        self.ingest_time = ingest_time
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def start_seq(self):
+        """窗口第一个样本的累计序号"""
+        return self.seq - len(self.data)
+
+    def new_count(self, last_seq):
+        """相对 last_seq 新增、且仍在窗口内的样本数"""
+        return max(0, min(len(self.data), self.seq - last_seq))
+
+    def since(self, last_seq):
+        """返回相对 last_seq 新增的样本（只读视图）"""
+        return self.data[len(self.data) - self.new_count(last_seq):]
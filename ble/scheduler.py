@@ -0,0 +1,61 @@
+# watch-gui/ble/scheduler.py
+import threading
+import time
+from threading import Thread
+
+
+class ProcessingScheduler(Thread):
+    """
+    处理调度线程：在独立线程中按固定步长 hop 调用处理函数
+    - 步长可在运行中通过 set_hop() 调整（如 100 ms ~ 1 s）
+    - 处理耗时超过步长时跳过错过的 tick，而不是排队补跑
+    - 处理函数自行通过信号把最终结果交给 GUI
+    """
+    def __init__(self, task, hop_ms=1000, on_error=None):
+        super().__init__(daemon=True)
+        self.task = task
+        self.on_error = on_error
+        self.hop = 0.0
+        self.set_hop(hop_ms)
+        self.running = True
+        self._stop_event = threading.Event()
+
+        # 运行统计
+        self.ticks = 0
+        self.skipped = 0
+        self.last_duration = 0.0
+
+    def set_hop(self, hop_ms):
+        if hop_ms <= 0:
+            raise ValueError(f"处理步长必须为正数: {hop_ms}")
+        self.hop = hop_ms / 1000.0
+
+    def run(self):
+        next_tick = time.monotonic() + self.hop
+        while self.running:
+            delay = next_tick - time.monotonic()
+            if delay > 0 and self._stop_event.wait(delay):
+                break
+
+            start = time.monotonic()
+            try:
+                self.task()
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(e)
+            end = time.monotonic()
+            self.ticks += 1
+            self.last_duration = end - start
+
+            # 落后时直接对齐到下一个未来的 tick，错过的 tick 计入 skipped
+            next_tick += self.hop
+            if end > next_tick:
+                missed = int((end - next_tick) // self.hop) + 1
+                self.skipped += missed
+                next_tick += missed * self.hop
+
+    def stop(self):
+        self.running = False
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
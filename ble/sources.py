@@ -0,0 +1,190 @@
+# watch-gui/ble/sources.py
+"""
+可插拔数据源：WatchWorker 通过 source.run(handler, status) 获取原始通知包
+- BleSource       : 真实手表（ConnectionManager）
+- SyntheticSource : 合成 PPG + 加速度，按协议组成 0xFFFA / 0xFFFB 包
+- ReplaySource    : 回放 storage.session_file 录制的会话
+合成与回放源支持 speed：1.0 为实时，N 为 N 倍速，0/None 为不限速。
+"""
+import asyncio
+import heapq
+import time
+
+import numpy as np
+
+from ble.connection import ConnectionManager
+from ble.packet_decoder import encode_packet
+from signal_processing.sync import TIMESTAMP_WRAP
+from storage.session_file import SessionReader
+
+
+class DataSource:
+    """数据源接口：run() 持续以 handler(sender, data) 送出原始通知包，直到 stop() 或数据结束"""
+    def __init__(self):
+        self.running = True
+
+    async def run(self, handler, status):
+        raise NotImplementedError
+
+    def stop(self):
+        self.running = False
+
+
+# ====================================================
+# ================== 真实手表 =========================
+# ====================================================
+class BleSource(DataSource):
+    def __init__(self, device_name, connect_timeout=40, **connection_kwargs):
+        super().__init__()
+        self.device_name = device_name
+        self.connect_timeout = connect_timeout
+        self.connection_kwargs = connection_kwargs
+        self.connection = None
+
+    @property
+    def client(self):
+        return self.connection.client if self.connection is not None else None
+
+    async def run(self, handler, status):
+        self.connection = ConnectionManager(
+            self.device_name, handler, status=status,
+            connect_timeout=self.connect_timeout, **self.connection_kwargs)
+        await self.connection.run()
+
+    def stop(self):
+        super().stop()
+        if self.connection is not None:
+            self.connection.stop()
+
+
+# ====================================================
+# ================== 限速基类 =========================
+# ====================================================
+class PacedSource(DataSource):
+    """按数据自身时间轴限速送包：数据时间 t 的包在 t / speed 的墙钟时刻送出"""
+    YIELD_EVERY = 64  # 不限速时每送出这么多包让出一次事件循环
+
+    def __init__(self, speed=1.0):
+        super().__init__()
+        self.speed = speed
+        self.sent_packets = 0
+
+    def packets(self):
+        """按时间顺序产生 (数据时间秒, 原始包)"""
+        raise NotImplementedError
+
+    async def run(self, handler, status):
+        status("✅ 数据源连接成功")
+        status("📡 开始接收数据")
+        start = time.monotonic()
+        t0 = None
+        for t, packet in self.packets():
+            if not self.running:
+                break
+            if t0 is None:
+                t0 = t
+            if self.speed:
+                delay = start + (t - t0) / self.speed - time.monotonic()
+                if delay > 0.001:
+                    await asyncio.sleep(delay)
+            elif self.sent_packets % self.YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+
+            result = handler(None, packet)
+            if asyncio.iscoroutine(result):
+                await result
+            self.sent_packets += 1
+        status("⏹ 数据源已结束")
+
+
+# ====================================================
+# ================== 合成数据 =========================
+# ====================================================
+class SyntheticSource(PacedSource):
+    """
+    合成 PPG + 三轴加速度
+    - PPG：心率基频 + 重搏波谐波 + 呼吸基线漂移 + 噪声，叠加在直流分量上
+    - 加速度：重力分量 + motion 幅度的周期运动，并按 motion_coupling 耦合到 PPG 形成运动伪影
+    duration 为 None 时无限产生。相同 seed 产生完全相同的数据。
+    """
+    def __init__(self, fs=100, hr_bpm=72.0, duration=None, speed=1.0, ppg_per_packet=10,
+                 accel_per_packet=10, motion=0.0, motion_coupling=0.3, noise=5.0, seed=0):
+        super().__init__(speed)
+        self.fs = fs
+        self.hr_bpm = hr_bpm
+        self.duration = duration
+        self.ppg_per_packet = ppg_per_packet
+        self.accel_per_packet = accel_per_packet
+        self.motion = motion
+        self.motion_coupling = motion_coupling
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+
+    def generate(self, start, count):
+        """生成样本序号 [start, start+count) 的 PPG (uint16) 与加速度 (int16, (n,3))"""
+        t = (start + np.arange(count)) / self.fs
+        phase = 2 * np.pi * self.hr_bpm / 60.0 * t
+        pulse = np.sin(phase) + 0.4 * np.sin(2 * phase + 0.8)
+        baseline = 0.3 * np.sin(2 * np.pi * 0.25 * t)
+        movement = self.motion * np.sin(2 * np.pi * 2.0 * t)
+
+        ppg = 30000 + 800 * (pulse + baseline) + self.motion_coupling * movement \
+            + self.noise * self.rng.standard_normal(count)
+        accel = np.empty((count, 3))
+        accel[:, 0] = movement
+        accel[:, 1] = 0.5 * movement
+        accel[:, 2] = 4096 + 0.2 * movement
+        accel += self.noise * self.rng.standard_normal((count, 3))
+        return (np.clip(ppg, 0, 65535).astype(np.uint16),
+                np.clip(accel, -32768, 32767).astype(np.int16))
+
+    def packets(self):
+        total = None if self.duration is None else int(self.duration * self.fs)
+        step = max(self.ppg_per_packet, self.accel_per_packet)
+        index = 0
+        while total is None or index < total:
+            count = step if total is None else min(step, total - index)
+            ppg, accel = self.generate(index, count)
+            events = [(i, 'ppg', ppg[i:i + self.ppg_per_packet])
+                      for i in range(0, count, self.ppg_per_packet)]
+            events += [(i, 'accel', accel[i:i + self.accel_per_packet])
+                       for i in range(0, count, self.accel_per_packet)]
+            events.sort(key=lambda e: e[0])
+            for i, kind, block in events:
+                t = (index + i) / self.fs
+                yield t, encode_packet(kind, block, int(t * 1000))
+            index += count
+
+
+# ====================================================
+# ================== 会话回放 =========================
+# ====================================================
+class ReplaySource(PacedSource):
+    """
+    回放录制的会话（storage.session_file 格式），PPG 与加速度按设备时间戳合并后重新组包
+    设备时间戳按毫秒解释用于限速；单包负载超过协议上限时自动拆分，
+    拆出的各段按采样率推算时间戳（accel_fs 缺省取录制元数据，旧录制未记录时按 PPG 采样率）。
+    """
+    def __init__(self, path, speed=1.0, accel_fs=None):
+        super().__init__(speed)
+        self.reader = SessionReader(path)
+        self.rates = {'ppg': self.reader.fs,
+                      'accel': accel_fs or self.reader.meta.get('accel_fs') or self.reader.fs}
+
+    def _stream(self, kind):
+        max_samples = 127 if kind == 'ppg' else 42
+        rate = self.rates[kind]
+        for order, (ts, block) in enumerate(self.reader.packets(kind)):
+            for i in range(0, len(block), max_samples):
+                split_ts = (ts + int(round(i * 1000 / rate))) % TIMESTAMP_WRAP
+                yield split_ts, order, kind, block[i:i + max_samples]
+
+    def blocks(self):
+        """按设备时间戳合并两路数据，产生 (timestamp, kind, block)；与 packets() 的组包顺序相同"""
+        merged = heapq.merge(self._stream('ppg'), self._stream('accel'), key=lambda item: item[0])
+        for ts, _, kind, block in merged:
+            yield ts, kind, block
+
+    def packets(self):
+        for ts, kind, block in self.blocks():
+            yield ts / 1000.0, encode_packet(kind, block, ts)
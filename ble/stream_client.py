@@ -0,0 +1,136 @@
+# watch-gui/ble/stream_client.py
+import asyncio
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from ble import stream_protocol as sp
+from ble.subscriptions import ACCEL, HR, HRV, PEAKS, PPG, QUALITY, Subscriptions
+
+# 帧类型 → 输出流；未列出的类型（hello / 状态 / 统计）总是转发
+MESSAGE_STREAMS = {
+    sp.MSG_PPG: PPG, sp.MSG_ACCEL: ACCEL, sp.MSG_BEATS: PEAKS,
+    sp.MSG_HR: HR, sp.MSG_QUALITY: QUALITY, sp.MSG_HRV: HRV,
+}
+
+
+async def open_stream(address):
+    """连接采集服务输出流，返回 (reader, writer)"""
+    kind, *target = sp.parse_address(address)
+    if kind == 'unix':
+        return await asyncio.open_unix_connection(target[0])
+    return await asyncio.open_connection(*target)
+
+
+async def iter_messages(reader):
+    """逐帧解码输出流，产生 (type, 消息对象)，连接关闭时结束"""
+    while True:
+        try:
+            msg_type, payload = await sp.read_frame(reader)
+        except asyncio.IncompleteReadError:
+            return
+        yield msg_type, sp.decode_payload(msg_type, payload)
+
+
+class StreamClientWorker(QThread):
+    """
+    采集服务（daemon.py）的订阅客户端，信号与 WatchWorker 相同，可直接替代其接入 GUI
+    - 只接收结果帧，连接断开后按 RETRY_INTERVAL 自动重连
+    - 统计开关与处理步长由采集服务的启动参数决定，此处的对应方法为空操作
+    - subscribe / unsubscribe 与 WatchWorker 相同：未订阅的流在本地丢弃，不发出信号
+    """
+    ppg_signal = pyqtSignal(object)    # ProcessedWindow
+    accel_signal = pyqtSignal(object)  # ProcessedWindow（仅新样本）
+    status_signal = pyqtSignal(str)
+    hr_signal = pyqtSignal(float)
+    quality_signal = pyqtSignal(object)  # SignalQuality
+    hrv_signal = pyqtSignal(object)
+    stats_signal = pyqtSignal(object)
+    beats_signal = pyqtSignal(object)  # 心搏累计样本序号 int64 数组
+
+    RETRY_INTERVAL = 2.0
+
+    def __init__(self, address=sp.DEFAULT_ADDRESS, streams=()):
+        super().__init__()
+        self.address = address
+        self.subscriptions = Subscriptions(streams)
+        self.running = True
+        self.loop = None
+        self.hello = None
+        self.latest_ppg = None
+        self._writer = None
+        self._dispatch = {
+            sp.MSG_PPG: self._on_ppg,
+            sp.MSG_ACCEL: self.accel_signal.emit,
+            sp.MSG_HR: self.hr_signal.emit,
+            sp.MSG_BEATS: self.beats_signal.emit,
+            sp.MSG_QUALITY: self.quality_signal.emit,
+            sp.MSG_HRV: self.hrv_signal.emit,
+            sp.MSG_STATS: self.stats_signal.emit,
+            sp.MSG_STATUS: self.status_signal.emit,
+            sp.MSG_HELLO: self._on_hello,
+        }
+
+    def _on_ppg(self, result):
+        self.latest_ppg = result
+        self.ppg_signal.emit(result)
+
+    def _on_hello(self, hello):
+        self.hello = hello
+        self.status_signal.emit(f"✅ 采集服务连接成功: {hello.get('device')}（{self.address}）")
+
+    # ---------------------- 接收 ----------------------
+    async def listen(self):
+        while self.running:
+            self.status_signal.emit(f"🔗 正在连接采集服务 {self.address}...")
+            try:
+                reader, self._writer = await open_stream(self.address)
+            except OSError as e:
+                self.status_signal.emit(f"❌ 采集服务连接失败: {e}")
+                await asyncio.sleep(self.RETRY_INTERVAL)
+                continue
+            try:
+                async for msg_type, message in iter_messages(reader):
+                    handler = self._dispatch.get(msg_type)
+                    stream = MESSAGE_STREAMS.get(msg_type)
+                    if handler is not None and (stream is None or self.subscriptions.wants(stream)):
+                        handler(message)
+            except (sp.ProtocolError, OSError) as e:
+                self.status_signal.emit(f"❌ 输出流异常: {e}")
+            finally:
+                self._writer.close()
+                self._writer = None
+            if self.running:
+                self.status_signal.emit("⚠️ 采集服务连接断开，正在重连...")
+                await asyncio.sleep(self.RETRY_INTERVAL)
+
+    # ---------------------- 与 WatchWorker 相同的接口 ----------------------
+    def set_stats_enabled(self, enabled):
+        """统计由采集服务的 --stats 决定；启用时 stats_signal 照常收到快照"""
+
+    def report_display(self, result):
+        """跨进程无法对齐 ingest_time，不记录端到端延迟"""
+
+    def set_hop_ms(self, hop_ms):
+        """处理步长由采集服务的 --hop-ms 决定"""
+
+    def subscribe(self, *streams):
+        self.subscriptions.subscribe(*streams)
+
+    def unsubscribe(self, *streams):
+        self.subscriptions.unsubscribe(*streams)
+
+    # ---------------------- 线程控制 ----------------------
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.listen())
+        except RuntimeError:
+            pass  # stop() 停止了事件循环
+
+    def stop(self):
+        self.running = False
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self.quit()
+        self.wait()
@@ -0,0 +1,165 @@
+# watch-gui/ble/stream_protocol.py
+"""
+采集服务输出流的帧格式（小端）
+
+    帧      : FRAME 头 | payload
+    FRAME 头: MAGIC(2) | version(u1) | type(u1) | payload_len(u4)
+
+payload 按类型：
+    HELLO / STATUS / QUALITY / HRV / STATS : UTF-8 JSON（STATUS 为字符串）
+    HR     : bpm(f8)
+    BEATS  : 心搏位置的累计样本序号 int64[N]
+    PPG    : WINDOW 头 | float32[n]     | peaks int64[m]   （完整处理窗口，m 为窗口内峰数）
+    ACCEL  : WINDOW 头 | float32[n, 3]                      （只含上一帧之后的新样本）
+    WINDOW 头: seq(i8) | fs(f4) | n(u4) | m 或通道数(u4)
+
+订阅者连接后先收到 HELLO，随后是各类型最近一帧（如已有），之后为实时帧。
+地址格式：unix:/path/to.sock 或 tcp:host:port（也可省略 tcp: 前缀）。
+"""
+import json
+import struct
+
+import numpy as np
+
+from ble.results import ProcessedWindow
+from signal_processing.quality import SignalQuality
+
+MAGIC = b'WG'
+VERSION = 1
+
+FRAME_HEADER = struct.Struct('<2sBBI')   # magic, version, type, payload_len
+WINDOW_HEADER = struct.Struct('<qfII')   # seq, fs, n, m / channels
+HR_PAYLOAD = struct.Struct('<d')
+MAX_PAYLOAD = 64 * 1024 * 1024
+
+MSG_HELLO = 1
+MSG_STATUS = 2
+MSG_PPG = 3
+MSG_ACCEL = 4
+MSG_HR = 5
+MSG_BEATS = 6
+MSG_QUALITY = 7
+MSG_HRV = 8
+MSG_STATS = 9
+
+MSG_NAMES = {
+    MSG_HELLO: 'hello', MSG_STATUS: 'status', MSG_PPG: 'ppg', MSG_ACCEL: 'accel', MSG_HR: 'hr',
+    MSG_BEATS: 'beats', MSG_QUALITY: 'quality', MSG_HRV: 'hrv', MSG_STATS: 'stats',
+}
+
+DEFAULT_ADDRESS = "tcp:127.0.0.1:8765"
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+# ====================================================
+# ==================== 地址解析 =======================
+# ====================================================
+def parse_address(address):
+    """返回 ('unix', path) 或 ('tcp', host, port)"""
+    if address.startswith("unix:"):
+        return 'unix', address[len("unix:"):]
+    if address.startswith("tcp:"):
+        address = address[len("tcp:"):]
+    host, sep, port = address.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"无法解析地址: {address}（应为 unix:/path 或 tcp:host:port）")
+    return 'tcp', host or "127.0.0.1", int(port)
+
+
+# ====================================================
+# ==================== 编码 ===========================
+# ====================================================
+def encode_frame(msg_type, payload):
+    return FRAME_HEADER.pack(MAGIC, VERSION, msg_type, len(payload)) + payload
+
+
+def _json_default(obj):
+    if isinstance(obj, SignalQuality):
+        return {name: getattr(obj, name) for name in SignalQuality.__slots__}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"无法序列化 {type(obj).__name__}")
+
+
+def encode_json(msg_type, obj):
+    return encode_frame(msg_type, json.dumps(obj, default=_json_default, ensure_ascii=False).encode('utf-8'))
+
+
+def encode_hr(bpm):
+    return encode_frame(MSG_HR, HR_PAYLOAD.pack(bpm))
+
+
+def encode_beats(positions):
+    return encode_frame(MSG_BEATS, np.ascontiguousarray(positions, dtype='<i8').tobytes())
+
+
+def encode_ppg(result):
+    """完整处理窗口 + 窗口内峰索引"""
+    data = np.ascontiguousarray(result.data, dtype='<f4')
+    peaks = np.ascontiguousarray(result.peaks, dtype='<i8')
+    header = WINDOW_HEADER.pack(result.seq, result.fs, len(data), len(peaks))
+    return encode_frame(MSG_PPG, header + data.tobytes() + peaks.tobytes())
+
+
+def encode_accel(data, seq, fs):
+    """加速度新样本块 (n, 3)，seq 为块最后一个样本之后的累计序号"""
+    data = np.ascontiguousarray(data, dtype='<f4').reshape(-1, 3)
+    header = WINDOW_HEADER.pack(seq, fs, len(data), 3)
+    return encode_frame(MSG_ACCEL, header + data.tobytes())
+
+
+# ====================================================
+# ==================== 解码 ===========================
+# ====================================================
+def _decode_window(payload, msg_type):
+    seq, fs, n, m = WINDOW_HEADER.unpack_from(payload)
+    offset = WINDOW_HEADER.size
+    if msg_type == MSG_PPG:
+        data = np.frombuffer(payload, dtype='<f4', count=n, offset=offset)
+        peaks = np.frombuffer(payload, dtype='<i8', count=m, offset=offset + 4 * n)
+        return ProcessedWindow(data, seq, fs, peaks)
+    data = np.frombuffer(payload, dtype='<f4', count=n * m, offset=offset).reshape(n, m)
+    return ProcessedWindow(data, seq, fs)
+
+
+def decode_payload(msg_type, payload):
+    """
+    按类型还原消息：PPG / ACCEL 为 ProcessedWindow，HR 为 float，BEATS 为 int64 数组，
+    QUALITY 为 SignalQuality，其余 JSON 类型为 dict / str
+    """
+    if msg_type in (MSG_PPG, MSG_ACCEL):
+        return _decode_window(payload, msg_type)
+    if msg_type == MSG_HR:
+        return HR_PAYLOAD.unpack(payload)[0]
+    if msg_type == MSG_BEATS:
+        return np.frombuffer(payload, dtype='<i8')
+    if msg_type in MSG_NAMES:
+        obj = json.loads(payload.decode('utf-8'))
+        if msg_type == MSG_QUALITY:
+            return SignalQuality(**obj)
+        return obj
+    raise ProtocolError(f"未知消息类型: {msg_type}")
+
+
+def decode_header(header):
+    """返回 (type, payload_len)"""
+    magic, version, msg_type, length = FRAME_HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ProtocolError(f"帧头校验失败: {magic!r}")
+    if version != VERSION:
+        raise ProtocolError(f"不支持的协议版本: {version}")
+    if length > MAX_PAYLOAD:
+        raise ProtocolError(f"帧长度异常: {length}")
+    return msg_type, length
+
+
+async def read_frame(reader):
+    """从 asyncio.StreamReader 读取一帧，返回 (type, payload)；连接关闭时抛出 asyncio.IncompleteReadError"""
+    msg_type, length = decode_header(await reader.readexactly(FRAME_HEADER.size))
+    payload = await reader.readexactly(length) if length else b''
+    return msg_type, payload
@@ -0,0 +1,239 @@
+# watch-gui/ble/stream_server.py
+import asyncio
+import itertools
+import logging
+import os
+from collections import deque
+
+from PyQt5.QtCore import Qt
+
+from ble import stream_protocol as sp
+from ble.subscriptions import STREAMS
+
+logger = logging.getLogger(__name__)
+
+
+# ====================================================
+# ================== 订阅者 ===========================
+# ====================================================
+class Subscriber:
+    """
+    一个订阅连接：有界帧队列 + 独立发送协程
+    - push() 只入队、从不等待；队列满时丢弃最早的帧并计数
+    - 发送协程逐帧写出并等待 drain()，慢消费者只阻塞自己的协程，不影响采集与其他订阅者
+    - label 为 "#编号 对端地址"：Unix 套接字的对端没有地址，按连接序号区分
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, writer, max_frames):
+        self.writer = writer
+        self.queue = deque()
+        self.max_frames = max_frames
+        self.dropped = 0
+        self.sent = 0
+        self._ready = asyncio.Event()
+        self.closed = False
+        self.id = next(self._ids)
+        peer = writer.get_extra_info('peername')
+        self.peer = str(peer) if peer else "unix"
+        self.label = f"#{self.id} {self.peer}"
+
+    def push(self, frame):
+        if self.closed:
+            return
+        if len(self.queue) >= self.max_frames:
+            self.queue.popleft()
+            self.dropped += 1
+        self.queue.append(frame)
+        self._ready.set()
+
+    async def send_loop(self):
+        try:
+            while not self.closed:
+                await self._ready.wait()
+                self._ready.clear()
+                while self.queue:
+                    self.writer.write(self.queue.popleft())
+                    self.sent += 1
+                    await self.writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.closed = True
+            self.writer.close()
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+
+# ====================================================
+# ================== 输出服务 =========================
+# ====================================================
+class StreamServer:
+    """
+    本地输出流服务（Unix 套接字或 TCP），向任意数量的订阅者广播结果帧
+    - publish() 线程安全，可在处理线程中调用；帧在事件循环中分发到各订阅者队列
+    - 订阅者只接收数据，不向服务端发送；连接时先收到 hello 与各类型最近一帧
+    - on_subscribers(count) 在订阅者连接 / 断开后于事件循环线程中回调（ResultPublisher 据此启停计算）
+    """
+    MAX_FRAMES = 64               # 每个订阅者最多缓存的帧数
+    STICKY = (sp.MSG_STATUS, sp.MSG_HR, sp.MSG_QUALITY, sp.MSG_HRV, sp.MSG_STATS)
+
+    def __init__(self, address=sp.DEFAULT_ADDRESS, max_frames=MAX_FRAMES, hello=None):
+        self.address = sp.parse_address(address)
+        self.max_frames = max_frames
+        self.hello = dict(hello or {})
+        self.subscribers = set()
+        self.latest = {}          # 类型 → 最近一帧，新订阅者连接时补发
+        self.published = 0
+        self.loop = None
+        self.server = None
+        self.on_subscribers = None
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        if self.address[0] == 'unix':
+            path = self.address[1]
+            if os.path.exists(path):
+                os.unlink(path)  # 上次未正常退出留下的套接字文件
+            self.server = await asyncio.start_unix_server(self._on_connect, path)
+        else:
+            _, host, port = self.address
+            self.server = await asyncio.start_server(self._on_connect, host, port)
+        logger.info("输出流服务已启动: %s", self.describe())
+
+    def describe(self):
+        if self.address[0] == 'unix':
+            return f"unix:{self.address[1]}"
+        host, port = self.server.sockets[0].getsockname()[:2] if self.server else self.address[1:]
+        return f"tcp:{host}:{port}"
+
+    async def _on_connect(self, reader, writer):
+        sub = Subscriber(writer, self.max_frames)
+        sub.push(sp.encode_json(sp.MSG_HELLO, dict(self.hello, version=sp.VERSION)))
+        for msg_type in self.STICKY:
+            if msg_type in self.latest:
+                sub.push(self.latest[msg_type])
+        self.subscribers.add(sub)
+        logger.info("订阅者已连接: %s（共 %d）", sub.label, len(self.subscribers))
+        self._notify_subscribers()
+
+        # 订阅者不发送数据，读到 EOF 即断开
+        sender = asyncio.ensure_future(sub.send_loop())
+        try:
+            while await reader.read(4096):
+                pass
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            sub.close()
+            await sender
+            self.subscribers.discard(sub)
+            logger.info("订阅者已断开: %s（已发送 %d 帧，丢弃 %d 帧）", sub.label, sub.sent, sub.dropped)
+            self._notify_subscribers()
+
+    def _notify_subscribers(self):
+        if self.on_subscribers is not None:
+            self.on_subscribers(len(self.subscribers))
+
+    # ---------------------- 发布 ----------------------
+    def publish(self, msg_type, frame):
+        """可在任意线程调用：把已编码的帧交给事件循环分发"""
+        if self.loop is None or self.loop.is_closed():
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._broadcast, msg_type, frame)
+        except RuntimeError:
+            pass  # 事件循环已关闭
+
+    def _broadcast(self, msg_type, frame):
+        self.published += 1
+        if msg_type in self.STICKY:
+            self.latest[msg_type] = frame
+        for sub in self.subscribers:
+            sub.push(frame)
+
+    def status(self):
+        return {
+            'address': self.describe(),
+            'subscribers': len(self.subscribers),
+            'published': self.published,
+            'dropped': {sub.label: sub.dropped for sub in self.subscribers},
+        }
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            for sub in list(self.subscribers):
+                sub.close()
+            await self.server.wait_closed()
+        if self.address[0] == 'unix' and os.path.exists(self.address[1]):
+            os.unlink(self.address[1])
+
+
+# ====================================================
+# ================== 结果发布 =========================
+# ====================================================
+class ResultPublisher:
+    """
+    把 DataProcessor 的结果信号编码为帧发布到 StreamServer
+    - 以 Qt.DirectConnection 连接：槽在处理线程中直接执行，无需 Qt 事件循环 / QApplication
+    - PPG 发送完整处理窗口；加速度只发送上一帧之后的新样本；
+      心搏按累计样本序号去重后单独发送（BEATS）
+    - 有订阅者连接时订阅处理器的全部输出流，全部断开后退订（只录制时不做输出计算）
+    """
+    def __init__(self, processor, server):
+        self.processor = processor
+        self.server = server
+        self.active = False
+        self.last_beat = -1
+        self.accel_seq = 0
+        server.on_subscribers = self.on_subscribers
+        signals = processor.signals
+        signals.processed_ppg.connect(self.on_ppg, Qt.DirectConnection)
+        signals.processed_accel.connect(self.on_accel, Qt.DirectConnection)
+        signals.hr_updated.connect(self.on_hr, Qt.DirectConnection)
+        signals.quality_updated.connect(self.on_quality, Qt.DirectConnection)
+        signals.hrv_updated.connect(self.on_hrv, Qt.DirectConnection)
+        signals.status.connect(self.on_status, Qt.DirectConnection)
+        signals.stats.connect(self.on_stats, Qt.DirectConnection)
+
+    def on_subscribers(self, count):
+        active = count > 0
+        if active == self.active:
+            return
+        self.active = active
+        if active:
+            self.processor.subscriptions.subscribe(*STREAMS)
+        else:
+            self.processor.subscriptions.unsubscribe(*STREAMS)
+
+    def on_ppg(self, result):
+        self.server.publish(sp.MSG_PPG, sp.encode_ppg(result))
+        beats = result.peaks + result.start_seq
+        beats = beats[beats > self.last_beat]
+        if len(beats):
+            self.last_beat = int(beats[-1])
+            self.server.publish(sp.MSG_BEATS, sp.encode_beats(beats))
+
+    def on_accel(self, result):
+        new = result.since(self.accel_seq)
+        self.accel_seq = result.seq
+        if len(new):
+            self.server.publish(sp.MSG_ACCEL, sp.encode_accel(new, result.seq, result.fs))
+
+    def on_hr(self, bpm):
+        self.server.publish(sp.MSG_HR, sp.encode_hr(bpm))
+
+    def on_quality(self, quality):
+        self.server.publish(sp.MSG_QUALITY, sp.encode_json(sp.MSG_QUALITY, quality))
+
+    def on_hrv(self, hrv):
+        self.server.publish(sp.MSG_HRV, sp.encode_json(sp.MSG_HRV, hrv))
+
+    def on_status(self, text):
+        self.server.publish(sp.MSG_STATUS, sp.encode_json(sp.MSG_STATUS, text))
+
+    def on_stats(self, snapshot):
+        self.server.publish(sp.MSG_STATS, sp.encode_json(sp.MSG_STATS, snapshot))
@@ -0,0 +1,50 @@
+# watch-gui/ble/subscriptions.py
+from threading import Lock
+
+# 输出流名称
+PPG = 'ppg'          # 归一化处理窗口（processed_ppg）
+ACCEL = 'accel'      # 加速度窗口（processed_accel）
+PEAKS = 'peaks'      # 处理窗口内的心搏位置（ProcessedWindow.peaks）
+HR = 'hr'            # 心率（hr_updated）
+QUALITY = 'quality'  # 信号质量（quality_updated）
+HRV = 'hrv'          # HRV 指标（hrv_updated）
+STREAMS = (PPG, ACCEL, PEAKS, HR, QUALITY, HRV)
+
+
+class Subscriptions:
+    """
+    输出流订阅计数：DataProcessor 每个 tick 只计算、发出有订阅者的流
+    - subscribe / unsubscribe 按引用计数，可在任意线程调用；多个消费者订阅同一流时全部退订才停止
+    - initial 中的流各计一次订阅（如离线分析、多设备管理等直接连接信号的使用方式）
+    """
+    def __init__(self, initial=STREAMS):
+        self._lock = Lock()
+        self._counts = dict.fromkeys(STREAMS, 0)
+        self.subscribe(*initial)
+
+    @staticmethod
+    def _check(streams):
+        for stream in streams:
+            if stream not in STREAMS:
+                raise ValueError(f"未知的输出流: {stream}（可选 {', '.join(STREAMS)}）")
+
+    def subscribe(self, *streams):
+        self._check(streams)
+        with self._lock:
+            for stream in streams:
+                self._counts[stream] += 1
+
+    def unsubscribe(self, *streams):
+        """退订；未订阅的流忽略"""
+        self._check(streams)
+        with self._lock:
+            for stream in streams:
+                self._counts[stream] = max(0, self._counts[stream] - 1)
+
+    def wants(self, stream):
+        return self._counts[stream] > 0
+
+    def active(self):
+        """当前有订阅者的流"""
+        with self._lock:
+            return frozenset(stream for stream, count in self._counts.items() if count)
@@ -1,286 +1,439 @@
 # watch-gui/ble/watch_worker.py
 import asyncio
+import logging
+import time
 import numpy as np
-import queue
-from threading import Thread
-from PyQt5.QtCore import QThread, QObject, pyqtSignal, QTimer
-from bleak import BleakScanner, BleakClient
-
-from signal_processing.filters import bandpass_filter, savgol_smooth, NLMSFilter
+from threading import Thread, Lock
+from PyQt5.QtCore import QThread, QObject, pyqtSignal
+
+from ble.ingest import IngestChannel, DROP_OLDEST
+from ble.instrumentation import PipelineStats, format_stats
+from ble.packet_decoder import decode_packet, decode_batch
+from ble.results import ProcessedWindow
+from ble.scheduler import ProcessingScheduler
+from ble.sources import BleSource
+from ble.subscriptions import ACCEL, HR, HRV, PEAKS, PPG, QUALITY, STREAMS, Subscriptions
+from storage.session_file import SessionWriter
+from signal_processing.hrv import HRVEngine
+from signal_processing.pipeline import DEFAULT_STAGES, PPGPipeline
+from signal_processing.quality import QualityAssessor, RUN_NLMS
+from signal_processing.ring_buffer import RingBuffer
+from signal_processing.sync import StreamSynchronizer
 from signal_processing.rri import RRIProcessor
-from signal_processing.normal import normalize_signal
 
-READ_CHAR_UUID = "000034F2-0000-1000-8000-00805F9B34FB"
+logger = logging.getLogger(__name__)
 
 
 # ====================================================
 # =============== 数据处理信号容器 ====================
 # ====================================================
 class DataProcessorSignals(QObject):
-    processed_ppg = pyqtSignal(np.ndarray)
-    processed_accel = pyqtSignal(np.ndarray)
+    processed_ppg = pyqtSignal(object)    # ProcessedWindow
+    processed_accel = pyqtSignal(object)  # ProcessedWindow
     hr_updated = pyqtSignal(float)
+    quality_updated = pyqtSignal(object)  # SignalQuality，每次处理都发出，先于 hr_updated
+    hrv_updated = pyqtSignal(object)  # HRVEngine.update() 字典
+    status = pyqtSignal(str)
+    stats = pyqtSignal(object)  # PipelineStats.snapshot() 字典
 
 
 # ====================================================
 # ================== 数据处理线程 =====================
 # ====================================================
 class DataProcessor(Thread):
-    """数据处理线程：缓存数据并每秒执行一次滤波、RRI计算"""
-    def __init__(self, fs=100, buffer_len=2000):
+    """
+    数据处理线程：缓存数据；由调度线程定时调用 process_latest 执行滤波、RRI计算
+    输出流按订阅计算（见 ble.subscriptions）：streams 为初始订阅，运行中由消费者 subscriptions.subscribe/unsubscribe；
+    滤波与质量评估始终运行以保持流式状态连续，归一化、加速度拷贝、心搏检测、HRV 指标与各信号只在有订阅者时执行。
+    """
+    DROP_REPORT_INTERVAL = 2.0  # 丢包统计的最短上报间隔（秒）
+    REF_MAX_WAIT = 1.0          # PPG 领先最新加速度超过该时长（秒）视为加速度中断，不再等待 NLMS 参考
+
+    def __init__(self, fs=100, buffer_len=2000, queue_size=200, overflow_policy=DROP_OLDEST, recorder=None,
+                 stats_enabled=False, accel_fs=None, stages=None, streams=STREAMS):
         super().__init__()
         self.fs = fs
+        self.accel_fs = accel_fs or fs
         self.buffer_len = buffer_len
         self.running = True
 
-        # 信号对象
+        # 信号对象与输出流订阅
         self.signals = DataProcessorSignals()
-
-        # 队列（蓝牙线程放数据）
-        self.ppg_queue = queue.Queue(maxsize=100)
-        self.accel_queue = queue.Queue(maxsize=100)
-
-        # 环形缓冲
-        self.ppg_buffer = np.zeros(buffer_len, dtype=np.float32)
-        self.accel_buffer = np.zeros((buffer_len, 3), dtype=np.float32)
-        self.ppg_index = 0
-        self.accel_index = 0
-
-        # 滤波组件
-        self.nlms = NLMSFilter()
+        self.subscriptions = Subscriptions(streams)
+
+        # 接入通道（蓝牙线程放数据，PPG/加速度共用）
+        self.ingest = IngestChannel(maxsize=queue_size, policy=overflow_policy,
+                                    rates={'ppg': fs, 'accel': self.accel_fs})
+        self._last_drop_report = time.monotonic()
+
+        # 运行统计（默认关闭，关闭时计时调用几乎无开销）；allocations 只统计滤波流水线（PPGPipeline）内的数组分配
+        self.stats = PipelineStats(
+            enabled=stats_enabled, fs=fs, queue_depth=self.ingest.qsize,
+            dropped=lambda: dict(self.ingest.total_dropped_samples),
+            allocations=lambda: self.ppg_filter.last_allocations)
+        self._last_arrival = None
+
+        # 会话录制（可选，storage.session_file.SessionWriter），在本线程中写盘
+        self.recorder = recorder
+
+        # 环形缓冲（写入线程与处理线程共享，由 buffer_lock 保护），seq 列保存逐样本时刻（秒）
+        self.buffer_lock = Lock()
+        self.sync = StreamSynchronizer(fs, self.accel_fs)
+        self.ppg_buffer = RingBuffer(buffer_len, dtype=np.float32, seq_dtype=np.float64)
+        accel_len = int(np.ceil(buffer_len * self.accel_fs / fs))
+        self.accel_buffer = RingBuffer(accel_len, channels=3, dtype=np.float32, seq_dtype=np.float64)
+
+        # 滤波流水线（流式：每次只处理新到达的样本）；stages 为阶段声明，见 signal_processing.pipeline
+        self.ppg_filter = PPGPipeline(fs=self.fs, output_len=buffer_len, stages=stages or DEFAULT_STAGES,
+                                      stats=self.stats)
+        self.nlms = self.ppg_filter.nlms
+        self._new_ppg = np.zeros(buffer_len, dtype=np.float32)    # 新样本拷贝的预分配缓冲
+        self._new_times = np.zeros(buffer_len, dtype=np.float64)
+        self.processed_index = 0
         self.rri_proc = RRIProcessor(fs=self.fs)
         self.latest_bpm = None
 
+        # 信号质量门控：决定本窗口运行/跳过 NLMS，或跳过心率估计
+        self.quality = QualityAssessor(fs=fs, accel_fs=self.accel_fs)
+        self.latest_quality = None
+        self._ppg_context = np.zeros(self.quality.ppg_len, dtype=np.float32)   # 质量评估上下文拷贝的预分配缓冲
+        self._accel_context = np.zeros((self.quality.accel_len, 3), dtype=np.float32)
+
+        # HRV：只接收新确认的心搏间期，增量更新 1min/5min/24h 窗口
+        self.hrv = HRVEngine()
+        self.latest_hrv = None
+
     # ---------------------- 主循环 ----------------------
     def run(self):
-        """持续从队列中取出原始数据并写入缓冲区"""
+        """每次唤醒取走接入通道中全部待处理数据块并写入缓冲区"""
         while self.running:
-            try:
-                raw_ppg = self.ppg_queue.get(timeout=0.1)
-                self._write_ppg_buffer(raw_ppg)
-                self.ppg_queue.task_done()
-            except queue.Empty:
-                pass
-
-            try:
-                accel_data = self.accel_queue.get(timeout=0.1)
-                self._write_accel_buffer(accel_data)
-                self.accel_queue.task_done()
-            except queue.Empty:
-                pass
+            items = self.ingest.drain(timeout=0.1)
+            self.write_blocks(items)
+            if self.recorder is not None:
+                for kind, block, timestamp in items:
+                    self.recorder.append(kind, block, timestamp)
+            self._report_drops()
+
+    def write_blocks(self, items):
+        """把 (kind, block, timestamp) 数据块依次写入环形缓冲；接入线程调用，离线分析（ble.batch）直接调用"""
+        with self.stats.stage("ingest"), self.buffer_lock:
+            for kind, block, timestamp in items:
+                if kind == 'ppg':
+                    self._write_ppg_buffer(block, timestamp)
+                elif kind == 'accel':
+                    self._write_accel_buffer(block, timestamp)
+                self.stats.count_samples(kind, len(block))
+
+    def submit(self, kind, block, timestamp=None):
+        """蓝牙回调调用：放入一个解码后的数据块，从不阻塞"""
+        if kind == 'ppg':
+            self._last_arrival = time.monotonic()
+        return self.ingest.put(kind, block, timestamp)
+
+    def _report_drops(self):
+        """按不高于 DROP_REPORT_INTERVAL 的频率汇总上报丢弃的样本数"""
+        now = time.monotonic()
+        if now - self._last_drop_report < self.DROP_REPORT_INTERVAL:
+            return
+        self._last_drop_report = now
+        packets, samples = self.ingest.pop_drop_counts()
+        if samples:
+            detail = "，".join(f"{kind} {samples[kind]} 个样本/{packets.get(kind, 0)} 包"
+                              for kind in sorted(samples))
+            self.signals.status.emit(f"⚠️ 数据过载，近 {self.DROP_REPORT_INTERVAL:.0f}s 丢弃：{detail}")
 
     # ---------------------- 环形缓冲 ----------------------
-    def _write_ppg_buffer(self, raw_ppg):
-        for d in raw_ppg:
-            self.ppg_buffer[self.ppg_index % self.buffer_len] = d
-            self.ppg_index += 1
+    def _write_ppg_buffer(self, raw_ppg, timestamp=None):
+        self.ppg_buffer.write(raw_ppg, seq=self.sync.ppg_times(len(raw_ppg), timestamp))
 
-    def _write_accel_buffer(self, accel_data):
-        for d in accel_data:
-            self.accel_buffer[self.accel_index % self.buffer_len] = d
-            self.accel_index += 1
+    def _write_accel_buffer(self, accel_data, timestamp=None):
+        self.accel_buffer.write(accel_data, seq=self.sync.accel_times(len(accel_data), timestamp))
+
+    @property
+    def ppg_index(self):
+        return self.ppg_buffer.total
+
+    @property
+    def accel_index(self):
+        return self.accel_buffer.total
 
     def get_ppg_buffer(self):
-        idx = self.ppg_index % self.buffer_len
-        return np.roll(self.ppg_buffer, -idx)
+        """按时间顺序返回整个 PPG 缓冲（未跨越边界时为视图）"""
+        return self.ppg_buffer.latest(self.buffer_len)
 
     def get_accel_buffer(self):
-        idx = self.accel_index % self.buffer_len
-        return np.roll(self.accel_buffer, -idx, axis=0)
+        """按时间顺序返回整个加速度缓冲（未跨越边界时为视图）"""
+        return self.accel_buffer.latest()
+
+    # ---------------------- 定时触发的集中预处理 ----------------------
+    def request_process(self):
+        """两阶段处理的第一步（进程后端在此通知子进程）；线程后端直接在 process_latest 中处理"""
 
-    # ---------------------- 每秒触发的集中预处理 ----------------------
     def process_latest(self):
-        """对最新缓冲执行滤波、NLMS、自适应平滑、RRI计算"""
-        raw_ppg = self.get_ppg_buffer()
-        accel = self.get_accel_buffer()
-
-        # 1️⃣ 带通滤波
-        filtered_ppg = bandpass_filter(raw_ppg, fs=self.fs)
-
-        # 2️⃣ NLMS去伪影（如果加速度足够长）
-        if len(accel) >= len(filtered_ppg):
-            ref = accel[-len(filtered_ppg):]
-            cleaned_ppg = np.array([
-                self.nlms.adapt(d, ref[i].flatten())
-                for i, d in enumerate(filtered_ppg)
-            ], dtype=np.float32)
-        else:
-            cleaned_ppg = filtered_ppg
-
-        # 3️⃣ 平滑
-        smoothed_ppg = savgol_smooth(cleaned_ppg)
-
-        # 4️⃣ 归一化
-        normalized_ppg = normalize_signal(smoothed_ppg)
-
-        # 5️⃣ RRI & HR
-        peaks = self.rri_proc.detect_peaks(normalized_ppg)
-        _, bpm = self.rri_proc.compute_rri(peaks)
+        """对新到达的样本执行流式滤波、NLMS、平滑，再对输出窗口做归一化与RRI计算"""
+        with self.stats.stage("total"):
+            self._process_latest()
+
+    def _process_latest(self):
+        # 在锁内取出新数据块及质量评估所需上下文的拷贝，处理过程不阻塞写入线程
+        with self.buffer_lock:
+            ppg_index = self.ppg_index
+            new_count = min(ppg_index - self.processed_index, self.buffer_len)
+            new_ppg, new_times = self._new_ppg[:new_count], self._new_times[:new_count]
+            self.ppg_buffer.latest_into(new_ppg, new_times)
+            if self.ppg_filter.uses_ref:
+                # 晚于最新加速度样本的 PPG 留到下次处理，NLMS 参考不在块尾取平
+                covered = self._ref_covered(new_times)
+                new_ppg, new_times = new_ppg[:covered], new_times[:covered]
+                ppg_index -= new_count - covered
+            self.processed_index = ppg_index
+            ppg_context = self.ppg_buffer.latest_into(self._ppg_context[:min(len(self.ppg_buffer), self.quality.ppg_len)])
+            accel_context = self.accel_buffer.latest_into(
+                self._accel_context[:min(len(self.accel_buffer), self.quality.accel_len)])
+            accel = self.get_accel_buffer().copy() if self.subscriptions.wants(ACCEL) else None
+            accel_seq = self.accel_index
+            ingest_time = self._last_arrival
+
+        # 0️⃣ 信号质量：静止时跳过 NLMS，运动严重/离腕时连同心率估计一起跳过
+        with self.stats.stage("quality"):
+            quality = self.quality.assess(ppg_context, accel_context)
+        self.latest_quality = quality
+        use_nlms = quality.decision == RUN_NLMS
+
+        # NLMS 参考：加速度按时间戳插值到新 PPG 样本的时刻（只读取覆盖该时段的尾部）；
+        # 跳过 NLMS 的窗口同样需要参考，用于推进抽头延迟线，恢复自适应时与参考信号保持连续
+        ref = None
+        if self.ppg_filter.uses_ref:
+            with self.stats.stage("sync"), self.buffer_lock:
+                ref = self.sync.resample(new_times, self.accel_buffer)
+
+        # 1️⃣~3️⃣ 流水线各阶段：默认为带通滤波 + NLMS去伪影 + 平滑（仅新数据块，状态跨调用保持）
+        new_smoothed = self.ppg_filter.process(new_ppg, ref, use_nlms=use_nlms)
+
+        # 4️⃣ 归一化（每次为新的只读快照；无人订阅 PPG 时跳过）
+        wants = self.subscriptions.wants
+        normalized_ppg = None
+        if wants(PPG):
+            with self.stats.stage("normalize"):
+                normalized_ppg = self.ppg_filter.normalized_window()
+
+        # 5️⃣ 流式心搏检测（只扫描新样本 + 回看余量）& HR；质量不合格或无人需要心搏时只推进序号
+        with self.stats.stage("peaks"):
+            if quality.hr_valid and (wants(HR) or wants(PEAKS) or wants(HRV)):
+                new_beats = self.rri_proc.update_stream(new_smoothed)
+                bpm = self.rri_proc.stream_bpm() if wants(HR) else None
+            else:
+                self.rri_proc.skip_stream(len(new_smoothed))
+                new_beats, bpm = (), None
+            if normalized_ppg is not None and wants(PEAKS):
+                peaks = self.rri_proc.peaks_in_window(self.ppg_filter.output_index, len(normalized_ppg))
+            else:
+                peaks = None
+        if wants(QUALITY):
+            self.signals.quality_updated.emit(quality)
         if bpm is not None:
             self.latest_bpm = bpm
             self.signals.hr_updated.emit(bpm)
 
-        # 6️⃣ 发信号更新GUI
-        self.signals.processed_ppg.emit(normalized_ppg)
-        self.signals.processed_accel.emit(accel)
+        # 6️⃣ HRV（仅在有新心搏时更新；无人订阅时只累积间期，不计算指标）
+        if len(new_beats):
+            with self.stats.stage("hrv"):
+                hrv = self._update_hrv(len(new_beats), metrics=wants(HRV))
+            if hrv is not None:
+                self.latest_hrv = hrv
+                self.signals.hrv_updated.emit(hrv)
+
+        # 7️⃣ 发信号更新GUI（只读快照按引用传递）
+        if normalized_ppg is not None:
+            self.signals.processed_ppg.emit(
+                ProcessedWindow(normalized_ppg, self.ppg_filter.output_index, self.fs, peaks, ingest_time))
+        if accel is not None:
+            self.signals.processed_accel.emit(ProcessedWindow(accel, accel_seq, self.accel_fs))
+
+    def _ref_covered(self, new_times):
+        """新 PPG 样本中时刻不晚于最新加速度样本的个数；加速度缺失或中断超过 REF_MAX_WAIT 时不等待"""
+        if len(new_times) == 0 or len(self.accel_buffer) == 0:
+            return len(new_times)
+        accel_end = self.accel_buffer.latest_seq(1)[0]
+        if new_times[-1] - accel_end > self.REF_MAX_WAIT:
+            return len(new_times)
+        return int(np.searchsorted(new_times, accel_end, side='right'))
+
+    def _update_hrv(self, new_count, metrics=True):
+        """把最近 new_count 个心搏对应的 RR 间期送入 HRV 引擎（跨越跳过区间的间期已剔除）；metrics=False 时只追加"""
+        ends, rr = self.rri_proc.stream_intervals(new_count)
+        if len(rr) == 0:
+            return None
+        if not metrics:
+            self.hrv.add(ends / self.fs, rr)
+            return None
+        return self.hrv.update(ends / self.fs, rr)
+
+    # ---------------------- 运行统计 ----------------------
+    def report_stats(self):
+        """汇总运行统计：发出 stats 信号并写一行日志，返回统计字典"""
+        snapshot = self.stats.snapshot()
+        self.signals.stats.emit(snapshot)
+        logger.info(format_stats(snapshot))
+        return snapshot
 
     # ---------------------- 停止线程 ----------------------
     def stop(self):
         self.running = False
+        self.ingest.close()
         self.join()
+        if self.recorder is not None:
+            self.recorder.close()
+
+
+BACKENDS = ('thread', 'process')
+
+
+def make_processor(backend='thread', **kwargs):
+    """按后端创建数据处理器：thread 为 DataProcessor，process 为 ble.process_backend.ProcessDataProcessor"""
+    if backend == 'thread':
+        return DataProcessor(**kwargs)
+    if backend == 'process':
+        from ble.process_backend import ProcessDataProcessor
+        return ProcessDataProcessor(**kwargs)
+    raise ValueError(f"未知处理后端: {backend}（可选 {', '.join(BACKENDS)}）")
 
 
 # ====================================================
 # ================== 蓝牙采集线程 =====================
 # ====================================================
 class WatchWorker(QThread):
-    """蓝牙采集主线程：负责连接、接收、定时处理与GUI更新"""
-    ppg_signal = pyqtSignal(list)
-    accel_signal = pyqtSignal(list)
+    """蓝牙采集主线程：负责连接、接收；定时处理在独立调度线程中执行，结果通过信号更新GUI"""
+    ppg_signal = pyqtSignal(object)    # ProcessedWindow
+    accel_signal = pyqtSignal(object)  # ProcessedWindow
     status_signal = pyqtSignal(str)
     hr_signal = pyqtSignal(float)
+    quality_signal = pyqtSignal(object)  # SignalQuality
+    hrv_signal = pyqtSignal(object)    # HRVEngine.update() 字典
+    stats_signal = pyqtSignal(object)  # PipelineStats.snapshot() 字典
 
     CONNECTION_TIMEOUT = 40
-    SCAN_SLEEP_INTERVAL = 1
-    SCAN_TIMEOUT = 3
+    PROCESS_HOP_MS = 1000
+    STATS_INTERVAL = 5.0
 
-    def __init__(self, device_name="Q31(ID-B4F7)", fs=100):
+    def __init__(self, device_name="Q31(ID-B4F7)", fs=100, overflow_policy=DROP_OLDEST, hop_ms=PROCESS_HOP_MS,
+                 record_path=None, source=None, stats_enabled=False, stats_interval=STATS_INTERVAL, accel_fs=None,
+                 backend='thread', stages=None, streams=()):
         super().__init__()
         self.device_name = device_name
         self.fs = fs
         self.running = True
         self.loop = None
-        self.client = None
+
+        # 数据源：默认为真实手表，也可传入 SyntheticSource / ReplaySource
+        self.source = source or BleSource(device_name, connect_timeout=self.CONNECTION_TIMEOUT)
 
         # ✅ 初始化数据处理线程
         self.buffer_len = 20 * self.fs
-        self.processor = DataProcessor(fs=fs, buffer_len=self.buffer_len)
+        recorder = SessionWriter(record_path, fs=fs, device_name=device_name,
+                                 meta={'accel_fs': accel_fs or fs}) if record_path else None
+        # backend='process' 时滤波/心搏检测在独立进程中运行，见 ble.process_backend
+        # 输出流默认无人订阅（录制不受影响）：窗口显示时 subscribe()，隐藏时 unsubscribe()
+        self.processor = make_processor(backend, fs=fs, buffer_len=self.buffer_len, overflow_policy=overflow_policy,
+                                        recorder=recorder, stats_enabled=stats_enabled, accel_fs=accel_fs,
+                                        stages=stages, streams=streams)
         self.processor.signals.processed_ppg.connect(self._on_processed_ppg)
         self.processor.signals.processed_accel.connect(self._on_processed_accel)
         self.processor.signals.hr_updated.connect(self.hr_signal.emit)
+        self.processor.signals.quality_updated.connect(self.quality_signal.emit)
+        self.processor.signals.hrv_updated.connect(self.hrv_signal.emit)
+        self.processor.signals.status.connect(self.status_signal.emit)
+        self.processor.signals.stats.connect(self.stats_signal.emit)
         self.processor.start()
 
-        # ✅ 每1秒触发一次预处理 + GUI更新
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_and_process)
-        self.timer.start(1000)
+        # 运行统计：启用时每 stats_interval 秒汇总一次（stats 信号 + 日志行）
+        self.stats_interval = stats_interval
+        self._last_stats_report = time.monotonic()
 
-        self.latest_ppg = np.array([], dtype=np.float32)
+        # ✅ 独立调度线程按 hop_ms 触发预处理，结果经信号排队送回GUI线程
+        self.scheduler = ProcessingScheduler(
+            self.update_and_process, hop_ms=hop_ms,
+            on_error=lambda e: self.status_signal.emit(f"数据处理异常: {e}"))
+        self.scheduler.start()
+
+        self.latest_ppg = None
 
     # ====================================================
     # ================ 蓝牙数据回调 ========================
     # ====================================================
     async def notification_handler(self, sender, data):
-        decoded = self.decode_data(data)
+        with self.processor.stats.stage("decode"):
+            decoded = self.decode_data(data)
         if not decoded:
             return
 
-        if decoded['type'] == 'ppg':
-            raw_ppg = np.array(decoded['data'], dtype=np.float32)
-            try:
-                self.processor.ppg_queue.put_nowait(raw_ppg)
-            except queue.Full:
-                self.status_signal.emit("⚠️ PPG队列已满，丢弃数据")
-
-        elif decoded['type'] == 'accel':
-            try:
-                self.processor.accel_queue.put_nowait(decoded['data'])
-            except queue.Full:
-                self.status_signal.emit("⚠️ 加速度队列已满，丢弃数据")
+        # 队列满时由接入通道按溢出策略处理并计数，不在此逐包上报
+        self.processor.submit(decoded['type'], decoded['data'], decoded['timestamp'])
 
     # ====================================================
-    # ================ 每秒更新 ============================
+    # ================ 定时更新 ============================
     # ====================================================
     def update_and_process(self):
-        """每秒触发：执行预处理 + 更新GUI"""
+        """调度线程中每个 hop 触发：执行预处理，完成后经信号更新GUI"""
         self.processor.process_latest()
-
-    def _on_processed_ppg(self, data):
-        self.latest_ppg = data
-        self.ppg_signal.emit(list(data))
-
-    def _on_processed_accel(self, data):
-        self.accel_signal.emit(list(data))
+        if self.processor.stats.enabled:
+            now = time.monotonic()
+            if now - self._last_stats_report >= self.stats_interval:
+                self._last_stats_report = now
+                self.processor.report_stats()
+
+    def set_stats_enabled(self, enabled):
+        """运行中开启/关闭统计；重新开启时清空旧数据"""
+        if enabled and not self.processor.stats.enabled:
+            self.processor.stats.reset()
+            self._last_stats_report = time.monotonic()
+        self.processor.stats.enabled = enabled
+
+    def report_display(self, result):
+        """GUI 显示完一个 ProcessedWindow 后调用，记录收包 → 显示的端到端延迟"""
+        if result.ingest_time is not None:
+            self.processor.stats.record_latency(time.monotonic() - result.ingest_time)
+
+    def set_hop_ms(self, hop_ms):
+        """调整处理/刷新步长（毫秒）"""
+        self.scheduler.set_hop(hop_ms)
+
+    def subscribe(self, *streams):
+        """订阅输出流（ble.subscriptions 中的名称），下一次处理起开始计算并发出"""
+        self.processor.subscriptions.subscribe(*streams)
+
+    def unsubscribe(self, *streams):
+        """退订输出流；所有消费者都退订后停止计算"""
+        self.processor.subscriptions.unsubscribe(*streams)
+
+    def _on_processed_ppg(self, result):
+        self.latest_ppg = result
+        self.ppg_signal.emit(result)
+
+    def _on_processed_accel(self, result):
+        self.accel_signal.emit(result)
 
     # ====================================================
     # ================ 蓝牙连接与监听 ======================
     # ====================================================
     async def connect_and_listen(self):
-        self.status_signal.emit("🔄 正在连接设备...")
-        target = None
-        start_time = asyncio.get_running_loop().time()
-
-        while True:
-            elapsed = asyncio.get_running_loop().time() - start_time
-            if elapsed > self.CONNECTION_TIMEOUT:
-                self.status_signal.emit("❌ 无法连接手表")
-                return
-
-            devices = await BleakScanner.discover(timeout=self.SCAN_TIMEOUT)
-            for d in devices:
-                if d.name == self.device_name:
-                    try:
-                        self.client = BleakClient(d)
-                        await self.client.connect()
-                        if self.client.is_connected:
-                            target = self.client
-                            self.status_signal.emit("✅ 扫描连接成功")
-                            break
-                    except Exception as e:
-                        self.status_signal.emit(f"连接异常: {e}")
-            if target:
-                break
-            await asyncio.sleep(self.SCAN_SLEEP_INTERVAL)
-
-        await target.start_notify(READ_CHAR_UUID, self.notification_handler)
-        self.status_signal.emit("📡 开始接收数据")
+        """从数据源接收通知包；真实手表由 BleSource 负责连接、断线重连与重新订阅"""
+        await self.source.run(self.notification_handler, self.status_signal.emit)
 
-        while self.running:
-            await asyncio.sleep(1)
+    @property
+    def client(self):
+        return getattr(self.source, 'client', None)
 
     # ====================================================
     # ================ BLE 数据解码 ========================
     # ====================================================
     def decode_data(self, data):
-        command = data[0:2]
-        if command == b'\xff\xfa':
-            min_len = 10
-        elif command == b'\xff\xfb':
-            min_len = 14
-        else:
-            return None
-        if len(data) < min_len:
-            return None
-
-        timestamp = int.from_bytes(data[2:6], 'little')
-        length = data[6]
-        crc = data[7 + length]
-        calc_crc = 0
-        for byte in data[0:7 + length]:
-            calc_crc ^= byte
-        if calc_crc != crc:
-            return None
+        """解码单个通知包，PPG 为 uint16 数组，加速度为 (n,3) int16 数组"""
+        return decode_packet(data)
 
-        if command == b'\xff\xfa':  # PPG
-            if length % 2 != 0:
-                return None
-            ppg_bytes = data[7:7 + length]
-            points = [int.from_bytes(ppg_bytes[i:i + 2], 'little')
-                      for i in range(0, len(ppg_bytes), 2)]
-            return {'type': 'ppg', 'data': points, 'timestamp': timestamp}
-
-        elif command == b'\xff\xfb':  # 加速度
-            if length % 6 != 0:
-                return None
-            accel_bytes = data[7:7 + length]
-            points = []
-            for i in range(0, len(accel_bytes), 6):
-                x = int.from_bytes(accel_bytes[i:i + 2], 'little', signed=True)
-                y = int.from_bytes(accel_bytes[i + 2:i + 4], 'little', signed=True)
-                z = int.from_bytes(accel_bytes[i + 4:i + 6], 'little', signed=True)
-                points.append((x, y, z))
-            return {'type': 'accel', 'data': points, 'timestamp': timestamp}
-        return None
+    def decode_batch(self, packets):
+        """批量解码多个通知包，见 ble.packet_decoder.decode_batch"""
+        return decode_batch(packets)
 
     # ====================================================
     # ================ 线程控制 ============================
@@ -295,8 +448,10 @@ class WatchWorker(QThread):
 
     def stop(self):
         self.running = False
+        self.source.stop()
         if self.loop and self.loop.is_running():
             self.loop.call_soon_threadsafe(self.loop.stop)
+        self.scheduler.stop()
         self.processor.stop()
         self.quit()
         self.wait()
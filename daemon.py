@@ -0,0 +1,72 @@
+"""
+无界面采集服务：连接手表（或合成 / 回放数据源）并处理，结果以二进制帧发布到本地套接字
+
+    python daemon.py --listen unix:/tmp/watch-gui.sock
+    python daemon.py --listen tcp:127.0.0.1:8765 --synthetic
+    python main.py --connect unix:/tmp/watch-gui.sock      # GUI 作为订阅者接入
+
+帧格式见 ble/stream_protocol.py。
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from ble.headless import HeadlessAcquisition
+from ble.ingest import DROP_OLDEST, OVERFLOW_POLICIES
+from ble.sources import ReplaySource, SyntheticSource
+from ble.stream_protocol import DEFAULT_ADDRESS
+from ble.stream_server import StreamServer
+from ble.watch_worker import BACKENDS
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="手表 PPG 无界面采集服务")
+    parser.add_argument("--device", default="Q31(ID-B4F7)", help="手表蓝牙名称")
+    parser.add_argument("--listen", default=DEFAULT_ADDRESS, help="输出地址：unix:/path 或 tcp:host:port")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--synthetic", action="store_true", help="使用合成数据源")
+    source.add_argument("--replay", metavar="PATH", help="回放录制的会话文件")
+    parser.add_argument("--speed", type=float, default=1.0, help="合成 / 回放速度（0 为不限速）")
+    parser.add_argument("--record", metavar="PATH", help="同时录制原始数据到会话文件")
+    parser.add_argument("--fs", type=int, default=100, help="PPG 采样率")
+    parser.add_argument("--hop-ms", type=int, default=HeadlessAcquisition.PROCESS_HOP_MS, help="处理步长（毫秒）")
+    parser.add_argument("--backend", choices=BACKENDS, default='thread', help="处理后端")
+    parser.add_argument("--overflow", choices=OVERFLOW_POLICIES, default=DROP_OLDEST, help="接入队列溢出策略")
+    parser.add_argument("--max-frames", type=int, default=StreamServer.MAX_FRAMES, help="每个订阅者最多缓存的帧数")
+    parser.add_argument("--stats", action="store_true", help="启用运行统计并定期发布")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+
+    source = None
+    if args.synthetic:
+        source = SyntheticSource(fs=args.fs, speed=args.speed)
+    elif args.replay:
+        source = ReplaySource(args.replay, speed=args.speed)
+
+    daemon = HeadlessAcquisition(
+        device_name=args.device, address=args.listen, fs=args.fs, overflow_policy=args.overflow,
+        hop_ms=args.hop_ms, record_path=args.record, source=source, stats_enabled=args.stats,
+        backend=args.backend, max_frames=args.max_frames)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, daemon.stop)
+            except (NotImplementedError, AttributeError):
+                pass  # Windows：Ctrl+C 以 KeyboardInterrupt 结束
+        await daemon.run()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,26 @@
 from PyQt5.QtWidgets import QMainWindow, QWidget, QStackedLayout, QStatusBar
+from gui.startup import ModuleLoader, profiler
 from gui.widget.connect_widget import ConnectWidget
 from gui.widget.menu_widget import MenuWidget
-from gui.ppg_window import PPGWindow
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
+
+
+def default_worker():
+    from ble.watch_worker import WatchWorker
+    return WatchWorker()
+
 
 class MainWindow(QMainWindow):
-    def __init__(self, worker):
+    """
+    主窗口：连接界面 → 菜单
+    启动时只依赖 PyQt；蓝牙 / 信号处理模块（bleak、SciPy）在连接界面显示后于后台线程导入，
+    导入完成再创建并启动 worker；绘图模块（matplotlib）在扫描期间后台预加载，首次打开波形窗口时才创建。
+    直接传入 worker 时跳过延迟加载；连接采集服务（daemon.py）时由 worker_factory / worker_modules 指定客户端。
+    """
+    WORKER_MODULES = ("ble.watch_worker",)
+    PLOT_MODULES = ("gui.ppg_window",)
+
+    def __init__(self, worker=None, worker_factory=default_worker, worker_modules=WORKER_MODULES):
         super().__init__()
         self.setWindowTitle("手表实时PPG监测")
         # 窗口大小设置
@@ -27,10 +42,15 @@ class MainWindow(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
 
-        # 蓝牙 Worker 信号
-        self.worker = worker
-        self.worker.status_signal.connect(self.update_status)
-        self.worker.start()
+        # 蓝牙 Worker：未直接传入时，等连接界面绘制后再在后台导入模块
+        self.worker = None
+        self.worker_factory = worker_factory
+        self.worker_modules = worker_modules
+        self._loaders = []
+        if worker is not None:
+            self._attach_worker(worker)
+        else:
+            QTimer.singleShot(0, self._load_worker)
 
         # 按钮信号
         self.menu_widget.open_plot_signal.connect(self.open_ppg_window)
@@ -41,6 +61,29 @@ class MainWindow(QMainWindow):
         # 记录波形窗口实例
         self.ppg_window = None
 
+    # 延迟加载
+    def _load_modules(self, modules, on_loaded):
+        loader = ModuleLoader(modules, self)
+        loader.loaded.connect(on_loaded)
+        loader.failed.connect(self.update_status)
+        self._loaders.append(loader)
+        loader.start()
+
+    def _load_worker(self):
+        self.connect_widget.set_message("正在加载蓝牙与信号处理模块...")
+        self._load_modules(self.worker_modules, self._create_worker)
+
+    def _create_worker(self):
+        self._attach_worker(self.worker_factory())
+        profiler.mark("worker 已启动，开始扫描")
+        # 扫描期间预加载绘图模块，打开波形窗口时无需再等待
+        self._load_modules(self.PLOT_MODULES, lambda: profiler.mark("绘图模块预加载完成"))
+
+    def _attach_worker(self, worker):
+        self.worker = worker
+        self.worker.status_signal.connect(self.update_status)
+        self.worker.start()
+
     # 界面切换
     def show_connect_page(self):
         self.stack.setCurrentWidget(self.connect_widget)
@@ -53,7 +96,9 @@ class MainWindow(QMainWindow):
     # 打开波形窗口
     def open_ppg_window(self):
         if self.ppg_window is None:
+            from gui.ppg_window import PPGWindow  # 首次打开时才加载 matplotlib（通常已在后台预加载）
             self.ppg_window = PPGWindow(self.worker, parent=self)
+            profiler.mark("波形窗口已创建")
         self.ppg_window.show()
         self.hide()  # 隐藏主窗口
 
@@ -67,7 +112,9 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """安全关闭"""
-        if self.worker.isRunning():
+        for loader in self._loaders:
+            loader.wait()
+        if self.worker is not None and self.worker.isRunning():
             self.worker.running = False
             if self.worker.loop and self.worker.loop.is_running():
                 try:
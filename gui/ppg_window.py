@@ -1,7 +1,12 @@
 from PyQt5.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QPushButton, QStatusBar, QHBoxLayout
 from gui.widget.plot_widget import PPGPlotWidget
+from gui.widget.stats_widget import StatsPanel
+from ble.subscriptions import HR, PPG, QUALITY
 
 class PPGWindow(QMainWindow):
+    # 本窗口显示的输出流：显示时订阅，隐藏 / 最小化时退订，worker 随之停止计算与发送
+    STREAMS = (PPG, HR, QUALITY)
+
     def __init__(self, worker, parent=None):
         super().__init__(parent)
         self.setWindowTitle("实时PPG波形")
@@ -18,20 +23,52 @@ class PPGWindow(QMainWindow):
         self.back_button.clicked.connect(self.go_back)
         top_layout.addWidget(self.back_button)
         top_layout.addStretch()  # 右边空白填充
+        self.stats_button = QPushButton("性能统计")
+        self.stats_button.setCheckable(True)
+        self.stats_button.toggled.connect(self.toggle_stats)
+        top_layout.addWidget(self.stats_button)
         main_layout.addLayout(top_layout)
 
-        # 波形绘制控件
-        self.plot_widget = PPGPlotWidget(fs=100, display_sec=6)
+        # 波形绘制控件（窗口的最新样本真正绘制到屏幕时记录端到端延迟）
+        self.plot_widget = PPGPlotWidget(fs=100, display_sec=6, on_shown=worker.report_display)
         main_layout.addWidget(self.plot_widget)
 
+        # 运行统计面板（默认隐藏，打开时才启用统计）
+        self.stats_panel = StatsPanel()
+        self.stats_panel.hide()
+        main_layout.addWidget(self.stats_panel)
+
         # 状态栏
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
 
         # 绑定 Worker 信号
+        self.quality = None
         self.worker = worker
-        self.worker.ppg_signal.connect(self.plot_widget.update_data)
+        self.subscribed = False
+        self.worker.ppg_signal.connect(self.update_ppg)
         self.worker.hr_signal.connect(self.update_hr)
+        self.worker.quality_signal.connect(self.update_quality)
+        self.worker.stats_signal.connect(self.stats_panel.update_stats)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.subscribed:
+            self.subscribed = True
+            self.worker.subscribe(*self.STREAMS)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if self.subscribed:
+            self.subscribed = False
+            self.worker.unsubscribe(*self.STREAMS)
+
+    def update_ppg(self, result):
+        self.plot_widget.update_data(result)
+
+    def toggle_stats(self, checked):
+        self.stats_panel.setVisible(checked)
+        self.worker.set_stats_enabled(checked)
 
     def go_back(self):
         """返回主菜单"""
@@ -39,5 +76,15 @@ class PPGWindow(QMainWindow):
         if self.parent():
             self.parent().show()  # 显示主窗口
 
+    def update_quality(self, quality):
+        # 质量信号先于心率到达；不合格窗口不会再收到心率，在此提示
+        self.quality = quality
+        if not quality.hr_valid:
+            reason = "离腕或佩戴过松" if quality.reason == 'off_wrist' else "运动干扰"
+            self.status_bar.showMessage(f"⚠️ 信号质量差（{reason}），暂停心率估计")
+
     def update_hr(self, bpm):
-        self.status_bar.showMessage(f"心率: {bpm:.1f} BPM")
+        if self.quality is not None and self.quality.index is not None:
+            self.status_bar.showMessage(f"心率: {bpm:.1f} BPM | 信号质量 {self.quality.index:.2f}")
+        else:
+            self.status_bar.showMessage(f"心率: {bpm:.1f} BPM")
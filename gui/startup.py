@@ -0,0 +1,58 @@
+# gui/startup.py
+import importlib
+import sys
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class StartupProfiler:
+    """
+    启动耗时统计：启用后（main.py --profile-startup）在标准错误输出各阶段
+    相对 t0 的时刻与距上一阶段的间隔；未启用时 mark() 为空操作。
+    更细的逐模块导入耗时可配合 python -X importtime 查看。
+    """
+    def __init__(self):
+        self.enabled = False
+        self.t0 = time.perf_counter()
+        self.last = self.t0
+        self.marks = []
+
+    def enable(self, t0=None):
+        self.enabled = True
+        if t0 is not None:
+            self.t0 = self.last = t0
+
+    def mark(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.marks.append((name, now - self.t0))
+        print(f"[startup] {now - self.t0:7.3f}s  (+{(now - self.last) * 1e3:7.1f} ms)  {name}", file=sys.stderr)
+        self.last = now
+
+
+profiler = StartupProfiler()
+
+
+class ModuleLoader(QThread):
+    """
+    后台线程中预先导入模块（只执行 import，不创建任何 Qt 控件），完成后发出 loaded 信号
+    用于在连接界面已显示、扫描进行中时加载 SciPy / bleak / matplotlib 等重量级模块。
+    """
+    loaded = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, module_names, parent=None):
+        super().__init__(parent)
+        self.module_names = list(module_names)
+
+    def run(self):
+        for name in self.module_names:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                self.failed.emit(f"模块加载失败 {name}: {e}")
+                return
+            profiler.mark(f"导入 {name}")
+        self.loaded.emit()
@@ -1,34 +1,149 @@
+import numpy as np
 from PyQt5.QtWidgets import QWidget, QVBoxLayout
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+from gui.widget.waveform_renderer import WaveformRenderer
+from signal_processing.lod import LODPyramid
+
+# 中文标题字体：只作用于标题文本，不修改全局 rcParams（刻度等仍用默认字体，负号正常显示）
+CJK_FONT = ["SimHei", "Microsoft YaHei", "Noto Sans CJK SC", "sans-serif"]
 
 class PPGPlotWidget(QWidget):
-    def __init__(self, fs=100, display_sec=6):
-        super().__init__()
-        # 添加字体配置，支持中文显示
-        plt.rcParams["font.family"] = ["SimHei"]
-        plt.rcParams["axes.unicode_minus"] = False
+    """
+    实时 PPG 波形 + 历史浏览
+    - 实时模式：渲染器按固定帧率滚动显示最近 display_sec 秒
+    - 浏览模式：滚轮缩放、左键拖动平移，双击返回实时；
+      历史数据保存在多分辨率金字塔中，每次只取约一屏宽度的点绘制，与可见时长无关
+    - 数据流暂停（窗口隐藏时退订）后恢复：缺失的样本在历史中以 NaN 占位，实时显示直接跳到最新窗口
+    """
+    ZOOM_STEP = 1.25    # 每格滚轮的缩放倍数
+    MIN_SPAN_SEC = 1.0  # 最小可见时长
 
+    def __init__(self, fs=100, display_sec=6, fps=30, on_shown=None):
+        super().__init__()
+        # 直接创建 Figure，不经过 pyplot（无全局图形管理器与 rcParams 修改）
         layout = QVBoxLayout(self)
-        self.fig, self.ax = plt.subplots()
+        self.fig = Figure()
+        self.ax = self.fig.add_subplot()
         self.canvas = FigureCanvas(self.fig)
         layout.addWidget(self.canvas)
 
-        self.buffer = []           # 完整缓冲区
+        self.buffer = None         # 最新的处理结果（ProcessedWindow）
+        self.last_seq = 0          # 已显示到的累计样本序号
         self.fs = fs               # 采样率
         self.display_sec = display_sec  # 显示时长（秒）
 
-    def update_data(self, new_points):
-        self.buffer = new_points  # 保留完整缓冲区
-        window_size = self.fs * self.display_sec
+        # 标题只设置一次，曲线由渲染器按固定帧率增量刷新
+        self.live_title = f"预处理后的实时 PPG（最近 {self.display_sec}s）"
+        self.ax.set_title(self.live_title, fontfamily=CJK_FONT)
+        # on_shown(result)：某个 ProcessedWindow 的最新样本真正绘制到屏幕时回调
+        self.renderer = WaveformRenderer(self.canvas, self.ax, self.fs * self.display_sec, self.fs, fps=fps,
+                                         on_shown=on_shown)
+
+        # 历史浏览：金字塔中的样本 i 对应累计序号 history_offset + i
+        self.history = LODPyramid()
+        self.history_offset = None
+        self.live = True
+        self.view = None           # 浏览模式下的可见区间 [start, stop)（金字塔样本序号）
+        self._drag = None          # 拖动起点 (像素 x, 起始 view)
+        self.history_line, = self.ax.plot([], [], color='g', linewidth=0.8)
+        self.canvas.mpl_connect('scroll_event', self._on_scroll)
+        self.canvas.mpl_connect('button_press_event', self._on_press)
+        self.canvas.mpl_connect('motion_notify_event', self._on_motion)
+        self.canvas.mpl_connect('button_release_event', self._on_release)
+
+    def update_data(self, result):
+        """接收 ProcessedWindow，按序号只把新样本滚入显示并追加到历史"""
+        self.buffer = result
+        new = result.since(self.last_seq)
+        if self.history_offset is None:
+            self.history_offset = result.seq - len(new)
+        gap = result.seq - len(new) - (self.history_offset + self.history.total)
+        if gap > 0:
+            self.history.append(np.full(gap, np.nan, dtype=np.float32))
+        self.history.append(new)
+        self.renderer.push(result.data, new_count=0 if gap > 0 else result.new_count(self.last_seq), token=result)
+        self.last_seq = result.seq
+
+    # ---------------------- 历史浏览 ----------------------
+    def _current_view(self):
+        if not self.live:
+            return self.view
+        total = self.history.total
+        return max(0, total - self.renderer.window_size), total
 
-        # 截取最新 display_sec 秒数据进行绘图
-        if len(self.buffer) >= window_size:
-            display_data = self.buffer[-window_size:]
-        else:
-            display_data = self.buffer
+    def _event_sample(self, event, view):
+        """鼠标位置对应的金字塔样本序号（不在坐标区内时取可见区间中点）"""
+        if event.inaxes is not self.ax or event.xdata is None:
+            return (view[0] + view[1]) / 2
+        if self.live:
+            return self.history.total - self.renderer.window_size + event.xdata
+        return event.xdata * self.fs - self.history_offset
 
-        self.ax.clear()
-        self.ax.plot(display_data, color='g')
-        self.ax.set_title(f"预处理后的实时 PPG（最近 {self.display_sec}s）")
+    def _set_view(self, start, stop):
+        total = self.history.total
+        span = min(max(stop - start, self.MIN_SPAN_SEC * self.fs), total)
+        start = min(max(0.0, start), total - span)
+        self.view = (start, start + span)
+        if self.live:
+            self.live = False
+            self.renderer.paused = True
+        self._draw_history()
+
+    def _draw_history(self):
+        start, stop = self.view
+        max_points = max(100, int(self.ax.bbox.width))
+        xs, ys = self.history.envelope(start, stop, max_points)
+        self.history_line.set_data((xs + self.history_offset) / self.fs, ys)
+        self.ax.set_xlim((start + self.history_offset) / self.fs, (stop + self.history_offset) / self.fs)
+        if len(ys) and not np.all(np.isnan(ys)):
+            low, high = float(np.nanmin(ys)), float(np.nanmax(ys))
+            margin = (high - low) * 0.1 or 0.1
+            self.ax.set_ylim(low - margin, high + margin)
+        self.ax.set_title(f"历史 PPG（{(stop - start) / self.fs:.0f}s，滚轮缩放 / 拖动平移 / 双击返回实时）",
+                          fontfamily=CJK_FONT)
+        self.canvas.draw_idle()
+
+    def go_live(self):
+        """返回实时滚动显示"""
+        if self.live:
+            return
+        self.live = True
+        self.view = None
+        self.history_line.set_data([], [])
+        self.ax.set_xlim(0, self.renderer.window_size - 1)
+        self.ax.set_ylim(-1.1, 1.1)
+        self.ax.set_title(self.live_title, fontfamily=CJK_FONT)
+        self.renderer.paused = False
         self.canvas.draw()
+
+    def _on_scroll(self, event):
+        if self.history.total == 0:
+            return
+        start, stop = self._current_view()
+        center = self._event_sample(event, (start, stop))
+        scale = 1 / self.ZOOM_STEP if event.button == 'up' else self.ZOOM_STEP
+        span = stop - start
+        new_span = span * scale
+        new_start = center - (center - start) * new_span / max(span, 1)
+        self._set_view(new_start, new_start + new_span)
+
+    def _on_press(self, event):
+        if event.inaxes is not self.ax:
+            return
+        if event.dblclick:
+            self.go_live()
+        elif event.button == 1 and self.history.total:
+            self._drag = (event.x, self._current_view())
+
+    def _on_motion(self, event):
+        if self._drag is None or event.x is None:
+            return
+        x0, (start, stop) = self._drag
+        shift = (x0 - event.x) / max(self.ax.bbox.width, 1) * (stop - start)
+        if shift:
+            self._set_view(start + shift, stop + shift)
+
+    def _on_release(self, event):
+        self._drag = None
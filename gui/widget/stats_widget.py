@@ -0,0 +1,31 @@
+# gui/widget/stats_widget.py
+from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout
+from PyQt5.QtGui import QFont
+
+
+class StatsPanel(QWidget):
+    """运行统计面板：显示各处理阶段耗时分位数、队列深度、丢弃数、采样率与端到端延迟"""
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.label = QLabel("等待统计数据...")
+        self.label.setFont(QFont("Monospace", 9))
+        layout.addWidget(self.label)
+
+    def update_stats(self, snapshot):
+        lines = []
+        for name, s in snapshot['stages'].items():
+            if s['count']:
+                lines.append(f"{name:<10} p50 {s['p50'] * 1e3:7.2f}  p95 {s['p95'] * 1e3:7.2f}  "
+                             f"p99 {s['p99'] * 1e3:7.2f} ms")
+        rates = "  ".join(f"{k} {v:.1f}Hz" for k, v in snapshot['ingest_rate'].items())
+        lines.append(f"接入采样率  {rates or '-'}  (标称 {snapshot['nominal_fs']}Hz)")
+        lines.append(f"队列深度 {snapshot['queue_depth']}   累计丢弃 {sum(snapshot['dropped_samples'].values())} 个样本")
+        if snapshot.get('allocations') is not None:
+            lines.append(f"滤波流水线数组分配 {snapshot['allocations']} 个/tick")
+        lat = snapshot['latency']
+        if lat['count']:
+            lines.append(f"端到端延迟  p50 {lat['p50'] * 1e3:.0f}  p95 {lat['p95'] * 1e3:.0f}  "
+                         f"p99 {lat['p99'] * 1e3:.0f} ms")
+        self.label.setText("\n".join(lines))
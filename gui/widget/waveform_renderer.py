@@ -0,0 +1,143 @@
+# gui/widget/waveform_renderer.py
+import time
+
+import numpy as np
+from PyQt5.QtCore import QTimer
+
+
+class WaveformRenderer:
+    """
+    增量波形渲染器：持久化曲线对象 + blit，按固定帧率把新样本平滑滚入
+    - push() 只保存最新的处理窗口，不触发绘制，与处理节奏解耦
+    - 帧定时器以 fps 运行，每帧只恢复背景、重绘曲线并 blit
+    - 新样本以 fs 的速率滚入（显示延迟约一个处理步长），避免每次更新整屏跳变
+    - 纵轴范围变化时才做一次完整重绘
+    - on_shown(token)：push 时附带的 token 在其最新样本真正绘制到屏幕的那一帧回调（用于端到端延迟统计）
+    """
+    def __init__(self, canvas, ax, window_size, fs, fps=30, color='g', label=None,
+                 peak_style=None, peak_label=None, ylim=(-1.1, 1.1), autoscale=False, on_shown=None):
+        self.canvas = canvas
+        self.ax = ax
+        self.window_size = window_size
+        self.fs = fs
+        self.autoscale = autoscale
+
+        x = np.arange(window_size)
+        self.line, = ax.plot(x, np.full(window_size, np.nan), color=color, label=label, animated=True)
+        self.peak_line = None
+        if peak_style is not None:
+            self.peak_line, = ax.plot([], [], peak_style, label=peak_label, animated=True)
+        ax.set_xlim(0, window_size - 1)
+        ax.set_ylim(*ylim)
+
+        # 当前数据
+        self.data = np.zeros(0, dtype=np.float32)
+        self.peaks = np.zeros(0, dtype=np.int64)
+        self.pending = 0         # 尚未滚入显示的新样本数
+        self.push_time = None    # 最近一次 push 的时间
+        self.paused = False      # 暂停逐帧刷新（如浏览历史时），push 仍照常保存数据
+        self.on_shown = on_shown
+        self._unshown = []       # [最新样本距 data 末尾的样本数, token]，尚未绘制到屏幕
+
+        self.background = None
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+        self.timer = QTimer(canvas)
+        self.timer.timeout.connect(self._on_frame)
+        self.timer.start(int(1000 / fps))
+
+    # ---------------------- 数据输入 ----------------------
+    def push(self, data, peaks=None, new_count=None, token=None):
+        """
+        提交最新的处理窗口
+        new_count: 窗口中新样本数；为 None 时按距上次 push 的时间 × fs 估计
+        token    : 可选，本窗口最新样本绘制到屏幕时以其回调 on_shown
+        """
+        now = time.monotonic()
+        if new_count is None:
+            new_count = 0 if self.push_time is None else int(round((now - self.push_time) * self.fs))
+        self.data = np.asarray(data)
+        self.peaks = np.zeros(0, dtype=np.int64) if peaks is None else np.asarray(peaks, dtype=np.int64)
+        self.pending = min(new_count, len(self.data))
+        self.push_time = now
+        for entry in self._unshown:
+            entry[0] += new_count
+        # 未显示就已滚出窗口的（如浏览历史期间）不再统计
+        self._unshown = [entry for entry in self._unshown if entry[0] < len(self.data)]
+        if token is not None and self.on_shown is not None:
+            self._unshown.append([0, token])
+
+    # ---------------------- 绘制 ----------------------
+    def _visible_range(self):
+        """按滚入进度计算当前应显示的 [start, end) 区间"""
+        shown = self.pending
+        if self.push_time is not None:
+            shown -= int((time.monotonic() - self.push_time) * self.fs)
+        end = len(self.data) - max(0, shown)
+        return max(0, end - self.window_size), end
+
+    def _update_artists(self):
+        start, end = self._visible_range()
+        segment = self.data[start:end]
+        y = np.full(self.window_size, np.nan)
+        y[self.window_size - len(segment):] = segment
+        self.line.set_ydata(y)
+
+        if self.peak_line is not None:
+            peaks = self.peaks[(self.peaks >= start) & (self.peaks < end)]
+            offset = self.window_size - (end - start) - start
+            self.peak_line.set_data(peaks + offset, self.data[peaks])
+        return segment
+
+    def _draw_artists(self):
+        self.ax.draw_artist(self.line)
+        if self.peak_line is not None:
+            self.ax.draw_artist(self.peak_line)
+
+    def _on_draw(self, event):
+        """完整重绘（首次显示、缩放窗口、纵轴变化）后重新截取背景；暂停时坐标系另作他用，不绘制实时曲线"""
+        if self.paused:
+            self.background = None
+            return
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_artists()
+
+    def _rescale(self, segment):
+        """动态纵轴：数据超出范围或幅度明显缩小时更新范围，返回是否发生变化"""
+        if not self.autoscale or len(segment) == 0:
+            return False
+        min_val, max_val = float(np.min(segment)), float(np.max(segment))
+        margin = (max_val - min_val) * 0.1 or 0.1
+        low, high = self.ax.get_ylim()
+        too_small = min_val < low or max_val > high
+        too_large = (high - low) > 2 * (max_val - min_val + 2 * margin)
+        if too_small or too_large:
+            self.ax.set_ylim(min_val - margin, max_val + margin)
+            return True
+        return False
+
+    def _on_frame(self):
+        if self.paused or not self.canvas.isVisible() or len(self.data) == 0:
+            return
+        segment = self._update_artists()
+        if self.background is None or self._rescale(segment):
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self._draw_artists()
+            self.canvas.blit(self.ax.bbox)
+        if self._unshown:
+            self._report_shown(self._visible_range()[1])
+
+    def _report_shown(self, end):
+        """本帧已绘制到 end 的窗口：按 push 顺序回调 on_shown"""
+        shown = 0
+        for offset, token in self._unshown:
+            if len(self.data) - offset > end:
+                break
+            self.on_shown(token)
+            shown += 1
+        del self._unshown[:shown]
+
+    def stop(self):
+        self.timer.stop()
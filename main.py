@@ -1,11 +1,34 @@
+import argparse
 import sys
+import time
+
+_START = time.perf_counter()
+
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
-from ble.watch_worker import WatchWorker
 from gui.main_window import MainWindow
+from gui.startup import profiler
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    worker = WatchWorker()
-    w = MainWindow(worker)
+    parser = argparse.ArgumentParser(description="手表实时 PPG 监测")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="在标准错误输出启动各阶段耗时（模块导入、首屏显示、worker 启动）")
+    parser.add_argument("--connect", metavar="ADDRESS",
+                        help="不直接连接手表，作为订阅者接入采集服务（daemon.py），如 unix:/tmp/watch-gui.sock")
+    args, qt_args = parser.parse_known_args()
+    if args.profile_startup:
+        profiler.enable(_START)
+        profiler.mark("导入 PyQt 与主窗口")
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    profiler.mark("创建 QApplication")
+    if args.connect:
+        def stream_worker():
+            from ble.stream_client import StreamClientWorker
+            return StreamClientWorker(args.connect)
+        w = MainWindow(worker_factory=stream_worker, worker_modules=("ble.stream_client",))
+    else:
+        w = MainWindow()  # 蓝牙 / 信号处理模块在连接界面显示后于后台加载
     w.show()
+    QTimer.singleShot(0, lambda: profiler.mark("连接界面已显示"))
     sys.exit(app.exec_())
@@ -1,11 +1,27 @@
+from functools import lru_cache
+
 import numpy as np
-from scipy.signal import butter, lfilter, savgol_filter
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import butter, lfilter, savgol_filter, savgol_coeffs, sosfilt, sosfilt_zi
+
+try:
+    # SOS 原地滤波内核（SciPy 私有接口）：就地改写输入与 zi，不分配新数组；不可用时退回 sosfilt
+    from scipy.signal._sosfilt import _sosfilt
+except ImportError:
+    _sosfilt = None
 
+@lru_cache(maxsize=32)
 def butter_bandpass(lowcut, highcut, fs, order=4):
     nyq = 0.5 * fs
     b, a = butter(order, [lowcut / nyq, highcut / nyq], btype="band")
     return b, a
 
+@lru_cache(maxsize=32)
+def butter_bandpass_sos(lowcut, highcut, fs, order=4):
+    """二阶节 (SOS) 形式的带通设计，按 (fs, 频带, 阶数) 缓存"""
+    nyq = 0.5 * fs
+    return butter(order, [lowcut / nyq, highcut / nyq], btype="band", output="sos")
+
 def bandpass_filter(data, lowcut=0.5, highcut=4.5, fs=100, order=4):
     b, a = butter_bandpass(lowcut, highcut, fs, order)
     return lfilter(b, a, data)
@@ -32,3 +48,188 @@ class NLMSFilter:
         e = d - y
         self.w += self.mu * e * x / norm_x
         return e
+
+
+class BlockNLMSFilter:
+    """
+    分块 NLMS / LMS 自适应滤波（向量化）
+    参考信号为 3 轴加速度，每轴 filter_order 个抽头，共 3*filter_order 个权重。
+    权重与抽头延迟线跨调用保持，每个样本只参与一次自适应。
+    - block_size : 每个子块内权重固定，子块结束后按平均梯度更新
+    - normalized : True 为 NLMS（按输入能量归一化），False 为 LMS
+    延迟线与新参考样本放在同一个预分配工作区中，回归矩阵为其滑动窗口视图；
+    process(d, x, out) 写入 out 时整个过程不分配数组，工作区只在块长超过以往最大值时扩容（计入 allocations）。
+    """
+    def __init__(self, filter_order=8, mu=0.01, eps=1e-6, channels=3, block_size=16, normalized=True, max_block=0):
+        self.n = filter_order
+        self.mu = mu
+        self.eps = eps
+        self.channels = channels
+        self.block_size = block_size
+        self.normalized = normalized
+        self.w = np.zeros(self.n * channels)
+        self.W = self.w.reshape(channels, self.n)  # 权重视图：[通道, 抽头]，抽头 0 对应最新样本
+        self.allocations = 0
+
+        # 工作区：前 n-1 行为延迟线，其后为本次参考样本；子块误差 / 能量 / 梯度
+        self._full = np.zeros((self.n - 1 + max_block, channels))
+        self._e = np.zeros(block_size)
+        self._energy = np.zeros(block_size)
+        self._grad = np.zeros((channels, self.n))
+
+    @property
+    def delay_line(self):
+        return self._full[:self.n - 1]
+
+    def _load(self, x, count):
+        """把 count 个参考样本写到延迟线之后，返回 [延迟线 + 新样本] 视图"""
+        size = self.n - 1 + count
+        if size > len(self._full):
+            full = np.zeros((size, self.channels))
+            full[:self.n - 1] = self.delay_line
+            self._full = full
+            self.allocations += 1
+        full = self._full[:size]
+        full[self.n - 1:] = np.asarray(x).reshape(count, self.channels)
+        return full
+
+    def _shift(self, full):
+        """最后 n-1 个参考样本移到工作区开头，作为下次的延迟线"""
+        self._full[:self.n - 1] = full[len(full) - (self.n - 1):]
+
+    def process(self, d, x, out=None):
+        """
+        d: 期望信号 (n,)；x: 对齐的参考信号 (n, channels)；返回误差信号 e (n,) float32
+        给出 out 时写入 out[:n] 并返回该视图
+        """
+        count = len(d)
+        if out is None:
+            out = np.empty(count, dtype=np.float32)
+            self.allocations += 1
+        if count == 0:
+            return out[:0]
+
+        # 延迟线 + 新数据 → 滑动窗口视图 (n, channels, n_taps)，最新样本在前
+        full = self._load(x, count)
+        windows = sliding_window_view(full, self.n, axis=0)[:, :, ::-1]
+
+        for s in range(0, count, self.block_size):
+            xb = windows[s:s + self.block_size]
+            m = len(xb)
+            eb = self._e[:m]
+            np.einsum("ict,ct->i", xb, self.W, out=eb)
+            np.subtract(d[s:s + m], eb, out=eb)
+            out[s:s + m] = eb
+            if self.normalized:
+                energy = self._energy[:m]
+                np.einsum("ict,ict->i", xb, xb, out=energy)
+                energy += self.eps
+                np.divide(eb, energy, out=eb)
+            np.einsum("ict,i->ct", xb, eb, out=self._grad)
+            self._grad *= self.mu / m
+            self.W += self._grad
+        self._shift(full)
+        return out[:count]
+
+    def advance(self, x):
+        """跳过自适应时只推进抽头延迟线，保持与参考信号的连续性"""
+        x = np.asarray(x)
+        if len(x):
+            self._shift(self._load(x, len(x)))
+
+    def reset(self):
+        self.w[:] = 0
+        self._full[:] = 0
+
+
+# ====================================================
+# ================== 流式滤波 =========================
+# ====================================================
+class StreamingBandpass:
+    """
+    带状态的 SOS 带通滤波：跨调用保存 zi，每次只处理新到达的数据块
+    process(block, out) 在 float64 工作区中原地滤波后写入 out，稳态下不分配数组
+    （工作区只在块长超过以往最大值时扩容；SciPy 无原地内核时退回 sosfilt，每次 2 个新数组）。
+    """
+    def __init__(self, lowcut=0.5, highcut=4.5, fs=100, order=4, max_block=0):
+        self.sos = np.ascontiguousarray(butter_bandpass_sos(lowcut, highcut, fs, order), dtype=np.float64)
+        self.zi = None
+        self.allocations = 0
+        self._x = np.zeros((1, max_block))
+
+    def process(self, block, out=None):
+        n = len(block)
+        if out is None:
+            out = np.empty(n, dtype=np.float32)
+            self.allocations += 1
+        if n == 0:
+            return out[:0]
+        if self.zi is None:
+            # 以首个样本初始化为稳态，避免直流分量引起的启动瞬态
+            self.zi = sosfilt_zi(self.sos) * float(block[0])
+            self.allocations += 1
+
+        if _sosfilt is None:
+            y, self.zi = sosfilt(self.sos, block, zi=self.zi)
+            self.allocations += 2
+            out[:n] = y
+            return out[:n]
+
+        if n > self._x.shape[1]:
+            self._x = np.zeros((1, n))
+            self.allocations += 1
+        x = self._x[:, :n]
+        x[0] = block
+        _sosfilt(self.sos, x, self.zi.reshape(1, -1, 2))
+        out[:n] = x[0]
+        return out[:n]
+
+    def reset(self):
+        self.zi = None
+
+
+class StreamingSavgol:
+    """
+    流式 Savitzky-Golay 平滑：保留 window_length-1 个历史样本，输出延迟 window_length//2 个样本
+    历史与新样本放在同一个预分配 float64 工作区中，卷积以滑动窗口视图与反序系数的矩阵乘完成，再写入 out。
+    """
+    def __init__(self, window_length=11, polyorder=3, max_block=0):
+        self.window_length = window_length
+        self.coeffs = savgol_coeffs(window_length, polyorder)
+        self._kernel = np.ascontiguousarray(self.coeffs[::-1])
+        self._x = np.zeros(window_length - 1 + max_block)
+        self._y = np.zeros(max_block)
+        self._filled = 0  # 工作区开头的历史样本数（不超过 window_length-1）
+        self.allocations = 0
+
+    @property
+    def history(self):
+        return self._x[:self._filled]
+
+    def process(self, block, out=None):
+        n = len(block)
+        size = self._filled + n
+        if size > len(self._x):
+            x = np.zeros(size)
+            x[:self._filled] = self.history
+            self._x = x
+            self._y = np.zeros(size)
+            self.allocations += 2
+        x = self._x[:size]
+        x[self._filled:] = block
+
+        m = max(0, size - self.window_length + 1)
+        if out is None:
+            out = np.empty(m, dtype=np.float32)
+            self.allocations += 1
+        if m:
+            y = self._y[:m]
+            np.matmul(sliding_window_view(x, self.window_length), self._kernel, out=y)
+            out[:m] = y
+        keep = min(size, self.window_length - 1)
+        self._x[:keep] = x[size - keep:]
+        self._filled = keep
+        return out[:m]
+
+    def reset(self):
+        self._filled = 0
@@ -0,0 +1,188 @@
+import numpy as np
+from scipy.signal import lombscargle
+
+# 默认滑动窗口（秒）
+DEFAULT_WINDOWS = {'1min': 60.0, '5min': 300.0, '24h': 86400.0}
+
+LF_BAND = (0.04, 0.15)
+HF_BAND = (0.15, 0.40)
+
+
+class _WindowStats:
+    """单个滑动窗口的累加量：窗口覆盖 RR 序号 [head, n)，逐差覆盖 (head, n)"""
+    def __init__(self, span):
+        self.span = span
+        self.head = 0
+        self.n = 0
+        self.sum_rr = 0.0
+        self.sum_rr2 = 0.0
+        self.n_diff = 0
+        self.sum_d2 = 0.0
+        self.nn50 = 0
+
+
+class HRVEngine:
+    """
+    增量 HRV 分析
+    - add() 追加新的 RR 间期（ms）及对应心搏时刻（s），各窗口按新增/移出的间期更新累加量，
+      每次更新为 O(新增 + 移出) 而不是 O(窗口长度)
+    - metrics() 由累加量直接得到 SDNN / RMSSD / pNN50 / 平均心率
+    - 频域指标（Lomb-Scargle，LF/HF）按 spectral_interval 秒的较低频率重新计算
+    rr_range 之外的间期视为伪差，不计入统计。
+    逐差只在相邻间期之间计算：间期起点（times - rr/1000）与上一间期的结束时刻相差超过 ADJACENT_TOLERANCE 秒
+    （中间有被剔除的伪差或跨越跳过区间的间期）时该逐差记为缺失，不计入 RMSSD / pNN50。
+    """
+    ADJACENT_TOLERANCE = 1e-3
+    def __init__(self, windows=None, spectral_windows=('5min',), spectral_interval=30.0,
+                 rr_range=(300.0, 2000.0), n_freqs=256):
+        self.windows = {name: _WindowStats(span) for name, span in (windows or DEFAULT_WINDOWS).items()}
+        self.spectral_windows = tuple(spectral_windows)
+        self.spectral_interval = spectral_interval
+        self.rr_range = rr_range
+        self.freqs = np.linspace(0.0033, HF_BAND[1], n_freqs)
+
+        self._times = np.zeros(1024, dtype=np.float64)
+        self._rr = np.zeros(1024, dtype=np.float64)
+        self._diff2 = np.zeros(1024, dtype=np.float64)  # (rr[i] - rr[i-1])^2，不相邻为 NaN，i=0 处无意义
+        self.count = 0
+
+        self.spectral = {}
+        self._last_spectral_time = None
+
+    # ---------------------- 追加 ----------------------
+    def add(self, times, rr_ms):
+        """追加一批 RR 间期（times 为间期结束处心搏的时刻）；返回本批是否有有效间期"""
+        times = np.asarray(times, dtype=np.float64)
+        rr_ms = np.asarray(rr_ms, dtype=np.float64)
+        valid = (rr_ms >= self.rr_range[0]) & (rr_ms <= self.rr_range[1])
+        times, rr_ms = times[valid], rr_ms[valid]
+        k = len(rr_ms)
+        if k == 0:
+            return False
+
+        self._reserve(self.count + k)
+        start, end = self.count, self.count + k
+        self._times[start:end] = times
+        self._rr[start:end] = rr_ms
+        lo = max(start, 1)  # 首个有前一间期的位置
+        rr, prev_rr = self._rr[lo:end], self._rr[lo - 1:end - 1]
+        adjacent = np.abs(self._times[lo:end] - rr / 1000.0 - self._times[lo - 1:end - 1]) <= self.ADJACENT_TOLERANCE
+        self._diff2[lo:end] = np.where(adjacent, (rr - prev_rr) ** 2, np.nan)
+        self.count = end
+
+        now = times[-1]
+        for w in self.windows.values():
+            self._add_range(w, start, end)
+            new_head = int(np.searchsorted(self._times[w.head:end], now - w.span, side='left')) + w.head
+            self._remove_range(w, w.head, new_head)
+        self._compact()
+        return True
+
+    def _add_range(self, w, lo, hi):
+        rr = self._rr[lo:hi]
+        w.n += hi - lo
+        w.sum_rr += float(np.sum(rr))
+        w.sum_rr2 += float(np.dot(rr, rr))
+        d_lo = max(lo, w.head + 1)
+        if d_lo < hi:
+            n, total, nn50 = self._diff_sums(d_lo, hi)
+            w.n_diff += n
+            w.sum_d2 += total
+            w.nn50 += nn50
+
+    def _remove_range(self, w, lo, hi):
+        if hi <= lo:
+            return
+        rr = self._rr[lo:hi]
+        w.n -= hi - lo
+        w.sum_rr -= float(np.sum(rr))
+        w.sum_rr2 -= float(np.dot(rr, rr))
+        # 移出 [lo, hi) 后，逐差 (lo, min(hi, count-1)] 不再成对位于窗口内
+        d_hi = min(hi + 1, self.count)
+        if lo + 1 < d_hi:
+            n, total, nn50 = self._diff_sums(lo + 1, d_hi)
+            w.n_diff -= n
+            w.sum_d2 -= total
+            w.nn50 -= nn50
+        w.head = hi
+        if w.n == 0:
+            w.sum_rr = w.sum_rr2 = w.sum_d2 = 0.0
+
+    def _diff_sums(self, lo, hi):
+        """逐差 [lo, hi) 中相邻间期的 (个数, 平方和, 超过 50ms 的个数)"""
+        d2 = self._diff2[lo:hi]
+        d2 = d2[~np.isnan(d2)]
+        return len(d2), float(np.sum(d2)), int(np.count_nonzero(d2 > 2500.0))
+
+    def _reserve(self, size):
+        if size <= len(self._rr):
+            return
+        new_size = max(size, 2 * len(self._rr))
+        self._times = np.resize(self._times, new_size)
+        self._rr = np.resize(self._rr, new_size)
+        self._diff2 = np.resize(self._diff2, new_size)
+
+    def _compact(self):
+        """所有窗口都已移出的前缀超过一半容量时整体前移，避免历史无限增长"""
+        head = min(w.head for w in self.windows.values())
+        if head < len(self._rr) // 2:
+            return
+        keep = self.count - head
+        self._times[:keep] = self._times[head:self.count]
+        self._rr[:keep] = self._rr[head:self.count]
+        self._diff2[:keep] = self._diff2[head:self.count]
+        self.count = keep
+        for w in self.windows.values():
+            w.head -= head
+
+    # ---------------------- 指标 ----------------------
+    def metrics(self, name):
+        """时域指标：n、mean_rr (ms)、mean_hr (BPM)、sdnn (ms)、rmssd (ms)、pnn50 (%)"""
+        w = self.windows[name]
+        if w.n < 2:
+            return {'n': w.n}
+        mean = w.sum_rr / w.n
+        var = max(w.sum_rr2 - w.n * mean * mean, 0.0) / (w.n - 1)
+        result = {'n': w.n, 'mean_rr': mean, 'mean_hr': 60_000.0 / mean, 'sdnn': float(np.sqrt(var))}
+        if w.n_diff > 0:
+            result['rmssd'] = float(np.sqrt(max(w.sum_d2, 0.0) / w.n_diff))
+            result['pnn50'] = 100.0 * w.nn50 / w.n_diff
+        return result
+
+    def spectral_metrics(self, name):
+        """Lomb-Scargle 频域指标：lf、hf（ms²）与 lf_hf"""
+        w = self.windows[name]
+        if w.n < 16:
+            return {}
+        t = self._times[w.head:self.count]
+        rr = self._rr[w.head:self.count]
+        centered = rr - np.mean(rr)
+        power = lombscargle(t, centered, 2 * np.pi * self.freqs)
+        # 按 Parseval 缩放为功率谱密度（ms²/Hz）：整段频率上的积分等于 RR 方差
+        total = np.trapezoid(power, self.freqs)
+        psd = power * (np.var(centered) / total) if total > 0 else power
+
+        def band(lo, hi):
+            sel = (self.freqs >= lo) & (self.freqs < hi)
+            return float(np.trapezoid(psd[sel], self.freqs[sel])) if np.count_nonzero(sel) > 1 else 0.0
+
+        lf, hf = band(*LF_BAND), band(*HF_BAND)
+        return {'lf': lf, 'hf': hf, 'lf_hf': lf / hf if hf > 0 else None}
+
+    def update(self, times, rr_ms):
+        """
+        追加 RR 并返回最新结果：{'time', 'windows': {名称: 时域指标}, 'spectral': {名称: 频域指标}}
+        频域部分只在距上次计算超过 spectral_interval 秒时重新计算，否则沿用上次结果。
+        没有新的有效间期时返回 None。
+        """
+        if not self.add(times, rr_ms):
+            return None
+        now = float(self._times[self.count - 1])
+        if self._last_spectral_time is None or now - self._last_spectral_time >= self.spectral_interval:
+            self._last_spectral_time = now
+            self.spectral = {name: self.spectral_metrics(name) for name in self.spectral_windows}
+        return {
+            'time': now,
+            'windows': {name: self.metrics(name) for name in self.windows},
+            'spectral': dict(self.spectral),
+        }
@@ -0,0 +1,158 @@
+import numpy as np
+
+
+def _nanmean_rows(blocks):
+    """逐行均值，忽略 NaN；整行为 NaN 时结果为 NaN"""
+    valid = ~np.isnan(blocks)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(valid, blocks, 0).sum(axis=1, dtype=np.float64) / valid.sum(axis=1)
+
+
+class _Level:
+    """金字塔一层：按 factor^k 个原始样本一桶保存 min / max / mean，容量按倍增扩展"""
+    def __init__(self, dtype, capacity=1024):
+        self.min = np.zeros(capacity, dtype=dtype)
+        self.max = np.zeros(capacity, dtype=dtype)
+        self.mean = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+
+    def append(self, mins, maxs, means):
+        n = len(mins)
+        if self.count + n > len(self.min):
+            size = max(self.count + n, 2 * len(self.min))
+            self.min = np.resize(self.min, size)
+            self.max = np.resize(self.max, size)
+            self.mean = np.resize(self.mean, size)
+        self.min[self.count:self.count + n] = mins
+        self.max[self.count:self.count + n] = maxs
+        self.mean[self.count:self.count + n] = means
+        self.count += n
+
+
+class LODPyramid:
+    """
+    多分辨率 min/max/mean 降采样金字塔，随样本到达增量维护
+    - 第 0 层为原始样本；第 k 层每桶覆盖 factor^k 个原始样本
+    - append() 只处理新样本：逐层把凑满 factor 个的下层条目合并为上层桶，O(新样本) 摊销
+    - query(start, stop, max_points) 选取桶数不超过 max_points 的最细一层，
+      返回的点数与可见时长无关（约为屏幕宽度），末尾未凑满的桶由各层余量即时合并
+    样本序号为累计序号（从 0 开始）。NaN 表示缺失样本（如数据流暂停的区间）：min / max / mean 忽略 NaN，
+    整桶缺失时为 NaN；含缺失的上层桶 mean 为下层有效桶的等权平均（近似）。
+    """
+    def __init__(self, factor=4, dtype=np.float32, capacity=4096):
+        self.factor = factor
+        self.dtype = np.dtype(dtype)
+        self.raw = np.zeros(capacity, dtype=self.dtype)
+        self.total = 0
+        self.levels = []
+
+    def __len__(self):
+        return self.total
+
+    # ---------------------- 追加 ----------------------
+    def append(self, block):
+        block = np.asarray(block, dtype=self.dtype)
+        n = len(block)
+        if n == 0:
+            return
+        if self.total + n > len(self.raw):
+            self.raw = np.resize(self.raw, max(self.total + n, 2 * len(self.raw)))
+        self.raw[self.total:self.total + n] = block
+        self.total += n
+
+        # 逐层合并：第 k 层 (self.levels[k]) 消费下层中尚未合并、已凑满 factor 个的条目
+        f = self.factor
+        lower_min = lower_max = lower_mean = self.raw[:self.total]
+        k = 0
+        while True:
+            if k == len(self.levels):
+                if len(lower_min) < f:
+                    break
+                self.levels.append(_Level(self.dtype))
+            level = self.levels[k]
+            start = level.count * f
+            m = (len(lower_min) - start) // f
+            if m <= 0:
+                break  # 本层没有新桶，更高层也不会有
+            end = start + m * f
+            level.append(np.fmin.reduce(lower_min[start:end].reshape(m, f), axis=1),
+                         np.fmax.reduce(lower_max[start:end].reshape(m, f), axis=1),
+                         _nanmean_rows(lower_mean[start:end].reshape(m, f)))
+            lower_min, lower_max = level.min[:level.count], level.max[:level.count]
+            lower_mean = level.mean[:level.count]
+            k += 1
+
+    # ---------------------- 查询 ----------------------
+    def choose_level(self, start, stop, max_points):
+        """返回使 [start, stop) 桶数不超过 max_points 的最细层号（0 为原始样本）"""
+        span = max(stop - start, 1)
+        k = 0
+        while k < len(self.levels) and span / self.factor ** k > max_points:
+            k += 1
+        return k
+
+    def _tail(self, k):
+        """第 k 层 (k >= 1) 末尾尚未凑满的桶：合并 0..k-1 层中未被上层消费的条目，返回 (min, max, mean) 或 None"""
+        mins, maxs, total, n = [], [], 0.0, 0
+        for j in range(k):
+            consumed = self.levels[j].count * self.factor
+            if j == 0:
+                seg_min = seg_max = seg_mean = self.raw[consumed:self.total]
+            else:
+                lower = self.levels[j - 1]
+                seg_min, seg_max = lower.min[consumed:lower.count], lower.max[consumed:lower.count]
+                seg_mean = lower.mean[consumed:lower.count]
+            if len(seg_min):
+                width = self.factor ** j
+                valid = ~np.isnan(seg_mean)
+                mins.append(np.fmin.reduce(seg_min))
+                maxs.append(np.fmax.reduce(seg_max))
+                total += float(np.sum(seg_mean[valid], dtype=np.float64)) * width
+                n += int(np.count_nonzero(valid)) * width
+        if not mins:
+            return None
+        return np.fmin.reduce(mins), np.fmax.reduce(maxs), total / n if n else np.nan
+
+    def query(self, start, stop, max_points=1000):
+        """
+        取 [start, stop) 的显示数据
+        返回 (level, x, ymin, ymax, ymean)：x 为各点/各桶起点的样本序号；
+        level 为 0 时 ymin/ymax/ymean 均为原始样本
+        """
+        start = max(0, int(start))
+        stop = min(self.total, int(np.ceil(stop)))
+        if stop <= start:
+            empty = np.zeros(0, dtype=self.dtype)
+            return 0, np.zeros(0, dtype=np.int64), empty, empty, empty.astype(np.float64)
+
+        k = self.choose_level(start, stop, max_points)
+        if k == 0:
+            y = self.raw[start:stop]
+            return 0, np.arange(start, stop), y, y, y.astype(np.float64)
+
+        width = self.factor ** k
+        level = self.levels[k - 1]
+        lo, hi = start // width, min(level.count, -(-stop // width))
+        x = np.arange(lo, hi) * width
+        ymin, ymax, ymean = level.min[lo:hi], level.max[lo:hi], level.mean[lo:hi]
+        if stop > level.count * width:
+            tail = self._tail(k)
+            if tail is not None:
+                x = np.append(x, level.count * width)
+                ymin = np.append(ymin, tail[0])
+                ymax = np.append(ymax, tail[1])
+                ymean = np.append(ymean, tail[2])
+        return k, x, ymin, ymax, ymean
+
+    def envelope(self, start, stop, max_points=1000):
+        """
+        便于绘制的包络折线：原始层直接返回 (x, y)；降采样层按桶交替输出 min / max，
+        一条折线即可画出包络，点数不超过 2 * max_points
+        """
+        k, x, ymin, ymax, _ = self.query(start, stop, max_points)
+        if k == 0:
+            return x.astype(np.float64), ymin.astype(np.float64)
+        xs = np.repeat(x.astype(np.float64), 2)
+        ys = np.empty(2 * len(x))
+        ys[0::2], ys[1::2] = ymin, ymax
+        return xs, ys
@@ -1,18 +1,24 @@
 import numpy as np
 
-def normalize_signal(data, feature_range=(-1, 1)):
+def normalize_signal(data, feature_range=(-1, 1), out=None):
     """
     对信号进行归一化
     data: list 或 np.array
     feature_range: 归一化范围，默认 [-1,1]
+    out: 可选的 float32 输出数组（长度与 data 相同，可以就是 data），给出时原地计算、不分配新数组
     返回归一化后的 np.array
     """
-    data = np.array(data, dtype=np.float32)
+    if out is None:
+        data = np.array(data, dtype=np.float32)
+        out = data
     min_val = np.min(data)
     max_val = np.max(data)
     if max_val - min_val == 0:
-        return np.zeros_like(data)
+        out[:] = 0
+        return out
     min_range, max_range = feature_range
-    normalized = (data - min_val) / (max_val - min_val)  # 归一化到 [0,1]
-    normalized = normalized * (max_range - min_range) + min_range  # 映射到指定范围
-    return normalized
\ No newline at end of file
+    np.subtract(data, min_val, out=out)                         # 归一化到 [0,1]
+    np.divide(out, max_val - min_val, out=out)
+    np.multiply(out, max_range - min_range, out=out)            # 映射到指定范围
+    np.add(out, min_range, out=out)
+    return out
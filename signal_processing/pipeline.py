@@ -0,0 +1,251 @@
+from contextlib import nullcontext
+
+import numpy as np
+
+from signal_processing.filters import BlockNLMSFilter, StreamingBandpass, StreamingSavgol
+from signal_processing.normal import normalize_signal
+from signal_processing.ring_buffer import RingBuffer
+
+
+# ====================================================
+# ==================== 阶段 ===========================
+# ====================================================
+class Stage:
+    """
+    流水线阶段：process(x, out, ref) 把结果写入预分配的 float32 数组 out，返回写入部分的视图
+    - 构造参数即阶段配置；enabled=False 时整个阶段被跳过（输入原样传给下一阶段）
+    - uses_ref 的阶段需要加速度参考，参考缺失时跳过；本窗口不启用时调用 skip() 只推进内部状态
+    - allocations 为阶段累计分配的数组个数（工作区扩容、初始化等），稳态下应不再增长
+    """
+    name = None
+    uses_ref = False
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+
+    def prepare(self, fs, max_block):
+        """按采样率与最大块长创建内部状态与工作区"""
+
+    def process(self, x, out, ref=None):
+        raise NotImplementedError
+
+    def skip(self, x, ref):
+        """本窗口不运行时调用（如信号质量判定无需 NLMS）"""
+
+    def reset(self):
+        pass
+
+    @property
+    def allocations(self):
+        return 0
+
+
+class BandpassStage(Stage):
+    name = 'bandpass'
+
+    def __init__(self, lowcut=0.5, highcut=4.5, order=4, enabled=True):
+        super().__init__(enabled)
+        self.lowcut, self.highcut, self.order = lowcut, highcut, order
+        self.filter = None
+
+    def prepare(self, fs, max_block):
+        self.filter = StreamingBandpass(self.lowcut, self.highcut, fs, self.order, max_block=max_block)
+
+    def process(self, x, out, ref=None):
+        return self.filter.process(x, out)
+
+    def reset(self):
+        self.filter.reset()
+
+    @property
+    def allocations(self):
+        return self.filter.allocations
+
+
+class NLMSStage(Stage):
+    name = 'nlms'
+    uses_ref = True
+
+    def __init__(self, filter_order=8, mu=0.01, eps=1e-6, block_size=16, normalized=True, enabled=True):
+        super().__init__(enabled)
+        self.params = dict(filter_order=filter_order, mu=mu, eps=eps, block_size=block_size, normalized=normalized)
+        self.filter = None
+
+    def prepare(self, fs, max_block):
+        self.filter = BlockNLMSFilter(max_block=max_block, **self.params)
+
+    def process(self, x, out, ref=None):
+        return self.filter.process(x, ref, out)
+
+    def skip(self, x, ref):
+        self.filter.advance(ref)
+
+    def reset(self):
+        self.filter.reset()
+
+    @property
+    def allocations(self):
+        return self.filter.allocations
+
+
+class SavgolStage(Stage):
+    name = 'savgol'
+
+    def __init__(self, window_length=11, polyorder=3, enabled=True):
+        super().__init__(enabled)
+        self.window_length, self.polyorder = window_length, polyorder
+        self.filter = None
+
+    def prepare(self, fs, max_block):
+        self.filter = StreamingSavgol(self.window_length, self.polyorder, max_block=max_block)
+
+    def process(self, x, out, ref=None):
+        return self.filter.process(x, out)
+
+    def reset(self):
+        self.filter.reset()
+
+    @property
+    def allocations(self):
+        return self.filter.allocations
+
+
+STAGE_TYPES = {cls.name: cls for cls in (BandpassStage, NLMSStage, SavgolStage)}
+
+# 默认处理链：带通 → 分块 NLMS（按信号质量启用） → SG 平滑
+DEFAULT_STAGES = (
+    ('bandpass', {'lowcut': 0.5, 'highcut': 4.5, 'order': 4}),
+    ('nlms', {'filter_order': 8, 'mu': 0.01, 'block_size': 16}),
+    ('savgol', {'window_length': 11, 'polyorder': 3}),
+)
+
+
+def build_stage(spec):
+    """由声明创建阶段：Stage 实例、阶段名，或 (阶段名, 参数字典)"""
+    if isinstance(spec, Stage):
+        return spec
+    name, params = (spec, {}) if isinstance(spec, str) else spec
+    if name not in STAGE_TYPES:
+        raise ValueError(f"未知的处理阶段: {name}（可选 {', '.join(STAGE_TYPES)}）")
+    return STAGE_TYPES[name](**params)
+
+
+# ====================================================
+# ================== 处理流水线 =======================
+# ====================================================
+class PPGPipeline:
+    """
+    可组合的流式 PPG 预处理流水线：阶段按声明顺序执行，结果追加到输出环形缓冲
+    - stages      : 阶段声明序列（见 DEFAULT_STAGES / build_stage），顺序、参数与启用开关均可配置
+    - 两块 float32 乒乓工作区在各阶段间交替作为输入 / 输出，每块长度为 max_block（默认 output_len）
+    - normalized_window() 每次分配一个新的输出数组并原地归一化：发出的窗口为只读快照（ProcessedWindow 约定），
+      消费者延迟处理或长期持有都不会被后续 tick 覆盖
+    - 稳态下每个 tick 只有这一次分配（processed_ppg 有订阅者时）；allocations / last_allocations 为累计 / 最近一次 tick 的分配数，
+      只统计流水线自身（阶段工作区、超长块取回与归一化窗口），质量评估、加速度插值与心搏检测的临时数组不在其内
+    stats 为可选的分阶段计时器（提供 stage(name) 上下文，如 ble.instrumentation.PipelineStats）。
+    """
+    def __init__(self, fs=100, output_len=2000, stages=DEFAULT_STAGES, max_block=None, stats=None):
+        self.fs = fs
+        self.stats = stats
+        self.output_len = output_len
+        self.max_block = max_block or output_len
+        self.stages = [build_stage(spec) for spec in stages]
+        names = [stage.name for stage in self.stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"处理阶段重复: {names}")
+        for stage in self.stages:
+            stage.prepare(fs, self.max_block)
+
+        self._work = (np.zeros(self.max_block, dtype=np.float32), np.zeros(self.max_block, dtype=np.float32))
+        self.output = RingBuffer(output_len, dtype=np.float32, seq_dtype=None)
+
+        self._own_allocations = 0
+        self._tick_start = 0
+        self.last_allocations = 0
+
+    # ---------------------- 配置 ----------------------
+    def stage(self, name):
+        """按名称返回阶段，不存在时返回 None"""
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        return None
+
+    @property
+    def nlms(self):
+        stage = self.stage('nlms')
+        return stage.filter if stage is not None else None
+
+    @property
+    def uses_ref(self):
+        """是否有启用的阶段需要加速度参考（不运行的窗口也要用参考推进其延迟线）"""
+        return any(stage.enabled and stage.uses_ref for stage in self.stages)
+
+    @property
+    def allocations(self):
+        return self._own_allocations + sum(stage.allocations for stage in self.stages)
+
+    # ---------------------- 处理 ----------------------
+    def process(self, block, ref=None, use_nlms=True):
+        """
+        处理新数据块；ref 为与 block 对齐的加速度参考 (n,3)，返回本次新增输出（工作区视图，下次处理前有效）
+        use_nlms=False 时需要参考的阶段不运行，只推进其延迟线
+        """
+        self._tick_start = self.allocations
+        n = len(block)
+        ref = ref[len(ref) - n:] if ref is not None and len(ref) >= n else None
+        if n > self.max_block:
+            # 超长块分段处理（只在积压时出现），各段结果从输出缓冲一次取回
+            before = self.output_index
+            for s in range(0, n, self.max_block):
+                self._run(block[s:s + self.max_block], None if ref is None else ref[s:s + self.max_block], use_nlms)
+            self._own_allocations += 1
+            result = self.output.latest(min(self.output_index - before, self.output_len)).copy()
+        else:
+            result = self._run(block, ref, use_nlms)
+        self.last_allocations = self.allocations - self._tick_start
+        return result
+
+    def _run(self, x, ref, use_nlms):
+        slot = 0
+        for stage in self.stages:
+            if not stage.enabled:
+                continue
+            if stage.uses_ref:
+                if ref is None or len(ref) < len(x):
+                    continue
+                if not use_nlms:
+                    stage.skip(x, ref[len(ref) - len(x):])
+                    continue
+                stage_ref = ref[len(ref) - len(x):]
+            else:
+                stage_ref = None
+            with self._stage(stage.name):
+                x = stage.process(x, self._work[slot], stage_ref)
+            slot ^= 1
+        self.output.write(x)
+        return x
+
+    def normalized_window(self, feature_range=(-1, 1)):
+        """输出窗口（output_len 个样本，不足时前部为 0）的归一化快照，每次为新数组（计入本 tick 的分配数）"""
+        snapshot = np.empty(self.output_len, dtype=np.float32)
+        self._own_allocations += 1
+        self.last_allocations = self.allocations - self._tick_start
+        self.output.latest_into(snapshot)
+        return normalize_signal(snapshot, feature_range, out=snapshot)
+
+    def _stage(self, name):
+        return self.stats.stage(name) if self.stats is not None else nullcontext()
+
+    # ---------------------- 输出 ----------------------
+    @property
+    def output_index(self):
+        return self.output.total
+
+    def get_output(self):
+        return self.output.latest(self.output_len)
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+        self.output.clear()
@@ -0,0 +1,122 @@
+import numpy as np
+
+# 每个处理窗口的决策
+RUN_NLMS = 'nlms'        # 有运动但信号可用：运行 NLMS 去伪影
+SKIP_NLMS = 'skip_nlms'  # 静止且信号良好：NLMS 无收益，跳过
+SKIP_HR = 'skip_hr'      # 运动严重 / 离腕 / 信号平坦：跳过 NLMS 与心率估计
+
+
+class SignalQuality:
+    """
+    一个处理窗口的信号质量评估结果
+    - index         : 综合质量指数 0~1（预热阶段为 None）
+    - decision      : RUN_NLMS / SKIP_NLMS / SKIP_HR
+    - motion        : 加速度动态分量（g）
+    - perfusion     : 灌注指数 AC/DC（%）
+    - kurtosis      : PPG 超额峰度
+    - concentration : 心率频带谱集中度 0~1
+    - reason        : 决策原因（'ok' / 'still' / 'warmup' / 'off_wrist' / 'low_quality'）
+    """
+    __slots__ = ('index', 'decision', 'motion', 'perfusion', 'kurtosis', 'concentration', 'reason')
+
+    def __init__(self, index, decision, motion=None, perfusion=None, kurtosis=None, concentration=None,
+                 reason='ok'):
+        self.index = index
+        self.decision = decision
+        self.motion = motion
+        self.perfusion = perfusion
+        self.kurtosis = kurtosis
+        self.concentration = concentration
+        self.reason = reason
+
+    @property
+    def hr_valid(self):
+        return self.decision != SKIP_HR
+
+    def __repr__(self):
+        index = "-" if self.index is None else f"{self.index:.2f}"
+        return f"SignalQuality({index}, {self.decision}, {self.reason})"
+
+
+class QualityAssessor:
+    """
+    向量化信号质量指数（SQI），每个 hop 在最近 window_sec 秒的原始 PPG / 加速度上计算一次
+    - motion        : 各轴去均值后的加速度幅值 RMS，相对重力幅值（g）
+    - perfusion     : 去均值 PPG 标准差 / 直流分量（%），过低视为离腕或贴合不良
+    - kurtosis      : 去均值 PPG 的超额峰度，运动尖峰使其升高
+    - concentration : 心率频带内最强峰及其二次谐波（各 ±2 bin）能量占 0.5~5 Hz 能量的比例
+    index = concentration × (1 - motion/max_motion) × (1 - max(kurtosis,0)/max_kurtosis)，裁剪到 0~1。
+    决策：灌注过低或 index < min_index → SKIP_HR；motion < still_motion → SKIP_NLMS；否则 RUN_NLMS。
+    数据不足 min_sec 秒时不做判定（RUN_NLMS，index 为 None）。
+    """
+    def __init__(self, fs=100, accel_fs=None, window_sec=8.0, min_sec=2.0, hr_band=(0.75, 3.1),
+                 still_motion=0.02, max_motion=1.0, min_perfusion=0.05, max_kurtosis=8.0, min_index=0.25):
+        self.fs = fs
+        self.accel_fs = accel_fs or fs
+        self.window_sec = window_sec
+        self.min_len = int(min_sec * fs)
+        self.hr_band = hr_band
+        self.still_motion = still_motion
+        self.max_motion = max_motion
+        self.min_perfusion = min_perfusion
+        self.max_kurtosis = max_kurtosis
+        self.min_index = min_index
+
+        self.ppg_len = int(window_sec * fs)
+        self.accel_len = int(window_sec * self.accel_fs)
+        self._window = np.hanning(self.ppg_len)
+
+    # ---------------------- 各项指标 ----------------------
+    def motion(self, accel):
+        """加速度动态分量（g）：各轴去均值后幅值的 RMS / 平均重力幅值"""
+        if len(accel) < 2:
+            return 0.0
+        accel = np.asarray(accel, dtype=np.float64)
+        mean = accel.mean(axis=0)
+        dynamic = accel - mean
+        gravity = max(float(np.sqrt(mean @ mean)), 1e-9)
+        return float(np.sqrt(np.mean(np.einsum("ij,ij->i", dynamic, dynamic)))) / gravity
+
+    def spectral_concentration(self, centered):
+        """心率频带最强峰及其二次谐波的能量占比"""
+        n = len(centered)
+        window = self._window if n == len(self._window) else np.hanning(n)
+        power = np.abs(np.fft.rfft(centered * window)) ** 2
+        freqs = np.fft.rfftfreq(n, 1.0 / self.fs)
+        total = power[(freqs >= 0.5) & (freqs <= 5.0)].sum()
+        band = np.flatnonzero((freqs >= self.hr_band[0]) & (freqs <= self.hr_band[1]))
+        if total <= 0 or len(band) == 0:
+            return 0.0
+        k = band[np.argmax(power[band])]
+        peak = power[max(k - 2, 0):k + 3].sum() + power[max(2 * k - 2, 0):2 * k + 3].sum()
+        return float(min(peak / total, 1.0))
+
+    # ---------------------- 综合评估 ----------------------
+    def assess(self, ppg, accel):
+        """ppg: 最近一段原始 PPG (n,)；accel: 同时段加速度 (m,3)；返回 SignalQuality"""
+        ppg = np.asarray(ppg, dtype=np.float64)[-self.ppg_len:]
+        accel = np.asarray(accel)[-self.accel_len:]
+        if len(ppg) < self.min_len:
+            return SignalQuality(None, RUN_NLMS, reason='warmup')
+
+        motion = self.motion(accel)
+        dc = float(np.mean(ppg))
+        centered = ppg - dc
+        var = float(np.mean(centered * centered))
+        perfusion = 100.0 * np.sqrt(var) / abs(dc) if dc else 0.0
+        if var <= 0 or perfusion < self.min_perfusion:
+            return SignalQuality(0.0, SKIP_HR, motion, perfusion, reason='off_wrist')
+
+        kurtosis = float(np.mean(centered ** 4) / (var * var) - 3.0)
+        concentration = self.spectral_concentration(centered)
+        index = concentration * max(0.0, 1.0 - motion / self.max_motion) \
+            * max(0.0, 1.0 - max(kurtosis, 0.0) / self.max_kurtosis)
+        index = float(np.clip(index, 0.0, 1.0))
+
+        if index < self.min_index:
+            decision, reason = SKIP_HR, 'low_quality'
+        elif motion < self.still_motion:
+            decision, reason = SKIP_NLMS, 'still'
+        else:
+            decision, reason = RUN_NLMS, 'ok'
+        return SignalQuality(index, decision, motion, perfusion, kurtosis, concentration, reason)
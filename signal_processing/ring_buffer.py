@@ -0,0 +1,169 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    多通道环形缓冲
+    - 批量写入：每个数据块最多两次切片赋值（跨越末尾时分两段）
+    - 每个样本附带一列序号/时间戳 seq，默认为累计样本序号
+    - latest(n) 在数据连续时返回视图，跨越边界时只做一次拷贝；latest_into(out) 拷贝到调用方的缓冲，不分配
+    - seq_dtype=None 时不保存序号列
+    注意：返回的视图与缓冲区共享内存，后续写入会覆盖其内容，需要长期持有时请自行 copy。
+    """
+    def __init__(self, capacity, channels=None, dtype=np.float32, seq_dtype=np.int64):
+        self.capacity = capacity
+        self.channels = channels
+        shape = (capacity,) if channels is None else (capacity, channels)
+        self.data = np.zeros(shape, dtype=dtype)
+        self.seq = None if seq_dtype is None else np.zeros(capacity, dtype=seq_dtype)
+        self.total = 0  # 累计写入样本数
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    # ---------------------- 写入 ----------------------
+    def write(self, block, seq=None):
+        """
+        追加一个数据块
+        seq: None 时使用累计样本序号；标量时整块使用同一值；数组时逐样本对应
+        """
+        block = np.asarray(block)
+        n = len(block)
+        if n == 0:
+            return
+        if self.seq is None:
+            self._write_data(block)
+            return
+        if seq is None:
+            seq = np.arange(self.total, self.total + n)
+        else:
+            seq = np.broadcast_to(np.asarray(seq, dtype=self.seq.dtype), (n,))
+
+        # 超过容量时只保留最后 capacity 个样本
+        skip = max(0, n - self.capacity)
+        if skip:
+            block = block[skip:]
+            seq = seq[skip:]
+            self.total += skip
+            n = self.capacity
+
+        start = self.total % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = block[:first]
+        self.seq[start:start + first] = seq[:first]
+        if first < n:
+            self.data[:n - first] = block[first:]
+            self.seq[:n - first] = seq[first:]
+        self.total += n
+
+    def _write_data(self, block):
+        """无序号列时的写入：只有数据的一到两次切片赋值"""
+        n = len(block)
+        if n > self.capacity:
+            self.total += n - self.capacity
+            block = block[n - self.capacity:]
+            n = self.capacity
+        start = self.total % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = block[:first]
+        if first < n:
+            self.data[:n - first] = block[first:]
+        self.total += n
+
+    # ---------------------- 读取 ----------------------
+    def _span(self, buf, n):
+        start = (self.total - n) % self.capacity
+        if start + n <= self.capacity:
+            return buf[start:start + n]
+        return np.concatenate((buf[start:], buf[:start + n - self.capacity]))
+
+    def latest(self, n=None):
+        """
+        按时间顺序返回最新 n 个样本（默认整个容量）
+        写入量不足 n 时前部为初始零值，与 np.roll 整个缓冲的结果一致
+        """
+        n = self.capacity if n is None else min(n, self.capacity)
+        return self._span(self.data, n)
+
+    def latest_into(self, out, seq_out=None):
+        """把最新 len(out) 个样本（及序号列）按时间顺序拷贝到 out / seq_out，返回 out；语义同 latest()"""
+        n = len(out)
+        start = (self.total - n) % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self.data[start:start + first]
+        out[first:] = self.data[:n - first]
+        if seq_out is not None:
+            seq_out[:first] = self.seq[start:start + first]
+            seq_out[first:] = self.seq[:n - first]
+        return out
+
+    def latest_seq(self, n=None):
+        """与 latest(n) 对应的序号/时间戳列"""
+        n = self.capacity if n is None else min(n, self.capacity)
+        return self._span(self.seq, n)
+
+    def since(self, index):
+        """返回累计序号 >= index 的样本（超出容量的部分已被覆盖，不再返回）"""
+        return self.latest(max(0, min(self.total - index, self.capacity)))
+
+    def clear(self):
+        self.data[:] = 0
+        if self.seq is not None:
+            self.seq[:] = 0
+        self.total = 0
+
+
+def _aligned(nbytes):
+    return (nbytes + 7) // 8 * 8
+
+
+class SharedRingBuffer(RingBuffer):
+    """
+    存放在 multiprocessing.shared_memory 中的 RingBuffer，可在进程间共享而无需序列化数组
+    - 父进程 SharedRingBuffer(...) 创建，spec() 得到可传给子进程的小字典
+    - 子进程 SharedRingBuffer.attach(spec) 按名称映射同一块内存；只有创建方负责 unlink
+    布局：[total: int64][data][seq]。读写方需用跨进程锁保护（见 ble.process_backend）。
+    """
+    def __init__(self, capacity, channels=None, dtype=np.float32, seq_dtype=np.int64, name=None):
+        self.capacity = capacity
+        self.channels = channels
+        shape = (capacity,) if channels is None else (capacity, channels)
+        dtype, seq_dtype = np.dtype(dtype), np.dtype(seq_dtype)
+        data_bytes = _aligned(int(np.prod(shape)) * dtype.itemsize)
+        size = 8 + data_bytes + capacity * seq_dtype.itemsize
+
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self._header = np.ndarray((1,), dtype=np.int64, buffer=self.shm.buf)
+        self.data = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=8)
+        self.seq = np.ndarray((capacity,), dtype=seq_dtype, buffer=self.shm.buf, offset=8 + data_bytes)
+        if self.owner:
+            self.clear()
+
+    @property
+    def total(self):
+        return int(self._header[0])
+
+    @total.setter
+    def total(self, value):
+        self._header[0] = value
+
+    def spec(self):
+        return {'capacity': self.capacity, 'channels': self.channels, 'dtype': self.data.dtype.str,
+                'seq_dtype': self.seq.dtype.str, 'name': self.shm.name}
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(**spec)
+
+    def close(self):
+        """释放本进程的映射；创建方同时 unlink"""
+        if self.shm is None:
+            return
+        del self._header, self.data, self.seq
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
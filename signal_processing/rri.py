@@ -1,5 +1,7 @@
 import numpy as np
-from scipy.signal import find_peaks, butter, filtfilt
+from scipy.signal import find_peaks, filtfilt
+
+from signal_processing.filters import butter_bandpass
 
 class RRIProcessor:
     """
@@ -18,13 +20,14 @@ class RRIProcessor:
         # 最大峰间距，用于异常值过滤（ms）
         self.max_rri_ms = 60_000 / hr_min
         self.last_peaks = []
+        self.reset_stream()
 
     # ------------------ 滤波器 ------------------
     def bandpass_filter(self, data, lowcut=0.9, highcut=3.2, order=4):
         nyq = 0.5 * self.fs
         if highcut >= nyq:
             highcut = nyq - 1e-5
-        b, a = butter(order, [lowcut/nyq, highcut/nyq], btype='band')
+        b, a = butter_bandpass(lowcut, highcut, self.fs, order)  # 设计按参数缓存，不再每次调用重新设计
         return filtfilt(b, a, data)
 
     # ------------------ 峰检测 ------------------
@@ -78,3 +81,151 @@ class RRIProcessor:
 
         bpm = 60_000 / np.mean(rr_intervals)  # BPM
         return rr_intervals, bpm
+
+    # ====================================================
+    # ================ 流式检测模式 ========================
+    # ====================================================
+    def reset_stream(self, tau_sec=5.0):
+        """
+        初始化流式检测状态
+        - tau_sec : 自适应阈值所用均值/方差的指数平滑时间常数
+        """
+        self.beats = BeatHistory()
+        self.stream_total = 0                       # 已输入的累计样本数
+        self._tail = np.zeros(0, dtype=np.float32)  # 回看余量
+        self._alpha = 1.0 / max(1.0, tau_sec * self.fs)
+        self._mean = None
+        self._sq_mean = None
+        self._gaps = np.zeros(0, dtype=np.int64)    # 跳过区间的起点，跨越它的间期不计入 RRI
+        self._skipping = False
+
+    def skip_stream(self, count):
+        """
+        跳过 count 个样本（信号质量不合格的窗口）：累计序号照常推进，但不检测心搏，
+        跳过区间两侧心搏之间的间期不计入 stream_rri / stream_intervals
+        """
+        if not self._skipping:
+            self._gaps = np.append(self._gaps, self.stream_total)
+            self._skipping = True
+        self.stream_total += count
+        self._tail = self._tail[:0]
+
+    def update_stream(self, block):
+        """
+        输入新到达的样本块（需为跨调用连续、未逐窗归一化的信号），返回本次新确认的心搏位置（累计样本序号）
+        只扫描新样本 + 回看余量；距块末端不足 min_distance 的候选峰留到下次确认，
+        已输出过的心搏不会重复输出。
+        """
+        block = np.asarray(block, dtype=np.float32)
+        if len(block) == 0:
+            return np.zeros(0, dtype=np.int64)
+        self._skipping = False
+
+        # 自适应阈值：指数平滑的均值与二阶矩，按块整体更新（O(新样本)）
+        decay = (1.0 - self._alpha) ** len(block)
+        if self._mean is None:
+            self._mean, self._sq_mean = float(np.mean(block)), float(np.mean(block * block))
+        else:
+            self._mean = decay * self._mean + (1 - decay) * float(np.mean(block))
+            self._sq_mean = decay * self._sq_mean + (1 - decay) * float(np.mean(block * block))
+        std = np.sqrt(max(self._sq_mean - self._mean ** 2, 0.0))
+        peak_height = self._mean + 0.5 * std
+
+        segment = np.concatenate((self._tail, block))
+        seg_start = self.stream_total - len(self._tail)
+        self.stream_total += len(block)
+
+        peaks, _ = find_peaks(segment, distance=self.min_distance, height=peak_height)
+        # 只确认右侧已有足够样本的峰
+        peaks = peaks[peaks < len(segment) - self.min_distance]
+
+        confirmed = []
+        last = self.beats.last_position()
+        for p in peaks:
+            pos = seg_start + int(p)
+            if last is not None and pos - last < self.min_distance:
+                continue
+            confirmed.append(pos)
+            self.beats.append(pos, pos / self.fs, segment[p])
+            last = pos
+
+        # 回看余量：覆盖未确认区间和上一个心搏附近
+        keep = 2 * self.min_distance + 1
+        self._tail = segment[-keep:]
+        return np.asarray(confirmed, dtype=np.int64)
+
+    def stream_intervals(self, count=None):
+        """最近 count 个心搏构成的间期：返回 (间期结束处的心搏位置, 间期 ms)，跨越跳过区间的间期被剔除"""
+        positions = self.beats.positions if count is None else self.beats.positions[-(count + 1):]
+        rr = np.diff(positions) / self.fs * 1000.0
+        ends = positions[1:]
+        if len(self._gaps) and len(rr):
+            segment = np.searchsorted(self._gaps, positions, side='right')
+            keep = segment[1:] == segment[:-1]
+            ends, rr = ends[keep], rr[keep]
+        return ends, rr
+
+    def stream_rri(self, count=None):
+        """最近 count 个心搏间期（ms），默认全部"""
+        return self.stream_intervals(count)[1]
+
+    def stream_bpm(self, n_beats=8):
+        """
+        最近 n_beats 个心搏间期的平均心率，心搏不足 2 个时返回 None
+        只使用最近一次跳过区间之后的间期：跳过后尚未确认新的间期时返回 None，不沿用跳过前的心率
+        """
+        ends, rr = self.stream_intervals(n_beats)
+        if len(self._gaps):
+            rr = rr[ends >= self._gaps[-1]]
+        if len(rr) == 0:
+            return None
+        rr = np.clip(rr, 60_000 / self.hr_max, 60_000 / self.hr_min)
+        return 60_000 / np.mean(rr)
+
+    def peaks_in_window(self, window_end, window_len):
+        """返回位于 [window_end - window_len, window_end) 内的心搏，索引相对窗口起点"""
+        start = window_end - window_len
+        positions = self.beats.positions
+        lo, hi = np.searchsorted(positions, [start, window_end])
+        return positions[lo:hi] - start
+
+
+class BeatHistory:
+    """
+    心搏历史：按需倍增的紧凑数组，保存累计样本序号、时间（秒）与幅值
+    追加为均摊 O(1)，positions / times / amplitudes 返回有效部分的视图。
+    """
+    def __init__(self, capacity=1024):
+        self._positions = np.zeros(capacity, dtype=np.int64)
+        self._times = np.zeros(capacity, dtype=np.float64)
+        self._amplitudes = np.zeros(capacity, dtype=np.float32)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, position, t, amplitude):
+        if self.count == len(self._positions):
+            size = 2 * len(self._positions)
+            self._positions = np.resize(self._positions, size)
+            self._times = np.resize(self._times, size)
+            self._amplitudes = np.resize(self._amplitudes, size)
+        self._positions[self.count] = position
+        self._times[self.count] = t
+        self._amplitudes[self.count] = amplitude
+        self.count += 1
+
+    def last_position(self):
+        return int(self._positions[self.count - 1]) if self.count else None
+
+    @property
+    def positions(self):
+        return self._positions[:self.count]
+
+    @property
+    def times(self):
+        return self._times[:self.count]
+
+    @property
+    def amplitudes(self):
+        return self._amplitudes[:self.count]
@@ -0,0 +1,144 @@
+import numpy as np
+
+TIMESTAMP_WRAP = 1 << 32  # 设备时间戳为 uint32 毫秒
+
+
+class StreamClock:
+    """
+    单个数据流的采样时钟
+    - 设备时间戳（ms，包内首个样本的时刻）展开 uint32 回绕后换算为秒
+    - 实际采样率 = 累计样本数 / 累计时长，只按时间戳在连续的包之间累计（与估计值本身无关）；
+      时间戳与预测值相差超过 gap_tolerance 个样本间隔视为断流（丢包），重新锚定但保留已有估计
+    - 时间戳倒退超过 max_backstep 秒（设备重启）时完全重置
+    没有时间戳的块按估计采样率接在上一块之后。
+    """
+    def __init__(self, nominal_fs, gap_tolerance=2.0, max_backstep=1.0, min_span=1.0):
+        self.nominal_fs = nominal_fs
+        self.gap_tolerance = gap_tolerance
+        self.max_backstep = max_backstep
+        self.min_span = min_span
+        self.reset()
+
+    def reset(self):
+        self._last_raw = None
+        self._wraps = 0
+        self._next_time = 0.0       # 预测的下一个样本时刻（秒）
+        self._anchor_time = None    # 当前连续段起点
+        self._anchor_samples = 0    # 当前连续段已写入的样本数
+        self._span = 0.0            # 当前连续段：起点到最近一个带时间戳包的时长及其之前的样本数
+        self._span_samples = 0
+        self._done_span = 0.0       # 已结束连续段的累计时长 / 样本数
+        self._done_samples = 0
+        self.gaps = 0
+        self.resets = 0
+
+    @property
+    def fs(self):
+        """估计的实际采样率；累计时长不足 min_span 秒时返回标称值"""
+        span = self._done_span + self._span
+        if span < self.min_span:
+            return float(self.nominal_fs)
+        return (self._done_samples + self._span_samples) / span
+
+    @property
+    def drift_ppm(self):
+        """实际采样率相对标称值的偏差（ppm）"""
+        return (self.fs / self.nominal_fs - 1.0) * 1e6
+
+    def _unwrap(self, raw):
+        raw = int(raw)
+        if self._last_raw is not None and raw < self._last_raw - TIMESTAMP_WRAP // 2:
+            self._wraps += 1
+        self._last_raw = raw
+        return (raw + self._wraps * TIMESTAMP_WRAP) / 1000.0
+
+    def _reanchor(self, start):
+        self._done_span += self._span
+        self._done_samples += self._span_samples
+        self._anchor_time = start
+        self._anchor_samples = 0
+        self._span = 0.0
+        self._span_samples = 0
+
+    def sample_times(self, count, timestamp=None):
+        """返回一个包内 count 个样本的时刻（秒，float64）并更新采样率估计"""
+        if timestamp is None:
+            start = self._next_time
+        else:
+            start = self._unwrap(timestamp)
+            error = start - self._next_time
+            if self._anchor_time is None:
+                self._anchor_time = start
+            elif error < -self.max_backstep:
+                gaps, resets = self.gaps, self.resets
+                self.reset()
+                self.gaps, self.resets = gaps, resets + 1
+                start = self._unwrap(timestamp)
+                self._anchor_time = start
+            elif abs(error) > self.gap_tolerance / self.fs:
+                # 断流（丢包）：结束当前连续段，从本包重新锚定
+                self._reanchor(start)
+                self.gaps += 1
+            else:
+                self._span = start - self._anchor_time
+                self._span_samples = self._anchor_samples
+
+        times = start + np.arange(count) / self.fs
+        self._next_time = start + count / self.fs
+        if self._anchor_time is not None:
+            self._anchor_samples += count
+        return times
+
+    def status(self):
+        return {'fs': self.fs, 'drift_ppm': self.drift_ppm, 'gaps': self.gaps, 'resets': self.resets}
+
+
+class StreamSynchronizer:
+    """
+    PPG / 加速度时间对齐
+    - 两路各有一个 StreamClock，写入环形缓冲时把逐样本时刻作为 seq 列一并保存
+    - resample() 把加速度按时刻线性插值到新 PPG 样本的时刻，只读取覆盖这段时间的加速度尾部
+    两路采样率可以不同；PPG 时刻超出最新加速度样本时取最后一个值（DataProcessor 把这部分 PPG 留到下次处理）。
+    """
+    def __init__(self, ppg_fs, accel_fs=None):
+        self.ppg_clock = StreamClock(ppg_fs)
+        self.accel_clock = StreamClock(accel_fs or ppg_fs)
+
+    def ppg_times(self, count, timestamp=None):
+        return self.ppg_clock.sample_times(count, timestamp)
+
+    def accel_times(self, count, timestamp=None):
+        return self.accel_clock.sample_times(count, timestamp)
+
+    def resample(self, target_times, buffer):
+        """
+        把 buffer（seq 列为时刻的 RingBuffer）插值到 target_times，返回 (n, channels) float32
+        从尾部按需倍增读取长度，直到覆盖 target_times[0]
+        """
+        n = len(target_times)
+        channels = buffer.channels or 1
+        out = np.zeros((n, channels), dtype=np.float32)
+        available = len(buffer)
+        if n == 0 or available == 0:
+            return out if buffer.channels else out[:, 0]
+
+        ratio = self.accel_clock.fs / self.ppg_clock.fs
+        k = min(available, int(n * ratio) + 8)
+        while True:
+            times = buffer.latest_seq(k)
+            if times[0] <= target_times[0] or k == available:
+                break
+            k = min(available, 2 * k)
+        values = buffer.latest(k).reshape(k, channels)
+
+        # 时钟重置后只使用最后一段单调递增的数据
+        back = np.flatnonzero(np.diff(times) <= 0)
+        if len(back):
+            times, values = times[back[-1] + 1:], values[back[-1] + 1:]
+
+        for c in range(channels):
+            out[:, c] = np.interp(target_times, times, values[:, c])
+        return out if buffer.channels else out[:, 0]
+
+    def status(self):
+        return {'ppg': self.ppg_clock.status(), 'accel': self.accel_clock.status()}
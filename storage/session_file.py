@@ -0,0 +1,241 @@
+# watch-gui/storage/session_file.py
+"""
+会话录制文件格式（小端，追加写入，带索引尾）
+
+    文件头   : MAGIC(8) | meta_len(u4) | meta JSON | 填充到 8 字节对齐
+    数据块*  : CHUNK 头 | packet_ts u4[P] | packet_counts u4[P] | samples | 填充到 8 字节对齐
+               samples 为 PPG uint16[N] 或加速度 int16[N,3]
+    索引     : INDEX_ENTRY * M
+    文件尾   : index_offset(u8) | M(u4) | FOOTER_MAGIC(8)
+
+数据块按流（ppg / accel）分别攒满 chunk_samples 个样本后一次写出；
+读取端用 np.memmap 映射整个文件，按样本区间或设备时间区间只触及相关数据块。
+文件未正常关闭（缺少索引尾）时，读取端顺序扫描数据块头重建索引。
+"""
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b'WGSESS01'
+FOOTER_MAGIC = b'WGIDX001'
+
+CHUNK_HEADER = struct.Struct('<4sB3xIIq')       # b'CHNK', kind, packets, samples, first_sample
+INDEX_ENTRY = struct.Struct('<QB3xIIqII')       # offset, kind, packets, samples, first_sample, ts_first, ts_last
+FOOTER = struct.Struct('<QI8s')
+CHUNK_MAGIC = b'CHNK'
+
+STREAMS = {
+    'ppg': (0, np.dtype('<u2'), ()),
+    'accel': (1, np.dtype('<i2'), (3,)),
+}
+KIND_NAMES = {code: name for name, (code, _, _) in STREAMS.items()}
+
+
+def _pad(n):
+    return (-n) % 8
+
+
+# ====================================================
+# ==================== 写入端 =========================
+# ====================================================
+class SessionWriter:
+    """
+    会话录制：append() 只把数据块放进内存列表，攒满 chunk_samples 个样本才写盘，
+    因此在采集路径上的开销很小。close() 写出剩余数据与索引尾。
+    """
+    def __init__(self, path, fs=100, device_name="", chunk_samples=4096, meta=None):
+        self.path = path
+        self.chunk_samples = chunk_samples
+        self.file = open(path, 'wb')
+
+        header_meta = {'fs': fs, 'device_name': device_name}
+        header_meta.update(meta or {})
+        meta_bytes = json.dumps(header_meta, ensure_ascii=False).encode('utf-8')
+        self.file.write(MAGIC + struct.pack('<I', len(meta_bytes)) + meta_bytes)
+        self.file.write(b'\x00' * _pad(len(MAGIC) + 4 + len(meta_bytes)))
+
+        self.index = []
+        self.pending = {name: [] for name in STREAMS}       # [(timestamp, block), ...]
+        self.pending_samples = {name: 0 for name in STREAMS}
+        self.total_samples = {name: 0 for name in STREAMS}
+        self.closed = False
+
+    def append(self, kind, block, timestamp=None):
+        """追加一个解码后的数据块及其设备时间戳"""
+        if kind not in STREAMS or len(block) == 0:
+            return
+        self.pending[kind].append((0 if timestamp is None else int(timestamp), block))
+        self.pending_samples[kind] += len(block)
+        if self.pending_samples[kind] >= self.chunk_samples:
+            self.flush(kind)
+
+    def flush(self, kind=None):
+        """把待写数据块写成一个数据块；kind 为 None 时写出所有流"""
+        for name in ([kind] if kind else STREAMS):
+            if self.pending[name]:
+                self._write_chunk(name)
+        self.file.flush()
+
+    def _write_chunk(self, kind):
+        code, dtype, shape = STREAMS[kind]
+        items = self.pending[kind]
+        timestamps = np.array([ts for ts, _ in items], dtype='<u4')
+        counts = np.array([len(b) for _, b in items], dtype='<u4')
+        samples = np.concatenate([np.asarray(b).reshape((-1,) + shape) for _, b in items]).astype(dtype, copy=False)
+
+        offset = self.file.tell()
+        first_sample = self.total_samples[kind]
+        self.file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, code, len(items), len(samples), first_sample))
+        self.file.write(timestamps.tobytes())
+        self.file.write(counts.tobytes())
+        self.file.write(samples.tobytes())
+        written = CHUNK_HEADER.size + timestamps.nbytes + counts.nbytes + samples.nbytes
+        self.file.write(b'\x00' * _pad(written))
+
+        self.index.append((offset, code, len(items), len(samples), first_sample,
+                           int(timestamps[0]), int(timestamps[-1])))
+        self.total_samples[kind] += len(samples)
+        self.pending[kind] = []
+        self.pending_samples[kind] = 0
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        index_offset = self.file.tell()
+        for entry in self.index:
+            self.file.write(INDEX_ENTRY.pack(*entry))
+        self.file.write(FOOTER.pack(index_offset, len(self.index), FOOTER_MAGIC))
+        self.file.close()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ====================================================
+# ==================== 读取端 =========================
+# ====================================================
+class SessionReader:
+    """
+    会话读取：np.memmap 映射整个文件，按需切片
+    - samples(kind, start, stop)      按样本序号区间读取
+    - time_range(kind, t0, t1)        按设备时间戳区间读取（以包为粒度）
+    - packets(kind)                   逐包迭代 (timestamp, block)，供回放使用
+    单个数据块内的结果为 memmap 视图，跨数据块时只拼接涉及的部分。
+    """
+    def __init__(self, path):
+        self.path = path
+        self.mm = np.memmap(path, dtype=np.uint8, mode='r')
+        if bytes(self.mm[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"不是会话录制文件: {path}")
+        meta_len = struct.unpack_from('<I', self.mm, len(MAGIC))[0]
+        meta_start = len(MAGIC) + 4
+        self.meta = json.loads(bytes(self.mm[meta_start:meta_start + meta_len]).decode('utf-8'))
+        self.fs = self.meta.get('fs', 100)
+        self._data_start = meta_start + meta_len + _pad(meta_start + meta_len)
+
+        entries = self._read_footer()
+        if entries is None:
+            entries = self._scan_chunks()
+        self.chunks = {name: [] for name in STREAMS}
+        for entry in entries:
+            self.chunks[KIND_NAMES[entry[1]]].append(entry)
+
+    # ---------------------- 索引 ----------------------
+    def _read_footer(self):
+        if len(self.mm) < self._data_start + FOOTER.size:
+            return None
+        index_offset, count, magic = FOOTER.unpack_from(self.mm, len(self.mm) - FOOTER.size)
+        if magic != FOOTER_MAGIC:
+            return None
+        return [INDEX_ENTRY.unpack_from(self.mm, index_offset + i * INDEX_ENTRY.size) for i in range(count)]
+
+    def _scan_chunks(self):
+        """索引尾缺失时顺序扫描数据块头重建索引（丢弃不完整的最后一个数据块）"""
+        entries = []
+        offset = self._data_start
+        while offset + CHUNK_HEADER.size <= len(self.mm):
+            magic, code, packets, samples, first_sample = CHUNK_HEADER.unpack_from(self.mm, offset)
+            if magic != CHUNK_MAGIC or code not in KIND_NAMES:
+                break
+            _, dtype, shape = STREAMS[KIND_NAMES[code]]
+            size = CHUNK_HEADER.size + 8 * packets + samples * dtype.itemsize * int(np.prod(shape, dtype=int))
+            if offset + size > len(self.mm):
+                break
+            ts = self._chunk_arrays(offset, code, packets, samples)[0]
+            entries.append((offset, code, packets, samples, first_sample, int(ts[0]), int(ts[-1])))
+            offset += size + _pad(size)
+        return entries
+
+    def _chunk_arrays(self, offset, code, packets, samples):
+        _, dtype, shape = STREAMS[KIND_NAMES[code]]
+        pos = offset + CHUNK_HEADER.size
+        timestamps = self.mm[pos:pos + 4 * packets].view('<u4')
+        pos += 4 * packets
+        counts = self.mm[pos:pos + 4 * packets].view('<u4')
+        pos += 4 * packets
+        nbytes = samples * dtype.itemsize * int(np.prod(shape, dtype=int))
+        data = self.mm[pos:pos + nbytes].view(dtype).reshape((samples,) + shape)
+        return timestamps, counts, data
+
+    # ---------------------- 查询 ----------------------
+    def sample_count(self, kind):
+        return sum(entry[3] for entry in self.chunks[kind])
+
+    def samples(self, kind, start=0, stop=None):
+        """读取样本序号 [start, stop) 的数据"""
+        stop = self.sample_count(kind) if stop is None else stop
+        parts = []
+        for offset, code, packets, samples, first, _, _ in self.chunks[kind]:
+            lo, hi = max(start, first), min(stop, first + samples)
+            if lo >= hi:
+                continue
+            data = self._chunk_arrays(offset, code, packets, samples)[2]
+            parts.append(data[lo - first:hi - first])
+        return self._join(kind, parts)
+
+    def time_range(self, kind, t0, t1):
+        """
+        读取设备时间戳落在 [t0, t1] 内的所有包
+        返回 (data, timestamps, counts)，timestamps/counts 为逐包数组
+        """
+        parts, ts_parts, count_parts = [], [], []
+        for offset, code, packets, samples, _, ts_first, ts_last in self.chunks[kind]:
+            if ts_last < t0 or ts_first > t1:
+                continue
+            timestamps, counts, data = self._chunk_arrays(offset, code, packets, samples)
+            p0 = np.searchsorted(timestamps, t0, side='left')
+            p1 = np.searchsorted(timestamps, t1, side='right')
+            if p0 >= p1:
+                continue
+            bounds = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+            parts.append(data[bounds[p0]:bounds[p1]])
+            ts_parts.append(timestamps[p0:p1])
+            count_parts.append(counts[p0:p1])
+        if not parts:
+            return self._join(kind, []), np.zeros(0, dtype='<u4'), np.zeros(0, dtype='<u4')
+        if len(parts) == 1:
+            return parts[0], ts_parts[0], count_parts[0]
+        return self._join(kind, parts), np.concatenate(ts_parts), np.concatenate(count_parts)
+
+    def packets(self, kind):
+        """按写入顺序逐包迭代 (timestamp, block)"""
+        for offset, code, packets, samples, _, _, _ in self.chunks[kind]:
+            timestamps, counts, data = self._chunk_arrays(offset, code, packets, samples)
+            pos = 0
+            for ts, n in zip(timestamps.tolist(), counts.tolist()):
+                yield ts, data[pos:pos + n]
+                pos += n
+
+    def _join(self, kind, parts):
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            _, dtype, shape = STREAMS[kind]
+            return np.zeros((0,) + shape, dtype=dtype)
+        return np.concatenate(parts)
@@ -5,8 +5,11 @@ from PyQt5.QtCore import Qt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.pyplot as plt
 
+from ble.subscriptions import HR, PPG
 from ble.watch_worker import WatchWorker
+from signal_processing.ring_buffer import RingBuffer
 from signal_processing.rri import RRIProcessor
+from gui.widget.waveform_renderer import WaveformRenderer
 
 class RealTimePPGWindow(QMainWindow):
     def __init__(self, device_name="Q31(ID-B4F7)", fs=100):
@@ -27,52 +30,39 @@ class RealTimePPGWindow(QMainWindow):
         # 初始化
         self.fs = fs
         self.buffer_len = fs * 10  # 显示最近10秒
-        self.ppg_buffer = np.zeros(self.buffer_len)
+        self.ppg_buffer = RingBuffer(self.buffer_len + 2 * fs, dtype=np.float64)  # 多留2秒供滚动显示
+        self.last_seq = 0
         self.rri_proc = RRIProcessor(fs=self.fs)
 
+        # 坐标标签、标题、图例只设置一次，曲线和峰值由渲染器增量刷新
+        self.renderer = WaveformRenderer(
+            self.canvas, self.ax, self.buffer_len, self.fs,
+            label='PPG波形', peak_style='ro', peak_label='收缩峰', autoscale=True)
+        self.ax.set_title("实时PPG波形（红点为检测收缩峰）")
+        self.ax.set_xlabel("样本点")
+        self.ax.set_ylabel("幅值")
+        self.ax.legend(loc='upper right')
+
         # WatchWorker
-        self.worker = WatchWorker(device_name=device_name, fs=fs)
+        self.worker = WatchWorker(device_name=device_name, fs=fs, streams=(PPG, HR))
         self.worker.ppg_signal.connect(self.update_ppg)
         self.worker.hr_signal.connect(self.show_hr)
         self.worker.status_signal.connect(self.show_status)
         self.worker.start()
 
-    def update_ppg(self, data):
-        """收到 PPG 信号更新图像"""
-        data = np.array(data)
-        
-        # 只取最近 buffer_len 点
-        new_data = data[-self.buffer_len:]
-        
-        # 滚动更新缓冲区
-        self.ppg_buffer = np.roll(self.ppg_buffer, -len(new_data))
-        self.ppg_buffer[-len(new_data):] = new_data
+    def update_ppg(self, result):
+        """收到 PPG 处理结果（ProcessedWindow）更新图像"""
+        # 只取尚未看到的新样本写入环形缓冲，再按时间顺序取出
+        new_count = result.new_count(self.last_seq)
+        self.ppg_buffer.write(result.since(self.last_seq))
+        self.last_seq = result.seq
+        ppg = self.ppg_buffer.latest()
 
         # 峰值检测（收缩峰）
-        peaks = self.rri_proc.detect_peaks(self.ppg_buffer)
-
-        # 绘图
-        self.ax.clear()
-        self.ax.plot(self.ppg_buffer, color='g', label='PPG波形')
-        if len(peaks) > 0:
-            self.ax.plot(peaks, self.ppg_buffer[peaks], 'ro', label='收缩峰')
-
-        # 动态纵坐标，留10%边距
-        min_val = np.min(self.ppg_buffer)
-        max_val = np.max(self.ppg_buffer)
-        margin = (max_val - min_val) * 0.1
-        if margin == 0:
-            margin = 0.1  # 防止全零情况
-        self.ax.set_ylim(min_val - margin, max_val + margin)
-
-        # 坐标标签和标题
-        self.ax.set_title("实时PPG波形（红点为检测收缩峰）")
-        self.ax.set_xlabel("样本点")
-        self.ax.set_ylabel("幅值")
-        self.ax.legend(loc='upper right')
+        peaks = self.rri_proc.detect_peaks(ppg)
 
-        # 刷新画布
-        self.canvas.draw()
+        # 交给渲染器，按固定帧率滚动显示
+        self.renderer.push(ppg, peaks=peaks, new_count=new_count)
 
     def show_hr(self, bpm):
         self.setWindowTitle(f"实时PPG波形测试 - 心率: {bpm:.1f} BPM")
@@ -0,0 +1,85 @@
+import time
+
+import numpy as np
+
+from ble.batch import TIMESTAMP_MOD, analyze_session
+from ble.packet_decoder import decode_packet
+from ble.sources import ReplaySource, SyntheticSource
+from ble.subscriptions import HR
+from ble.watch_worker import DataProcessor
+from storage.session_file import SessionWriter
+
+FS = 100
+HOP_MS = 1000
+
+
+def _record(path, seconds=40):
+    """合成源的通知包按 50 样本合并后录制，回放时需要拆包"""
+    writer = SessionWriter(str(path), fs=FS, chunk_samples=1024)
+    pending = {'ppg': [], 'accel': []}
+    for _, packet in SyntheticSource(fs=FS, duration=seconds, speed=0, motion=200.0, seed=3).packets():
+        decoded = decode_packet(packet)
+        blocks = pending[decoded['type']]
+        blocks.append((decoded['timestamp'], decoded['data']))
+        if len(blocks) == 5:
+            writer.append(decoded['type'], np.concatenate([b for _, b in blocks]), blocks[0][0])
+            blocks.clear()
+    for kind, blocks in pending.items():
+        if blocks:
+            writer.append(kind, np.concatenate([b for _, b in blocks]), blocks[0][0])
+    writer.close()
+
+
+def _wait_ingested(proc, ppg, accel, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while (proc.ppg_index, proc.accel_index) != (ppg, accel):
+        assert time.monotonic() < deadline, "接入线程未在超时内写完数据"
+        time.sleep(0.001)
+
+
+def _threaded(path):
+    """实时路径：编码后的通知包经解码、接入通道与接入线程写入缓冲，按与批量分析相同的设备时间 tick"""
+    proc = DataProcessor(fs=FS, buffer_len=20 * FS, queue_size=100_000, streams=(HR,))
+    hr = []
+    proc.signals.hr_updated.connect(hr.append)
+    proc.start()
+    submitted = {'ppg': 0, 'accel': 0}
+    try:
+        elapsed, previous, next_tick = 0, None, HOP_MS
+        for _, packet in ReplaySource(str(path), speed=0).packets():
+            decoded = decode_packet(packet)
+            ts = decoded['timestamp']
+            if previous is not None:
+                step = (ts - previous) % TIMESTAMP_MOD
+                if step < TIMESTAMP_MOD // 2:
+                    elapsed += step
+            previous = ts
+            if elapsed >= next_tick:
+                _wait_ingested(proc, submitted['ppg'], submitted['accel'])
+                if proc.ppg_index > proc.processed_index:
+                    proc.process_latest()
+                next_tick += max(1, (elapsed - next_tick) // HOP_MS + 1) * HOP_MS
+            proc.submit(decoded['type'], decoded['data'], ts)
+            submitted[decoded['type']] += len(decoded['data'])
+        _wait_ingested(proc, submitted['ppg'], submitted['accel'])
+        if proc.ppg_index > proc.processed_index:
+            proc.process_latest()
+    finally:
+        proc.stop()
+    return proc, hr
+
+
+def test_batch_matches_threaded_ingest(tmp_path):
+    path = tmp_path / 'session.wgs'
+    _record(path)
+
+    analysis = analyze_session(str(path), hop_ms=HOP_MS)
+    proc, hr = _threaded(path)
+
+    for clock in analysis.summary['sync'].values():
+        assert clock['resets'] == 0 and clock['gaps'] == 0
+    assert not proc.ingest.total_dropped_samples
+    assert len(analysis.beats) > 30
+    np.testing.assert_array_equal(analysis.beats, proc.rri_proc.beats.positions)
+    assert len(hr) == len(analysis.hr) > 0
+    np.testing.assert_array_equal(analysis.hr[:, 1], hr)
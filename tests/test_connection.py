@@ -0,0 +1,132 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from ble.connection import READ_CHAR_UUID, ConnectionManager
+
+NAME = "Watch-A"
+
+
+class FakeScanner:
+    """模拟 BleakScanner：visible 为真时 start() 立即回调一次匹配广播"""
+    visible = True
+    instances = []
+
+    def __init__(self, detection_callback):
+        self.detection_callback = detection_callback
+        FakeScanner.instances.append(self)
+
+    async def start(self):
+        if FakeScanner.visible:
+            device = SimpleNamespace(name=NAME, address="AA:BB:CC")
+            self.detection_callback(device, SimpleNamespace(local_name=NAME))
+
+    async def stop(self):
+        pass
+
+
+class FakeClient:
+    """模拟 BleakClient：refuse_direct 为真时按地址字符串直连失败，disconnect() 触发断开回调"""
+    instances = []
+    refuse_direct = False
+
+    def __init__(self, target, disconnected_callback=None):
+        self.target = target
+        self.disconnected_callback = disconnected_callback
+        self.is_connected = False
+        self.notify = {}
+        FakeClient.instances.append(self)
+
+    async def connect(self):
+        if FakeClient.refuse_direct and isinstance(self.target, str):
+            raise OSError("refused")
+        self.is_connected = True
+
+    async def start_notify(self, uuid, callback):
+        self.notify[uuid] = callback
+
+    async def disconnect(self):
+        if self.is_connected:
+            self.is_connected = False
+            self.disconnected_callback(self)
+
+
+def _manager(tmp_path, cache=None, **kwargs):
+    FakeScanner.visible = True
+    FakeScanner.instances = []
+    FakeClient.instances = []
+    FakeClient.refuse_direct = False
+    cache_path = tmp_path / "devices.json"
+    if cache is not None:
+        cache_path.write_text(json.dumps(cache), encoding="utf-8")
+    return ConnectionManager(NAME, lambda sender, data: None, cache_path=str(cache_path),
+                             scanner_cls=FakeScanner, client_cls=FakeClient, **kwargs), cache_path
+
+
+_sleep = asyncio.sleep  # 退避测试会替换 asyncio.sleep
+
+
+async def _until(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "等待超时"
+        await _sleep(0.001)
+
+
+def test_cached_address_connects_directly(tmp_path):
+    manager, _ = _manager(tmp_path, cache={NAME: "11:22:33"})
+
+    async def scenario():
+        runner = asyncio.ensure_future(manager.run())
+        await _until(lambda: manager.client is not None and READ_CHAR_UUID in manager.client.notify)
+        assert [client.target for client in FakeClient.instances] == ["11:22:33"]
+        assert FakeScanner.instances == []
+        manager.stop()
+        await asyncio.wait_for(runner, 1.0)
+
+    asyncio.run(scenario())
+
+
+def test_reconnect_backoff_and_resubscribe(tmp_path, monkeypatch):
+    manager, cache_path = _manager(tmp_path)
+    manager.RECONNECT_SCAN_TIMEOUT = 0.005
+    statuses = []
+    manager.status = statuses.append
+    delays = []
+
+    async def fake_sleep(delay, *args):
+        # 退避等待立即返回；记录 9 次后设备重新出现
+        delays.append(delay)
+        if len(delays) == 9:
+            FakeScanner.visible = True
+        await _sleep(0)
+
+    async def scenario():
+        runner = asyncio.ensure_future(manager.run())
+        await _until(lambda: len(FakeClient.instances) == 1 and READ_CHAR_UUID in FakeClient.instances[0].notify)
+        # 扫描连接成功后写入地址缓存
+        assert json.loads(cache_path.read_text(encoding="utf-8")) == {NAME: "AA:BB:CC"}
+
+        # 断开且设备不可见：直连与扫描都失败，按 0.5s 起倍增、上限 30s 退避
+        first = FakeClient.instances[0]
+        FakeClient.refuse_direct = True  # 缓存地址直连失败，只能扫描后连接
+        FakeScanner.visible = False
+        monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+        await first.disconnect()
+        await _until(lambda: manager.client is not first)
+        assert delays == [0.5, 1, 2, 4, 8, 16, 30, 30, 30]
+
+        # 重新连接后在新客户端上重新订阅通知，退避复位
+        second = manager.client
+        assert second.target.address == "AA:BB:CC"
+        assert READ_CHAR_UUID in second.notify
+        assert "✅ 重新连接成功" in statuses
+
+        FakeScanner.visible = False
+        await second.disconnect()
+        await _until(lambda: len(delays) == 10)
+        assert delays[-1] == 0.5
+        manager.stop()
+        await asyncio.wait_for(runner, 1.0)
+
+    asyncio.run(scenario())
@@ -0,0 +1,89 @@
+import numpy as np
+
+from signal_processing.filters import (BlockNLMSFilter, StreamingBandpass, StreamingSavgol, bandpass_filter,
+                                       savgol_filter)
+
+FS = 100
+
+
+def _signal(seconds=20, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds * FS) / FS
+    return 30000 + 800 * np.sin(2 * np.pi * 1.2 * t) + 200 * np.sin(2 * np.pi * 0.2 * t) \
+        + 20 * rng.standard_normal(len(t))
+
+
+def _chunks(n, seed):
+    """随机切分 [0, n)，包含空块与单样本块"""
+    rng = np.random.default_rng(seed)
+    cuts = np.sort(rng.integers(0, n + 1, 60))
+    return list(zip(np.concatenate(([0], cuts)), np.concatenate((cuts, [n]))))
+
+
+def test_streaming_bandpass_matches_batch():
+    x = _signal()
+    # 流式滤波以首个样本初始化为稳态；带通的直流增益为 0，等价于对去掉首样本后的信号做零初值滤波
+    expected = bandpass_filter(x - x[0], fs=FS)
+    for seed in range(3):
+        bp = StreamingBandpass(fs=FS, max_block=64)
+        out = np.concatenate([bp.process(x[a:b]) for a, b in _chunks(len(x), seed)])
+        np.testing.assert_allclose(out, expected, rtol=0, atol=1e-3)
+
+
+def test_streaming_savgol_matches_batch():
+    x = _signal()
+    window, poly = 11, 3
+    # 流式输出延迟 window//2 个样本，只包含两端以外的完整窗口
+    expected = savgol_filter(x, window, poly)[window // 2:len(x) - window // 2]
+    for seed in range(3):
+        sg = StreamingSavgol(window, poly, max_block=64)
+        out = np.concatenate([sg.process(x[a:b]) for a, b in _chunks(len(x), seed)])
+        assert len(out) == len(expected)
+        np.testing.assert_allclose(out, expected, rtol=1e-6)
+
+
+def _nlms_reference(d, x, chunks, order, mu, block_size, eps=1e-6):
+    """逐样本构造回归向量的参考实现：每个调用内按 block_size 分子块，子块内权重固定，结束后按平均梯度更新"""
+    padded = np.vstack((np.zeros((order - 1, x.shape[1])), x))
+    w = np.zeros((x.shape[1], order))
+    out = np.empty(len(d))
+    for a, b in chunks:
+        for s in range(a, b, block_size):
+            grad = np.zeros_like(w)
+            idx = range(s, min(s + block_size, b))
+            for i in idx:
+                u = padded[i:i + order][::-1].T          # [通道, 抽头]，抽头 0 为最新样本
+                e = d[i] - np.sum(w * u)
+                out[i] = e
+                grad += e * u / (np.sum(u * u) + eps)
+            w += mu * grad / len(idx)
+    return out, w
+
+
+def _artifact_signals(n, seed=1):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal((n, 3))
+    clean = np.sin(2 * np.pi * 1.2 * np.arange(n) / FS)
+    artifact = np.convolve(x[:, 0], [0.8, -0.3, 0.1])[:n] + 0.5 * x[:, 2]
+    return clean, artifact, x
+
+
+def test_block_nlms_matches_sample_reference():
+    clean, artifact, x = _artifact_signals(1500)
+    d = clean + artifact
+    for block_size in (1, 16):
+        chunks = _chunks(len(x), block_size)
+        nlms = BlockNLMSFilter(filter_order=8, mu=0.05, block_size=block_size, max_block=64)
+        out = np.concatenate([nlms.process(d[a:b], x[a:b]) for a, b in chunks])
+        expected, w = _nlms_reference(d, x, chunks, 8, 0.05, block_size)
+        np.testing.assert_allclose(out, expected, rtol=0, atol=1e-4)
+        np.testing.assert_allclose(nlms.W, w, rtol=0, atol=1e-9)
+
+
+def test_block_nlms_removes_motion_artifact():
+    """收敛后误差信号接近去掉伪影的 PPG"""
+    clean, artifact, x = _artifact_signals(3000)
+    nlms = BlockNLMSFilter(filter_order=8, mu=0.5, block_size=16, max_block=64)
+    out = np.concatenate([nlms.process(clean[a:b] + artifact[a:b], x[a:b]) for a, b in _chunks(len(x), 7)])
+    tail = slice(len(x) - 300, None)
+    assert np.std(out[tail] - clean[tail]) < 0.2 * np.std(artifact[tail])
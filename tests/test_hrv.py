@@ -0,0 +1,43 @@
+import numpy as np
+
+from signal_processing.hrv import HRVEngine
+
+
+def _ends(rr):
+    return np.cumsum(rr) / 1000.0
+
+
+def test_no_successive_difference_across_dropped_interval():
+    """跨越被剔除间期（跳过区间 / 伪差）的两侧间期不计逐差"""
+    rr = np.array([800.0] * 10 + [1000.0] + [1200.0] * 10)
+    ends = _ends(rr)
+    keep = np.arange(len(rr)) != 10  # 跨越跳过区间的间期已由 stream_intervals 剔除
+    engine = HRVEngine()
+    engine.add(ends[keep][:12], rr[keep][:12])
+    engine.add(ends[keep][12:], rr[keep][12:])
+    m = engine.metrics('1min')
+    assert m['rmssd'] == 0.0 and m['pnn50'] == 0.0
+    assert engine.windows['1min'].n_diff == 18
+
+    artifact = rr.copy()
+    artifact[10] = 2500.0  # 超出 rr_range，被 add() 过滤
+    engine = HRVEngine()
+    engine.add(_ends(artifact), artifact)
+    assert engine.metrics('1min')['rmssd'] == 0.0
+
+
+def test_window_eviction_matches_brute_force():
+    rng = np.random.default_rng(0)
+    rr = rng.normal(850, 50, 2000)
+    rr[::37] = 2500.0
+    ends = _ends(rr)
+    engine = HRVEngine(windows={'30s': 30.0})
+    for i in range(0, len(rr), 7):
+        engine.add(ends[i:i + 7], rr[i:i + 7])
+
+    valid = (rr >= 300) & (rr <= 2000)
+    t, r = ends[valid], rr[valid]
+    inside = t >= t[-1] - 30.0
+    adjacent = np.abs(t[1:] - r[1:] / 1000.0 - t[:-1]) <= 1e-3
+    d = np.diff(r)[adjacent & inside[1:] & inside[:-1]]
+    assert np.isclose(engine.metrics('30s')['rmssd'], np.sqrt(np.mean(d ** 2)))
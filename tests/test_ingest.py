@@ -0,0 +1,19 @@
+import numpy as np
+
+from ble.ingest import COALESCE, IngestChannel
+
+
+def test_coalesce_advances_timestamp_of_trimmed_block():
+    channel = IngestChannel(maxsize=1, policy=COALESCE, coalesce_limit=25, rates={'ppg': 100})
+    channel.put('ppg', np.arange(10), 1000)
+    channel.put('ppg', np.arange(10, 30), 1100)  # 合并后 30 个样本，丢弃最早的 5 个
+    (kind, block, ts), = channel.drain(timeout=0)
+    assert kind == 'ppg'
+    assert block[0] == 5
+    assert ts == 1050
+
+    channel.put('ppg', np.arange(10), 1000)
+    channel.put('ppg', np.arange(40, 70), 2000)  # 旧块整块丢弃，再丢弃新块的前 5 个
+    (_, block, ts), = channel.drain(timeout=0)
+    assert block[0] == 45
+    assert ts == 2050
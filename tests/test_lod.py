@@ -0,0 +1,79 @@
+import numpy as np
+
+from signal_processing.lod import LODPyramid
+
+
+def _build(x, seed, factor=4):
+    rng = np.random.default_rng(seed)
+    lod = LODPyramid(factor=factor, capacity=64)
+    pos = 0
+    while pos < len(x):
+        n = int(rng.integers(0, 300))
+        lod.append(x[pos:pos + n])
+        pos += n
+    return lod
+
+
+def _check(lod, x, start, stop, max_points):
+    k, xs, ymin, ymax, ymean = lod.query(start, stop, max_points)
+    start, stop = max(0, start), min(len(x), stop)
+    if k == 0:
+        np.testing.assert_array_equal(xs, np.arange(start, stop))
+        np.testing.assert_array_equal(ymin, x[start:stop])
+        return k
+    width = lod.factor ** k
+    assert len(xs) <= max_points + 2
+    # 每桶覆盖 [x, x + width)（末尾未凑满的桶到 total 为止），首尾桶包含 start / stop
+    assert xs[0] <= start < xs[0] + width and xs[-1] < stop <= xs[-1] + width
+    for i, b in enumerate(xs):
+        bucket = x[b:min(b + width, len(x))]
+        assert ymin[i] == np.nanmin(bucket) and ymax[i] == np.nanmax(bucket)
+        assert np.isclose(ymean[i], np.mean(bucket, dtype=np.float64), rtol=1e-6)
+    return k
+
+
+def test_query_matches_brute_force():
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.standard_normal(50_000)).astype(np.float32)
+    for seed in range(3):
+        lod = _build(x, seed)
+        assert len(lod) == len(x)
+        levels = set()
+        for _ in range(50):
+            start = int(rng.integers(-100, len(x)))
+            stop = start + int(rng.integers(1, len(x)))
+            levels.add(_check(lod, x, start, stop, int(rng.integers(20, 800))))
+        assert len(levels) > 3
+
+
+def test_query_while_growing():
+    """每次追加后查询尾部：未凑满的桶由各层余量即时合并"""
+    rng = np.random.default_rng(1)
+    x = rng.standard_normal(10_000).astype(np.float32)
+    lod = LODPyramid(factor=4, capacity=64)
+    pos = 0
+    while pos < len(x):
+        n = int(rng.integers(1, 700))
+        lod.append(x[pos:pos + n])
+        pos = min(len(x), pos + n)
+        _check(lod, x[:pos], 0, pos, 100)
+        _check(lod, x[:pos], max(0, pos - 3000), pos, 50)
+
+
+def test_query_ignores_missing_samples():
+    rng = np.random.default_rng(2)
+    x = rng.standard_normal(30_000).astype(np.float32)
+    x[5000:9000] = np.nan
+    x[12_001:12_003] = np.nan
+    lod = _build(x, 0)
+    for max_points in (20, 100, 1000, 40_000):
+        k, xs, ymin, ymax, ymean = lod.query(0, len(x), max_points)
+        if k == 0:
+            continue
+        width = lod.factor ** k
+        for i, b in enumerate(xs):
+            bucket = x[b:b + width]
+            if np.isnan(bucket).all():
+                assert np.isnan(ymin[i]) and np.isnan(ymax[i]) and np.isnan(ymean[i])
+            else:
+                assert ymin[i] == np.nanmin(bucket) and ymax[i] == np.nanmax(bucket)
@@ -0,0 +1,122 @@
+import asyncio
+from types import SimpleNamespace
+
+from ble.connection import READ_CHAR_UUID
+from ble.multi_watch import MultiWatchManager
+from ble.sources import SyntheticSource
+
+NAMES = ("Watch-A", "Watch-B")
+
+
+class FakeScanner:
+    """模拟 BleakScanner：记录启停，由测试直接调用 detection_callback 模拟广播"""
+    instances = []
+
+    def __init__(self, detection_callback):
+        self.detection_callback = detection_callback
+        self.starts = self.stops = 0
+        FakeScanner.instances.append(self)
+
+    async def start(self):
+        self.starts += 1
+
+    async def stop(self):
+        self.stops += 1
+
+    def advertise(self, name):
+        device = SimpleNamespace(name=name, address=f"AA:{name}")
+        self.detection_callback(device, SimpleNamespace(local_name=name, rssi=-60))
+
+
+class FakeClient:
+    """模拟 BleakClient：connect() 让出事件循环以便并发，disconnect() 触发断开回调"""
+    instances = []
+    connecting = 0
+    max_connecting = 0
+
+    def __init__(self, device, disconnected_callback=None):
+        self.device = device
+        self.disconnected_callback = disconnected_callback
+        self.is_connected = False
+        self.notify = {}
+        FakeClient.instances.append(self)
+
+    async def connect(self):
+        FakeClient.connecting += 1
+        FakeClient.max_connecting = max(FakeClient.max_connecting, FakeClient.connecting)
+        await asyncio.sleep(0.05)
+        FakeClient.connecting -= 1
+        self.is_connected = True
+
+    async def start_notify(self, uuid, callback):
+        self.notify[uuid] = callback
+
+    async def disconnect(self):
+        if self.is_connected:
+            self.is_connected = False
+            if self.disconnected_callback is not None:
+                self.disconnected_callback(self)
+
+
+def _reset_fakes():
+    FakeScanner.instances = []
+    FakeClient.instances = []
+    FakeClient.connecting = FakeClient.max_connecting = 0
+
+
+async def _until(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "等待超时"
+        await asyncio.sleep(0.01)
+
+
+def test_concurrent_connect_and_disconnect():
+    _reset_fakes()
+    manager = MultiWatchManager(NAMES, hop_ms=50, scanner_cls=FakeScanner, client_cls=FakeClient)
+    statuses = []
+    manager.status_signal.connect(lambda name, msg: statuses.append((name, msg)))
+    packet = next(p for _, p in SyntheticSource(duration=1, seed=0).packets())
+
+    async def scenario():
+        manager.loop = asyncio.get_running_loop()
+        runner = asyncio.ensure_future(manager.run_async())
+        await _until(lambda: FakeScanner.instances and manager._scanning)
+        scanner = FakeScanner.instances[0]
+
+        # 两个设备同时广播（重复广播不应重复连接），连接并发进行
+        for name in NAMES + NAMES:
+            scanner.advertise(name)
+        scanner.advertise("Other-Device")
+        await _until(lambda: all(s.connected for s in manager.sessions.values()))
+        assert FakeClient.max_connecting == 2
+        assert len(FakeClient.instances) == 2
+        await _until(lambda: not manager._scanning)
+        assert scanner.stops == 1
+
+        # 通知按设备路由
+        session_a = manager.sessions["Watch-A"]
+        client_a = session_a.client
+        client_a.notify[READ_CHAR_UUID](None, packet)
+        assert session_a.packets == 1 and manager.sessions["Watch-B"].packets == 0
+
+        # 单个设备断开：恢复扫描，另一设备不受影响；重新广播后重连并再次停止扫描
+        await client_a.disconnect()
+        await _until(lambda: manager._scanning)
+        assert session_a.disconnects == 1 and not session_a.connected
+        assert manager.sessions["Watch-B"].connected
+        scanner.advertise("Watch-A")
+        await _until(lambda: session_a.connected and not manager._scanning)
+        assert session_a.client is not client_a
+        assert scanner.starts == 2 and scanner.stops == 2
+
+        # 停止：全部断开
+        manager.running = False
+        await asyncio.wait_for(runner, 3.0)
+        assert not any(s.connected for s in manager.sessions.values())
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        manager.stop()
+    assert ("Watch-A", "⚠️ 设备已断开，重新扫描中") in statuses
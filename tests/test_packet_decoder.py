@@ -0,0 +1,59 @@
+import numpy as np
+
+from ble.packet_decoder import decode_batch, decode_packet, encode_packet
+
+
+def _packets(seed=0):
+    """随机长度的 PPG / 加速度包，混入 CRC 错误、截断、过短、未知命令字与负载长度不整除的包"""
+    rng = np.random.default_rng(seed)
+    packets = []
+    for i in range(200):
+        kind = 'ppg' if rng.random() < 0.6 else 'accel'
+        n = int(rng.integers(1, 40))
+        block = (rng.integers(0, 65536, n, dtype=np.uint16) if kind == 'ppg'
+                 else rng.integers(-32768, 32768, (n, 3), dtype=np.int16))
+        packet = bytearray(encode_packet(kind, block, int(rng.integers(0, 1 << 32))))
+        fault = rng.integers(0, 8)
+        if fault == 0:
+            packet[int(rng.integers(0, len(packet)))] ^= 0x5A          # CRC 错误
+        elif fault == 1:
+            packet = packet[:int(rng.integers(0, len(packet)))]        # 截断
+        elif fault == 2:
+            packet = packet[:int(rng.integers(0, 10))]                 # 短于最小包长
+        elif fault == 3:
+            packet[1] = 0xFC                                           # 未知命令字
+        elif fault == 4 and kind == 'accel':
+            packet[6] = (packet[6] - 2) % 256                          # 负载长度不是 6 的倍数
+        elif fault == 5:
+            packet += bytes(int(rng.integers(1, 4)))                   # 包尾多余字节（忽略）
+        packets.append(bytes(packet))
+    return packets
+
+
+def test_decode_batch_matches_decode_packet():
+    packets = _packets()
+    singles = [decode_packet(p) for p in packets]
+    assert 0 < sum(s is not None for s in singles) < len(packets)
+
+    batch = decode_batch(packets)
+    for kind in ('ppg', 'accel'):
+        valid = [s for s in singles if s is not None and s['type'] == kind]
+        assert batch[kind]['timestamps'].tolist() == [s['timestamp'] for s in valid]
+        assert batch[kind]['counts'].tolist() == [len(s['data']) for s in valid]
+        expected = np.concatenate([s['data'] for s in valid])
+        assert batch[kind]['data'].dtype == expected.dtype
+        np.testing.assert_array_equal(batch[kind]['data'], expected)
+
+
+def test_decode_batch_rejects_everything_invalid():
+    good = encode_packet('ppg', np.arange(5, dtype=np.uint16), 42)
+    bad_crc = good[:-1] + bytes([good[-1] ^ 1])
+    packets = [bad_crc, good[:8], b'', b'\xff\xfa']
+    assert all(decode_packet(p) is None for p in packets)
+    batch = decode_batch(packets)
+    assert len(batch['ppg']['data']) == 0 and len(batch['ppg']['timestamps']) == 0
+    assert batch['accel']['data'].shape == (0, 3)
+
+    batch = decode_batch(packets + [good])
+    np.testing.assert_array_equal(batch['ppg']['data'], np.arange(5))
+    assert batch['ppg']['timestamps'].tolist() == [42]
@@ -0,0 +1,95 @@
+import numpy as np
+
+from ble.subscriptions import HR, PPG
+from ble.watch_worker import DataProcessor
+from signal_processing.filters import BlockNLMSFilter
+from signal_processing.pipeline import PPGPipeline
+from signal_processing.quality import RUN_NLMS, SKIP_NLMS, SignalQuality
+
+FS = 100
+BLOCK = 20
+NLMS = {'filter_order': 8, 'mu': 0.01, 'block_size': 16}
+
+
+def _signals(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds * FS) / FS
+    accel = rng.normal(0, 1, (len(t), 3)).astype(np.float32)
+    ppg = (np.sin(2 * np.pi * 1.2 * t) + 0.5 * accel[:, 0]).astype(np.float32)
+    return ppg, accel
+
+
+def test_pipeline_skip_advances_nlms_taps():
+    """静止窗口跳过自适应时推进延迟线：still → motion 后权重与连续推进的参考实现一致"""
+    ppg, accel = _signals(6)
+    pipeline = PPGPipeline(fs=FS, output_len=2000, stages=(('nlms', NLMS),))
+    expected = BlockNLMSFilter(**NLMS)
+    stale = BlockNLMSFilter(**NLMS)  # 静止期间不推进延迟线
+    for i, s in enumerate(range(0, len(ppg), BLOCK)):
+        block, ref = ppg[s:s + BLOCK], accel[s:s + BLOCK]
+        use_nlms = not (10 <= i < 20)
+        pipeline.process(block, ref, use_nlms=use_nlms)
+        if use_nlms:
+            expected.process(block, ref)
+            stale.process(block, ref)
+        else:
+            expected.advance(ref)
+        assert np.array_equal(pipeline.nlms.delay_line, ref[-7:])
+    assert np.array_equal(pipeline.nlms.W, expected.W)
+    assert not np.array_equal(pipeline.nlms.W, stale.W)
+
+
+def test_processor_advances_nlms_delay_line_on_still_windows():
+    """DataProcessor 在 SKIP_NLMS 窗口也插值参考并推进延迟线，恢复 NLMS 时抽头与参考连续"""
+    ppg, accel = _signals(40)
+    proc = DataProcessor(fs=FS, buffer_len=2000)
+    decisions = iter([RUN_NLMS] * 5 + [SKIP_NLMS] * 10 + [RUN_NLMS] * 5)
+    proc.quality.assess = lambda p, a: SignalQuality(0.9, next(decisions))
+
+    advanced = []
+    advance = proc.nlms.advance
+    proc.nlms.advance = lambda x: (advanced.append(len(x)), advance(x))
+
+    step = 10 * BLOCK  # 每个 tick 2 秒
+    times = np.zeros(step)
+    for tick in range(20):
+        s = tick * step
+        ts = s * 1000 // FS
+        proc.write_blocks((('accel', accel[s:s + step], ts), ('ppg', ppg[s:s + step], ts)))
+        proc.process_latest()
+        proc.ppg_buffer.latest_into(np.zeros(step, dtype=np.float32), times)
+        ref = proc.sync.resample(times, proc.accel_buffer)
+        assert np.array_equal(proc.nlms.delay_line, ref[-7:]), tick
+
+    assert len(advanced) == 10
+
+
+def test_processor_holds_ppg_newer_than_accel():
+    """晚于最新加速度样本的 PPG 留到下次处理，NLMS 参考不在块尾取平"""
+    ppg, accel = _signals(6)
+    proc = DataProcessor(fs=FS, buffer_len=2000)
+    proc.write_blocks((('accel', accel[:180], 0), ('ppg', ppg[:200], 0)))
+    proc.process_latest()
+    assert proc.processed_index == 180
+
+    proc.write_blocks((('accel', accel[180:400], 1800), ('ppg', ppg[200:400], 2000)))
+    proc.process_latest()
+    assert proc.processed_index == 400
+
+
+def test_pipeline_allocations_flat_after_warmup():
+    """稳态 tick 中滤波流水线只分配归一化窗口（PPG 有订阅者时），累计分配数不再随工作区增长"""
+    ppg, accel = _signals(60)
+    step = 5 * BLOCK
+    for streams, per_tick in (((PPG, HR), 1), ((HR,), 0)):
+        proc = DataProcessor(fs=FS, buffer_len=2000, streams=streams)
+        history = []
+        for tick in range(len(ppg) // step):
+            s = tick * step
+            ts = s * 1000 // FS
+            proc.write_blocks((('accel', accel[s:s + step], ts), ('ppg', ppg[s:s + step], ts)))
+            proc.process_latest()
+            history.append((proc.ppg_filter.allocations, proc.ppg_filter.last_allocations))
+        warm = history[5:]
+        assert all(last == per_tick for _, last in warm), streams
+        assert np.all(np.diff([total for total, _ in warm]) == per_tick), streams
@@ -0,0 +1,52 @@
+import numpy as np
+
+from signal_processing.rri import RRIProcessor
+
+FS = 100
+
+
+def _pulse(seconds=60, seed=0):
+    """心率在 66~78 BPM 间缓慢变化的合成脉搏波（含较低的二次谐波与噪声）"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds * FS) / FS
+    phase = 2 * np.pi * np.cumsum(1.2 + 0.1 * np.sin(2 * np.pi * 0.1 * t)) / FS
+    return np.sin(phase) + 0.25 * np.sin(2 * phase + 0.8) + 0.05 * rng.standard_normal(len(t))
+
+
+def _feed(proc, x, seed):
+    rng = np.random.default_rng(seed)
+    cuts = np.sort(rng.integers(0, len(x) + 1, 200))
+    bounds = np.concatenate(([0], cuts, [len(x)]))
+    return [proc.update_stream(x[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def test_stream_beats_match_batch_detection():
+    x = _pulse()
+    batch = RRIProcessor(FS).detect_peaks(x)
+    for seed in range(5):
+        proc = RRIProcessor(FS)
+        confirmed = np.concatenate(_feed(proc, x, seed))
+        # 距末端不足 min_distance 的峰尚未确认
+        expected = batch[batch < len(x) - proc.min_distance]
+        np.testing.assert_array_equal(confirmed, expected)
+        np.testing.assert_array_equal(proc.beats.positions, confirmed)
+        assert np.all(np.diff(confirmed) >= proc.min_distance)
+
+
+def test_stream_bpm_none_after_gap_until_new_beats():
+    x = _pulse(40)
+    proc = RRIProcessor(FS)
+    _feed(proc, x[:2000], 0)
+    assert 60 < proc.stream_bpm() < 85
+
+    proc.skip_stream(500)
+    assert proc.stream_bpm() is None
+    # 跳过后新确认的心搏不足两个：仍没有新的间期
+    proc.update_stream(x[2500:2600])
+    assert proc.stream_bpm() is None
+
+    proc.update_stream(x[2600:3000])
+    ends, rr = proc.stream_intervals(8)
+    after = ends >= 2000
+    assert after.any() and not after.all()  # 最近 8 个间期中仍有跳过前的，但不计入心率
+    assert np.isclose(proc.stream_bpm(), 60_000 / np.mean(rr[after]))
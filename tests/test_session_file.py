@@ -0,0 +1,91 @@
+import numpy as np
+
+from storage.session_file import FOOTER, SessionReader, SessionWriter
+
+
+def _write(path, packets=40, ppg_len=25, accel_len=10, chunk_samples=128):
+    """写入 packets 个 PPG / 加速度包，时间戳每包 250 ms；返回原始数据以便比对"""
+    rng = np.random.default_rng(0)
+    ppg = rng.integers(0, 65536, packets * ppg_len, dtype=np.uint16)
+    accel = rng.integers(-32768, 32768, (packets * accel_len, 3), dtype=np.int16)
+    with SessionWriter(str(path), fs=100, device_name="测试手表", chunk_samples=chunk_samples) as writer:
+        for i in range(packets):
+            writer.append('ppg', ppg[i * ppg_len:(i + 1) * ppg_len], 1000 + 250 * i)
+            writer.append('accel', accel[i * accel_len:(i + 1) * accel_len], 1000 + 250 * i)
+    return ppg, accel
+
+
+def test_roundtrip(tmp_path):
+    path = tmp_path / 'session.wgs'
+    ppg, accel = _write(path)
+    reader = SessionReader(str(path))
+    assert reader.meta['device_name'] == "测试手表"
+    assert reader.fs == 100
+    assert len(reader.chunks['ppg']) > 1 and len(reader.chunks['accel']) > 1
+
+    got_ppg, got_accel = reader.samples('ppg'), reader.samples('accel')
+    assert got_ppg.dtype == np.uint16 and got_accel.dtype == np.int16
+    assert got_accel.shape == accel.shape
+    np.testing.assert_array_equal(got_ppg, ppg)
+    np.testing.assert_array_equal(got_accel, accel)
+    np.testing.assert_array_equal(reader.samples('ppg', 100, 400), ppg[100:400])
+
+    packets = list(reader.packets('accel'))
+    assert [ts for ts, _ in packets] == [1000 + 250 * i for i in range(40)]
+    np.testing.assert_array_equal(np.concatenate([b for _, b in packets]), accel)
+
+
+def test_time_range_across_chunks(tmp_path):
+    path = tmp_path / 'session.wgs'
+    ppg, accel = _write(path)
+    reader = SessionReader(str(path))
+
+    # PPG 每块 128 个样本以上才写出（约 6 包），区间 [包 3, 包 20] 跨越多个数据块
+    t0, t1 = 1000 + 250 * 3, 1000 + 250 * 20
+    assert len({entry[0] for entry in reader.chunks['ppg'] if entry[6] >= t0 and entry[5] <= t1}) > 2
+    data, timestamps, counts = reader.time_range('ppg', t0, t1)
+    np.testing.assert_array_equal(timestamps, [1000 + 250 * i for i in range(3, 21)])
+    np.testing.assert_array_equal(counts, np.full(18, 25))
+    np.testing.assert_array_equal(data, ppg[3 * 25:21 * 25])
+
+    data, timestamps, _ = reader.time_range('accel', t0 - 100, t1 + 100)
+    np.testing.assert_array_equal(data, accel[3 * 10:21 * 10])
+    assert len(timestamps) == 18
+
+    data, timestamps, counts = reader.time_range('ppg', 0, 999)
+    assert len(data) == len(timestamps) == len(counts) == 0
+
+
+def test_rebuild_index_without_footer(tmp_path):
+    path = tmp_path / 'session.wgs'
+    ppg, accel = _write(path)
+    complete = SessionReader(str(path))
+    chunks = {kind: list(entries) for kind, entries in complete.chunks.items()}
+    del complete
+    raw = path.read_bytes()
+    index_offset = FOOTER.unpack_from(raw, len(raw) - FOOTER.size)[0]
+
+    # 索引尾缺失（未正常关闭）：扫描数据块头得到相同的索引
+    missing = tmp_path / 'missing.wgs'
+    missing.write_bytes(raw[:index_offset])
+    reader = SessionReader(str(missing))
+    assert reader.chunks == chunks
+    np.testing.assert_array_equal(reader.samples('ppg'), ppg)
+    np.testing.assert_array_equal(reader.samples('accel'), accel)
+
+    # 索引尾被截断
+    truncated = tmp_path / 'truncated.wgs'
+    truncated.write_bytes(raw[:len(raw) - 5])
+    assert SessionReader(str(truncated)).chunks == chunks
+
+    # 最后一个数据块写到一半：丢弃该块，其余数据完整
+    last = max(entry[0] for entries in chunks.values() for entry in entries)
+    partial = tmp_path / 'partial.wgs'
+    partial.write_bytes(raw[:last + 40])
+    reader = SessionReader(str(partial))
+    expected = {kind: [entry for entry in entries if entry[0] != last] for kind, entries in chunks.items()}
+    assert reader.chunks == expected
+    kind = next(kind for kind, entries in chunks.items() if any(entry[0] == last for entry in entries))
+    kept = sum(entry[3] for entry in expected[kind])
+    source = ppg if kind == 'ppg' else accel
+    np.testing.assert_array_equal(reader.samples(kind), source[:kept])
@@ -0,0 +1,31 @@
+import numpy as np
+
+from ble.sources import ReplaySource
+from signal_processing.sync import StreamSynchronizer
+from storage.session_file import SessionWriter
+
+
+def test_replay_splits_long_blocks_with_advancing_timestamps(tmp_path):
+    fs, accel_fs, blocks = 100, 50, 5
+    path = tmp_path / 'long_blocks.wgs'
+    with SessionWriter(str(path), fs=fs, meta={'accel_fs': accel_fs}) as writer:
+        for i in range(blocks):
+            # 每块 3 秒，远超单包上限（PPG 127 / 加速度 42 个样本）
+            writer.append('ppg', np.full(3 * fs, i, dtype=np.uint16), 1000 + 3000 * i)
+            writer.append('accel', np.full((3 * accel_fs, 3), i, dtype=np.int16), 1000 + 3000 * i)
+
+    source = ReplaySource(str(path), speed=0)
+    sync = StreamSynchronizer(fs, accel_fs)
+    times = {'ppg': [], 'accel': []}
+    for ts, kind, block in source.blocks():
+        clock_times = sync.ppg_times if kind == 'ppg' else sync.accel_times
+        times[kind].append(clock_times(len(block), ts))
+
+    for kind, clock, rate in (('ppg', sync.ppg_clock, fs), ('accel', sync.accel_clock, accel_fs)):
+        assert len(times[kind]) > blocks
+        t = np.concatenate(times[kind])
+        assert len(t) == 3 * rate * blocks
+        assert np.all(np.diff(t) > 0)
+        np.testing.assert_allclose(np.diff(t), 1.0 / rate)
+        assert clock.resets == 0
+        assert clock.gaps == 0
@@ -0,0 +1,83 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from ble import stream_protocol as sp
+from ble.results import ProcessedWindow
+from signal_processing.quality import RUN_NLMS, SignalQuality
+
+
+def _roundtrip(frame):
+    msg_type, length = sp.decode_header(frame[:sp.FRAME_HEADER.size])
+    payload = frame[sp.FRAME_HEADER.size:]
+    assert length == len(payload)
+    return msg_type, sp.decode_payload(msg_type, payload)
+
+
+def test_roundtrip_every_frame_type():
+    rng = np.random.default_rng(0)
+    ppg = ProcessedWindow(rng.standard_normal(2000).astype(np.float32), 123_456, 100.0, np.array([3, 90, 1999]))
+    accel = rng.standard_normal((25, 3)).astype(np.float32)
+    quality = SignalQuality(0.82, RUN_NLMS, motion=0.01, perfusion=1.5, kurtosis=-0.4, concentration=0.7)
+    hello = {'device': "手表", 'fs': 100, 'accel_fs': 50, 'hop_ms': 500}
+    hrv = {'1min': {'rmssd': 41.5, 'sdnn': 52.0, 'count': 70}, '5min': None}
+    stats = {'stages': {'total': {'p50': 0.002}}, 'queue_depth': 0, 'dropped': {}}
+
+    msg_type, got = _roundtrip(sp.encode_ppg(ppg))
+    assert msg_type == sp.MSG_PPG
+    assert (got.seq, got.fs) == (ppg.seq, ppg.fs)
+    np.testing.assert_array_equal(got.data, ppg.data)
+    np.testing.assert_array_equal(got.peaks, ppg.peaks)
+
+    msg_type, got = _roundtrip(sp.encode_accel(accel, 777, 50.0))
+    assert msg_type == sp.MSG_ACCEL
+    assert (got.seq, got.fs, got.data.shape) == (777, 50.0, (25, 3))
+    np.testing.assert_array_equal(got.data, accel)
+
+    assert _roundtrip(sp.encode_hr(71.25)) == (sp.MSG_HR, 71.25)
+
+    msg_type, got = _roundtrip(sp.encode_beats(np.array([10, 95, 180], dtype=np.int64)))
+    assert msg_type == sp.MSG_BEATS
+    assert got.tolist() == [10, 95, 180]
+    assert _roundtrip(sp.encode_beats(np.zeros(0, dtype=np.int64)))[1].tolist() == []
+
+    msg_type, got = _roundtrip(sp.encode_json(sp.MSG_QUALITY, quality))
+    assert msg_type == sp.MSG_QUALITY and isinstance(got, SignalQuality)
+    assert all(getattr(got, name) == getattr(quality, name) for name in SignalQuality.__slots__)
+
+    assert _roundtrip(sp.encode_json(sp.MSG_HELLO, hello)) == (sp.MSG_HELLO, hello)
+    assert _roundtrip(sp.encode_json(sp.MSG_STATUS, "✅ 已连接")) == (sp.MSG_STATUS, "✅ 已连接")
+    assert _roundtrip(sp.encode_json(sp.MSG_HRV, hrv)) == (sp.MSG_HRV, hrv)
+    assert _roundtrip(sp.encode_json(sp.MSG_STATS, stats)) == (sp.MSG_STATS, stats)
+    assert _roundtrip(sp.encode_json(sp.MSG_STATS, {'n': np.int64(3), 'a': np.arange(2)}))[1] == {'n': 3, 'a': [0, 1]}
+
+
+def test_read_frame_from_stream():
+    frames = [sp.encode_hr(60.0), sp.encode_beats(np.arange(3)), sp.encode_json(sp.MSG_STATUS, "x")]
+
+    async def scenario():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b''.join(frames))
+        reader.feed_eof()
+        got = [await sp.read_frame(reader) for _ in frames]
+        with pytest.raises(asyncio.IncompleteReadError):
+            await sp.read_frame(reader)
+        return got
+
+    got = asyncio.run(scenario())
+    assert [msg_type for msg_type, _ in got] == [sp.MSG_HR, sp.MSG_BEATS, sp.MSG_STATUS]
+    assert [payload for _, payload in got] == [f[sp.FRAME_HEADER.size:] for f in frames]
+
+
+def test_rejects_malformed_frames():
+    frame = sp.encode_hr(60.0)
+    header = frame[:sp.FRAME_HEADER.size]
+    with pytest.raises(sp.ProtocolError):
+        sp.decode_header(b'XX' + header[2:])
+    with pytest.raises(sp.ProtocolError):
+        sp.decode_header(header[:2] + bytes([sp.VERSION + 1]) + header[3:])
+    with pytest.raises(sp.ProtocolError):
+        sp.decode_header(sp.FRAME_HEADER.pack(sp.MAGIC, sp.VERSION, sp.MSG_PPG, sp.MAX_PAYLOAD + 1))
+    with pytest.raises(sp.ProtocolError):
+        sp.decode_payload(99, b'')
@@ -0,0 +1,41 @@
+import asyncio
+
+from ble import stream_protocol as sp
+from ble.stream_server import StreamServer
+
+
+async def _until(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "等待超时"
+        await asyncio.sleep(0.01)
+
+
+def test_unix_subscribers_tracked_separately(tmp_path):
+    path = str(tmp_path / "out.sock")
+    server = StreamServer(f"unix:{path}", max_frames=4, hello={'fs': 100})
+
+    async def scenario():
+        await server.start()
+        clients = [await asyncio.open_unix_connection(path) for _ in range(2)]
+        await _until(lambda: len(server.subscribers) == 2 and all(sub.sent for sub in server.subscribers))
+
+        # 同一轮事件循环中连续分发，发送协程来不及取走：每个订阅者只保留最近 max_frames 帧
+        for i in range(10):
+            server._broadcast(sp.MSG_HR, sp.encode_hr(float(i)))
+        # Unix 套接字的对端没有地址，两个订阅者的丢弃计数仍分别统计
+        dropped = server.status()['dropped']
+        assert len(dropped) == 2 and set(dropped.values()) == {6}
+        assert all(label.endswith(" unix") for label in dropped)
+
+        for reader, _ in clients:
+            assert (await sp.read_frame(reader))[0] == sp.MSG_HELLO
+            frames = [await sp.read_frame(reader) for _ in range(4)]
+            assert [sp.decode_payload(*frame) for frame in frames] == [6.0, 7.0, 8.0, 9.0]
+
+        for _, writer in clients:
+            writer.close()
+        await _until(lambda: not server.subscribers)
+        await server.close()
+
+    asyncio.run(scenario())